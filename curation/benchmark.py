@@ -0,0 +1,206 @@
+"""
+Curation benchmark suite on synthetic scraper exports.
+
+Times load_data, run_rules_engine, the validation gate (with synthetic LLM
+verdicts — no API calls) and output writing at each requested size, appends
+the numbers to a JSON-lines history file and flags stages that got slower
+than the median of their previous runs. CLI startup (`--help` of the entry
+points, in a fresh interpreter) is tracked the same way, as size 0.
+
+Usage:
+    python -m curation.benchmark                      # startup, 10k, 100k
+    python -m curation.benchmark --sizes 10k,100k,1m
+    python -m curation.benchmark --sizes 10k --fail-on-regression
+    python -m curation.benchmark --sizes 0             # startup only
+
+Generated CSVs are cached under benchmarks/data/ (reused per size + seed).
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from .synthetic import generate_csv, parse_size
+from .data_loader import load_data
+from .rules_engine import run_rules_engine
+from .llm_curator import apply_validation_gate
+from .run_pipeline import _write_outputs
+
+BENCH_DIR = "benchmarks"
+HISTORY_FILE = os.path.join(BENCH_DIR, "history.jsonl")
+DATA_DIR = os.path.join(BENCH_DIR, "data")
+REGRESSION_RATIO = 1.25  # slower than 1.25x the historical median = regression
+HISTORY_WINDOW = 5
+STARTUP_REPEATS = 5
+# Entry points timed from a fresh interpreter (best of STARTUP_REPEATS)
+STARTUP_COMMANDS = {
+    'python': ['-c', 'pass'],
+    'run_pipeline --help': ['-m', 'curation.run_pipeline', '--help'],
+    'whatif --help': ['-m', 'curation.whatif', '--help'],
+    'run_diff --help': ['-m', 'curation.run_diff', '--help'],
+    'sharding --help': ['-m', 'curation.sharding', '--help'],
+}
+
+
+def _git_rev() -> str:
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL, text=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def _fake_llm_verdicts(df: pd.DataFrame, seed: int) -> pd.DataFrame:
+    """Attach deterministic LLM columns so the gate can run without the API."""
+    rng = random.Random(seed)
+    df = df.copy()
+    review = df['rules_classification'] == 'review'
+    n = int(review.sum())
+    df['llm_score'] = pd.NA
+    df['llm_reason'] = ''
+    df['sells_products'] = pd.NA
+    df['has_shop'] = pd.NA
+    df['festival_aesthetic'] = pd.NA
+    df['final_score'] = df['rules_score'].where(~review, 0.0)
+    df['final_classification'] = 'no'
+    df.loc[review, 'llm_score'] = [round(rng.random(), 2) for _ in range(n)]
+    df.loc[review, 'llm_reason'] = 'synthetic'
+    df.loc[review, 'sells_products'] = [rng.random() < 0.8 for _ in range(n)]
+    df.loc[review, 'has_shop'] = [rng.random() < 0.7 for _ in range(n)]
+    df.loc[review, 'festival_aesthetic'] = [rng.random() < 0.6 for _ in range(n)]
+    df['categories'] = ''
+    df['vendor_tags'] = ''
+    return df
+
+
+def _timed(fn, *args):
+    """Run fn quietly; return (result, seconds)."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        t0 = time.perf_counter()
+        result = fn(*args)
+        elapsed = time.perf_counter() - t0
+    return result, elapsed
+
+
+def bench_size(rows: int, seed: int = 42) -> dict:
+    """Benchmark every stage at one input size. Returns records and per-stage seconds."""
+    csv_path = os.path.join(DATA_DIR, f"synthetic_{rows}_{seed}.csv")
+    if not os.path.exists(csv_path):
+        print(f"  generating {rows:,} rows → {csv_path}")
+        generate_csv(csv_path, rows, seed=seed)
+
+    timings = {}
+    df, timings['load_data'] = _timed(load_data, csv_path)
+    df, timings['run_rules_engine'] = _timed(run_rules_engine, df)
+    df = _fake_llm_verdicts(df, seed)
+    df, timings['validation_gate'] = _timed(apply_validation_gate, df)
+    with tempfile.TemporaryDirectory() as out_dir:
+        _, timings['write_outputs'] = _timed(_write_outputs, df, out_dir)
+    return {'records': len(df), 'timings': timings}
+
+
+def bench_startup(repeats: int = STARTUP_REPEATS) -> dict:
+    """Wall time to start each CLI entry point (bare `python` included for reference)."""
+    timings = {}
+    for name, args in STARTUP_COMMANDS.items():
+        best = None
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            subprocess.run([sys.executable, *args], check=True,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            elapsed = time.perf_counter() - t0
+            best = elapsed if best is None else min(best, elapsed)
+        timings[name] = best
+    return {'records': 0, 'timings': timings}
+
+
+def _load_history(path: str) -> list[dict]:
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _baseline(history: list[dict], rows: int, stage: str):
+    """Median of the last HISTORY_WINDOW timings for this size/stage, or None."""
+    past = [h['timings'][stage] for h in history
+            if h.get('rows') == rows and stage in h.get('timings', {})]
+    return statistics.median(past[-HISTORY_WINDOW:]) if past else None
+
+
+def run_benchmarks(sizes: list[int], seed: int = 42, history_path: str = HISTORY_FILE,
+                   record: bool = True) -> list[dict]:
+    """Run all sizes, print a comparison table, append to history. Returns regressions."""
+    history = _load_history(history_path)
+    run_info = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'git_rev': _git_rev(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'seed': seed,
+    }
+    regressions = []
+    results = []
+    for rows in sizes:
+        if rows == 0:
+            print("\n[benchmark] CLI startup")
+            result = bench_startup()
+        else:
+            print(f"\n[benchmark] {rows:,} rows")
+            result = bench_size(rows, seed)
+        print(f"  {'stage':<20} {'seconds':>9} {'rows/s':>11} {'baseline':>9} {'ratio':>6}")
+        for stage, seconds in result['timings'].items():
+            base = _baseline(history, rows, stage)
+            ratio = seconds / base if base else None
+            flag = ''
+            if ratio is not None and ratio > REGRESSION_RATIO:
+                flag = '  REGRESSION'
+                regressions.append({'rows': rows, 'stage': stage, 'seconds': seconds, 'baseline': base})
+            rate = f"{rows / seconds:,.0f}" if rows and seconds else ''
+            print(f"  {stage:<20} {seconds:>9.3f} {rate:>11}"
+                  f" {'' if base is None else f'{base:.3f}':>9}"
+                  f" {'' if ratio is None else f'{ratio:.2f}x':>6}{flag}")
+        results.append({**run_info, 'rows': rows, 'records': result['records'],
+                        'timings': {k: round(v, 4) for k, v in result['timings'].items()}})
+
+    if record:
+        os.makedirs(os.path.dirname(history_path) or '.', exist_ok=True)
+        with open(history_path, 'a') as f:
+            for r in results:
+                f.write(json.dumps(r) + '\n')
+        print(f"\n[benchmark] Appended {len(results)} result(s) to {history_path}")
+    if regressions:
+        print(f"[benchmark] {len(regressions)} regression(s) vs median of last {HISTORY_WINDOW} runs")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Curation benchmark suite")
+    parser.add_argument("--sizes", default="0,10k,100k",
+                        help="Comma-separated sizes, e.g. 10k,100k,1m (0 = CLI startup)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--history", default=HISTORY_FILE)
+    parser.add_argument("--no-record", action="store_true", help="Don't append to the history file")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    sizes = [parse_size(s) for s in args.sizes.split(',') if s.strip()]
+    regressions = run_benchmarks(sizes, args.seed, args.history, record=not args.no_record)
+    if regressions and args.fail_on_regression:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
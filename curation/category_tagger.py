@@ -2,15 +2,22 @@
 Category Tagger v2: Assigns categories using bio + website metadata.
 Only runs on final YES vendors. Uses DeepSeek with improved prompt.
 """
+from __future__ import annotations
+
 import json
 import time
-import requests
-import pandas as pd
+from . import config
 from .config import (
-    DEEPSEEK_API_KEY, DEEPSEEK_API_URL, DEEPSEEK_MODEL,
+    DEEPSEEK_API_URL, DEEPSEEK_MODEL,
     LLM_MAX_RETRIES, LLM_RETRY_DELAY, LLM_TIMEOUT,
     CATEGORIES,
 )
+from .metrics import record
+from .ratelimit import throttle
+from .lazy import lazy_import
+
+pd = lazy_import("pandas")
+requests = lazy_import("requests")
 
 SYSTEM_PROMPT = f"""You categorize festival vendors. Assign 1-2 categories from this EXACT list:
 {json.dumps(CATEGORIES)}
@@ -57,7 +64,7 @@ def _format_vendor(row: pd.Series) -> str:
 
 def _call_deepseek(vendors_text: str) -> list[dict]:
     headers = {
-        "Authorization": f"Bearer {DEEPSEEK_API_KEY}",
+        "Authorization": f"Bearer {config.DEEPSEEK_API_KEY}",
         "Content-Type": "application/json",
     }
     payload = {
@@ -71,9 +78,14 @@ def _call_deepseek(vendors_text: str) -> list[dict]:
     }
     for attempt in range(LLM_MAX_RETRIES):
         try:
+            throttle()
+            record(api_calls=1)
             resp = requests.post(DEEPSEEK_API_URL, headers=headers, json=payload, timeout=LLM_TIMEOUT)
             resp.raise_for_status()
-            content = resp.json()['choices'][0]['message']['content'].strip()
+            body = resp.json()
+            usage = body.get('usage', {})
+            record(tokens_in=usage.get('prompt_tokens', 0), tokens_out=usage.get('completion_tokens', 0))
+            content = body['choices'][0]['message']['content'].strip()
             if content.startswith('```'):
                 content = content.split('\n', 1)[1] if '\n' in content else content[3:]
             if content.endswith('```'):
@@ -83,10 +95,26 @@ def _call_deepseek(vendors_text: str) -> list[dict]:
         except Exception as e:
             print(f"  [categorizer] Error (attempt {attempt+1}): {e}")
             if attempt < LLM_MAX_RETRIES - 1:
+                record(retries=1)
                 time.sleep(LLM_RETRY_DELAY * (2 ** attempt))
     return []
 
 
+def tag_batch(batch: pd.DataFrame) -> dict:
+    """Categorize one batch with a single API call. Returns {username: {'categories', 'tags'}}."""
+    text = "\n".join(f"{i+1}. {_format_vendor(row)}" for i, (_, row) in enumerate(batch.iterrows()))
+    results = _call_deepseek(text)
+
+    rmap = {}
+    for r in results:
+        u = r.get('username', '').lower().lstrip('@')
+        cats = [c for c in r.get('categories', []) if c in CATEGORIES] or ['Other Handmade']
+        tags = r.get('tags', [])[:5]
+        rmap[u] = {'categories': cats, 'tags': tags}
+
+    return {u: rmap.get(u, {'categories': ['Other Handmade'], 'tags': []}) for u in batch['username']}
+
+
 def run_category_tagger(df: pd.DataFrame, batch_size: int = 10) -> pd.DataFrame:
     df = df.copy()
     
@@ -94,7 +122,13 @@ def run_category_tagger(df: pd.DataFrame, batch_size: int = 10) -> pd.DataFrame:
     df['categories'] = df.get('categories', pd.Series([''] * len(df))).astype(str).fillna('')
     df['vendor_tags'] = df.get('vendor_tags', pd.Series([''] * len(df))).astype(str).fillna('')
 
-    curated = df[df['final_classification'] == 'yes']
+    # Vendors already tagged (e.g. carried forward from a checkpoint) are kept as-is
+    approved = df['final_classification'] == 'yes'
+    untagged = df['categories'].isin(['', 'nan'])
+    curated = df[approved & untagged]
+    record(cache_hits=int((approved & ~untagged).sum()), cache_misses=len(curated))
+    if (approved & ~untagged).any():
+        print(f"[category_tagger v2] Reusing tags for {(approved & ~untagged).sum()} vendors")
     if len(curated) == 0:
         print("[category_tagger v2] No vendors to categorize")
         return df
@@ -105,19 +139,7 @@ def run_category_tagger(df: pd.DataFrame, batch_size: int = 10) -> pd.DataFrame:
 
     for bi, batch in enumerate(batches):
         print(f"  Batch {bi+1}/{len(batches)}...")
-        text = "\n".join(f"{i+1}. {_format_vendor(row)}" for i, (_, row) in enumerate(batch.iterrows()))
-        results = _call_deepseek(text)
-
-        rmap = {}
-        for r in results:
-            u = r.get('username', '').lower().lstrip('@')
-            cats = [c for c in r.get('categories', []) if c in CATEGORIES] or ['Other Handmade']
-            tags = r.get('tags', [])[:5]
-            rmap[u] = {'categories': cats, 'tags': tags}
-
-        for _, row in batch.iterrows():
-            u = row['username']
-            data = rmap.get(u, {'categories': ['Other Handmade'], 'tags': []})
+        for u, data in tag_batch(batch).items():
             df.loc[df['username'] == u, 'categories'] = json.dumps(data['categories'])
             df.loc[df['username'] == u, 'vendor_tags'] = json.dumps(data['tags'])
 
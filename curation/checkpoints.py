@@ -0,0 +1,164 @@
+"""
+Parquet checkpoints between pipeline stages.
+
+Each stage (loaded → rules → llm → tagged) writes its DataFrame to
+`<output_dir>/checkpoints/<stage>.parquet` together with a fingerprint of
+its inputs and the config it depends on. On the next run the orchestrator
+reuses any stage whose fingerprint still matches, so editing e.g.
+LLM_YES_THRESHOLD only re-runs the (cheap) validation gate.
+
+Fingerprints chain: each stage's fingerprint includes the previous one, so
+a changed input CSV invalidates everything downstream.
+
+Columns holding dicts/lists/mixed values (signals, rules_reasons, the LLM
+verdict columns with pd.NA) are stored as JSON text so they round-trip
+exactly; pure-string and typed columns are stored natively.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from datetime import datetime
+
+from . import config
+from .lazy import lazy_import
+from .metrics import record
+
+pd = lazy_import("pandas")
+
+CHECKPOINT_DIR = "checkpoints"
+MANIFEST_FILE = "manifest.json"
+STAGES = ['loaded', 'rules', 'llm', 'tagged']
+
+
+def fingerprint(*parts) -> str:
+    """Stable short hash of JSON-serializable parts."""
+    blob = json.dumps(parts, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha256(blob).hexdigest()[:16]
+
+
+def file_fingerprint(path: str) -> str:
+    """Content hash of an input file."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def config_fingerprint(*names: str) -> str:
+    """Fingerprint of the named values in curation/config.py."""
+    return fingerprint({name: getattr(config, name) for name in names})
+
+
+def _checkpoint_dir(output_dir: str) -> str:
+    return os.path.join(output_dir, CHECKPOINT_DIR)
+
+
+def _load_manifest(output_dir: str) -> dict:
+    path = os.path.join(_checkpoint_dir(output_dir), MANIFEST_FILE)
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            return json.load(f)
+    return {}
+
+
+def _save_manifest(output_dir: str, manifest: dict):
+    path = os.path.join(_checkpoint_dir(output_dir), MANIFEST_FILE)
+    with open(path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+
+def _json_columns(df: pd.DataFrame) -> list[str]:
+    """Object columns that are not plain strings (dicts, lists, bools/floats with NA)."""
+    cols = []
+    for col in df.columns:
+        if df[col].dtype == object:
+            kind = pd.api.types.infer_dtype(df[col], skipna=False)
+            if kind not in ('string', 'empty'):
+                cols.append(col)
+    return cols
+
+
+def _encode(value):
+    if value is pd.NA or (isinstance(value, float) and pd.isna(value)):
+        return None
+    return value
+
+
+def checkpoint_info(output_dir: str, stage: str) -> dict:
+    """Manifest entry for a stage ({} if it has never been written)."""
+    return _load_manifest(output_dir).get(stage, {})
+
+
+def save_checkpoint(df: pd.DataFrame, output_dir: str, stage: str, fp: str, meta: dict = None):
+    """Write a stage checkpoint and record its fingerprint (plus `meta`) in the manifest."""
+    os.makedirs(_checkpoint_dir(output_dir), exist_ok=True)
+    json_cols = _json_columns(df)
+    out = df.copy()
+    for col in json_cols:
+        out[col] = [json.dumps(_encode(v), default=str) for v in out[col]]
+    out.to_parquet(os.path.join(_checkpoint_dir(output_dir), f"{stage}.parquet"), index=False)
+
+    manifest = _load_manifest(output_dir)
+    manifest[stage] = {
+        'fingerprint': fp,
+        'rows': len(df),
+        'json_columns': json_cols,
+        'written_at': datetime.now().isoformat(timespec='seconds'),
+        **(meta or {}),
+    }
+    _save_manifest(output_dir, manifest)
+
+
+def load_checkpoint(output_dir: str, stage: str, fp: str = None):
+    """
+    Load a stage checkpoint. Returns None when it is missing or, if `fp`
+    is given, when its fingerprint does not match.
+    """
+    entry = _load_manifest(output_dir).get(stage)
+    path = os.path.join(_checkpoint_dir(output_dir), f"{stage}.parquet")
+    if not entry or not os.path.exists(path):
+        return None
+    if fp is not None and entry.get('fingerprint') != fp:
+        return None
+
+    df = pd.read_parquet(path)
+    for col in entry.get('json_columns', []):
+        decoded = [json.loads(v) for v in df[col]]
+        df[col] = pd.Series([pd.NA if v is None else v for v in decoded], index=df.index, dtype=object)
+    return df
+
+
+def run_stage(output_dir: str, stage: str, fp: str, build, enabled: bool = True,
+              meta: dict = None, complete=None) -> pd.DataFrame:
+    """
+    Reuse the `stage` checkpoint if its fingerprint matches, else build and save it.
+    With `complete`, a frame for which complete(df) is false (e.g. LLM batches
+    failed) is neither saved nor reused, so the next run builds it again.
+    """
+    if enabled:
+        df = load_checkpoint(output_dir, stage, fp)
+        if df is not None and (complete is None or complete(df)):
+            print(f"  [checkpoint] {stage}: reusing {len(df)} records ({fp})")
+            record(checkpoint_hits=1)
+            return df
+    df = build()
+    if enabled:
+        if complete is None or complete(df):
+            save_checkpoint(df, output_dir, stage, fp, meta)
+        else:
+            print(f"  [checkpoint] {stage}: incomplete, not saved (re-run to retry)")
+    return df
+
+
+def clear_checkpoints(output_dir: str) -> bool:
+    """Delete all stage checkpoints. Returns True if anything was removed."""
+    ckpt_dir = _checkpoint_dir(output_dir)
+    if not os.path.isdir(ckpt_dir):
+        return False
+    for name in os.listdir(ckpt_dir):
+        os.remove(os.path.join(ckpt_dir, name))
+    os.rmdir(ckpt_dir)
+    return True
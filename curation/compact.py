@@ -0,0 +1,128 @@
+"""
+Compact memory layout for the curation DataFrame (opt-in via --compact).
+
+The default loader keeps every text column as Python-object strings and the
+rules engine attaches a dict (`signals`) and a list (`rules_reasons`) to every
+row. On large crawls that dominates memory. This module converts the frame to:
+  - Arrow-backed string columns (when pyarrow is installed)
+  - categorical domain / url_type / rules_classification
+  - narrow integer dtypes for followers / following / posts
+  - `signals` flattened into typed columns, `rules_reasons` joined into text
+
+Downstream stages read signals through `row_signals()`, which accepts either
+layout, so the compact frame flows through LLM curation and tagging unchanged.
+"""
+from __future__ import annotations
+
+import importlib.util
+import json
+import resource
+import sys
+
+from .lazy import lazy_import
+
+pd = lazy_import("pandas")
+
+# Checked without importing pyarrow (pandas loads it when the dtype is used)
+STRING_DTYPE = "string[pyarrow]" if importlib.util.find_spec("pyarrow") else None
+
+TEXT_COLUMNS = [
+    'username', 'biography', 'external_url', 'profile_url',
+    'website_description', 'website_title', 'tags', 'all_text',
+    'rules_reasons', 'product_keywords', 'aesthetic_keywords', 'negative_keywords',
+]
+CATEGORY_COLUMNS = ['domain', 'url_type', 'rules_classification']
+INT_COLUMNS = ['followers', 'following', 'posts']
+COUNT_SIGNALS = ['product_signals', 'aesthetic_signals', 'negative_signals', 'personal_signals']
+KEYWORD_SIGNALS = ['product_keywords', 'aesthetic_keywords', 'negative_keywords']
+KEYWORD_SEP = '|'
+REASON_SEP = '; '
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def current_rss_mb():
+    """Current resident set size of this process in MB (None where /proc is unavailable)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * resource.getpagesize() / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def frame_memory_mb(df: pd.DataFrame) -> float:
+    """Deep memory usage of a DataFrame in MB."""
+    return df.memory_usage(deep=True).sum() / (1024 * 1024)
+
+
+def flatten_signals(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Replace the per-row `signals` dicts with typed columns and join
+    `rules_reasons` lists into a single string per row.
+    """
+    if 'signals' not in df.columns:
+        return df
+    df = df.copy()
+    signals = df.pop('signals').tolist()
+
+    for key in COUNT_SIGNALS:
+        df[key] = pd.to_numeric(
+            pd.Series([s.get(key, 0) for s in signals], index=df.index),
+            downcast='integer',
+        )
+    df['url_type'] = pd.Series([s.get('url_type', 'none') for s in signals], index=df.index)
+    for key in KEYWORD_SIGNALS:
+        df[key] = [KEYWORD_SEP.join(s.get(key, [])) for s in signals]
+
+    if 'rules_reasons' in df.columns:
+        df['rules_reasons'] = [REASON_SEP.join(r) for r in df['rules_reasons']]
+    return df
+
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Convert a loaded (or rules-scored) frame to the compact dtypes above."""
+    df = df.copy()
+    if STRING_DTYPE:
+        for col in TEXT_COLUMNS:
+            if col in df.columns:
+                df[col] = df[col].astype(STRING_DTYPE)
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    for col in INT_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+    if 'is_business' in df.columns:
+        df['is_business'] = df['is_business'].astype(bool)
+    return df
+
+
+def row_signals(row: pd.Series) -> dict:
+    """
+    Signals for one row, from either the `signals` dict column (default
+    layout, or its string form after a CSV round-trip) or the flattened
+    columns written by `flatten_signals`.
+    """
+    signals = row.get('signals')
+    if isinstance(signals, dict):
+        return signals
+    if isinstance(signals, str):
+        try:
+            return json.loads(signals.replace("'", '"'))
+        except json.JSONDecodeError:
+            return {}
+    if 'url_type' not in row.index:
+        return {}
+
+    rebuilt = {key: int(row.get(key, 0) or 0) for key in COUNT_SIGNALS}
+    rebuilt['url_type'] = str(row.get('url_type') or 'none')
+    rebuilt['is_business'] = bool(row.get('is_business', False))
+    for key in KEYWORD_SIGNALS:
+        value = row.get(key)
+        rebuilt[key] = value.split(KEYWORD_SEP) if isinstance(value, str) and value else []
+    return rebuilt
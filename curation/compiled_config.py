@@ -0,0 +1,188 @@
+"""
+Compiled rules config: the keyword and domain tables from config.py, built
+once into a versioned artifact and reused by every run and worker.
+
+    python -m curation.compiled_config          # build (or reuse) and describe the artifact
+
+The artifact holds
+  - keyword tables (original + lowercased form, in list order) and, when
+    `pyahocorasick` is installed, one Aho-Corasick automaton over all
+    keyword lists, so a profile's text is scanned once instead of once per
+    keyword
+  - BIG_BRAND_DOMAINS as a hash set, and the substring domain lists
+    (NON_SHOP / SHOP / LINK_AGGREGATOR) as one compiled pattern each; url
+    types are memoized per domain for the life of the process
+  - the config fingerprint (same value config_fingerprint(*RULES_CONFIG)
+    gives, so it keys the rules checkpoint without invalidating old ones)
+
+It is pickled to <COMPILED_CONFIG_DIR>/config-v<version>-<aho|py>-<fingerprint>.pkl;
+editing any rules setting changes the fingerprint and a new file is built
+on first use. compiled_config() loads it once per process; code that edits
+config at runtime calls compiled_config(reload=True). Matching semantics are exactly those of the old per-keyword
+`kw.lower() in text.lower()` / `d in domain` loops.
+"""
+import os
+import pickle
+import re
+
+from . import config
+from .checkpoints import config_fingerprint
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+ARTIFACT_VERSION = 1
+RULES_CONFIG = (
+    'MIN_FOLLOWERS', 'RULES_NO_THRESHOLD',
+    'PRODUCT_KEYWORDS', 'AESTHETIC_KEYWORDS', 'NEGATIVE_KEYWORDS', 'PERSONAL_ACCOUNT_SIGNALS',
+    'BIG_BRAND_DOMAINS', 'NON_SHOP_DOMAINS', 'SHOP_DOMAINS',
+    'SHOP_URL_PATTERNS', 'LINK_AGGREGATOR_DOMAINS',
+)
+KEYWORD_LISTS = ('PRODUCT_KEYWORDS', 'AESTHETIC_KEYWORDS', 'NEGATIVE_KEYWORDS', 'PERSONAL_ACCOUNT_SIGNALS')
+# Checked in this order by the url classifier (first hit wins)
+DOMAIN_LISTS = (('non_shop', 'NON_SHOP_DOMAINS'), ('shop', 'SHOP_DOMAINS'),
+                ('aggregator', 'LINK_AGGREGATOR_DOMAINS'))
+
+
+def _substring_pattern(items):
+    """One regex that finds any of `items` as a substring (None if the list is empty)."""
+    items = [i for i in items if i]
+    return re.compile('|'.join(map(re.escape, items))) if items else None
+
+
+class CompiledConfig:
+    def __init__(self, fingerprint: str = None):
+        self.version = ARTIFACT_VERSION
+        self.fingerprint = fingerprint or config_fingerprint(*RULES_CONFIG)
+        self.keywords = {name: tuple((kw, kw.lower()) for kw in getattr(config, name))
+                         for name in KEYWORD_LISTS}
+        self.big_brands = frozenset(config.BIG_BRAND_DOMAINS)
+        self.domain_patterns = [(url_type, _substring_pattern(getattr(config, name)))
+                                for url_type, name in DOMAIN_LISTS]
+        self.shop_url_patterns = tuple(config.SHOP_URL_PATTERNS)
+        self.automaton = self._build_automaton() if ahocorasick is not None else None
+        self._domain_types = {}
+
+    def _build_automaton(self):
+        """Automaton over every keyword; each word's value lists its (list, position, spelling)."""
+        entries = {}
+        for name, table in self.keywords.items():
+            for position, (kw, low) in enumerate(table):
+                entries.setdefault(low, []).append((name, position, kw))
+        automaton = ahocorasick.Automaton()
+        for low, where in entries.items():
+            if low:
+                automaton.add_word(low, (low, tuple(where)))
+        if not len(automaton):
+            return None
+        automaton.make_automaton()
+        self._empty_keywords = tuple(entries.get('', ()))  # '' is in every non-empty text
+        return automaton
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state['_domain_types'] = {}
+        return state
+
+    # ----------------------------------------------------------------- matching
+
+    def match_keywords(self, text) -> dict:
+        """{list name: matched keywords (original spelling, list order)} for one text."""
+        if not text:
+            return {name: [] for name in self.keywords}
+        lowered = text.lower()
+        if self.automaton is not None:
+            hits = {name: [] for name in self.keywords}
+            found = {low: where for _, (low, where) in self.automaton.iter(lowered)}
+            for where in found.values():
+                for name, position, kw in where:
+                    hits[name].append((position, kw))
+            for name, position, kw in self._empty_keywords:
+                hits[name].append((position, kw))
+            return {name: [kw for _, kw in sorted(h)] if len(h) > 1 else [kw for _, kw in h]
+                    for name, h in hits.items()}
+        return {name: [kw for kw, low in table if low in lowered]
+                for name, table in self.keywords.items()}
+
+    def is_big_brand(self, domain_lower: str) -> bool:
+        return domain_lower in self.big_brands
+
+    def domain_type(self, domain_lower: str):
+        """'non_shop' | 'shop' | 'aggregator' from the domain lists, or None (memoized)."""
+        url_type = self._domain_types.get(domain_lower, False)
+        if url_type is False:
+            url_type = next((t for t, pattern in self.domain_patterns
+                             if pattern is not None and pattern.search(domain_lower)), None)
+            self._domain_types[domain_lower] = url_type
+        return url_type
+
+    def is_shop_url(self, url_lower: str) -> bool:
+        return any(pattern in url_lower for pattern in self.shop_url_patterns)
+
+    def describe(self) -> dict:
+        return {
+            'version': self.version,
+            'fingerprint': self.fingerprint,
+            'keywords': {name: len(table) for name, table in self.keywords.items()},
+            'big_brands': len(self.big_brands),
+            'automaton': self.automaton is not None,
+        }
+
+
+def artifact_path(fingerprint: str, directory: str = None) -> str:
+    flavor = 'aho' if ahocorasick is not None else 'py'
+    return os.path.join(directory or config.COMPILED_CONFIG_DIR,
+                        f"config-v{ARTIFACT_VERSION}-{flavor}-{fingerprint}.pkl")
+
+
+def load_compiled(directory: str = None) -> CompiledConfig:
+    """The artifact for the current config: read from disk, or built and saved."""
+    fp = config_fingerprint(*RULES_CONFIG)
+    path = artifact_path(fp, directory)
+    if os.path.exists(path):
+        try:
+            with open(path, 'rb') as f:
+                compiled = pickle.load(f)
+            if compiled.version == ARTIFACT_VERSION and compiled.fingerprint == fp:
+                return compiled
+        except (OSError, pickle.UnpicklingError, AttributeError, EOFError, ImportError):
+            pass  # stale or unreadable artifact: rebuild below
+
+    compiled = CompiledConfig(fp)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            pickle.dump(compiled, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"  [compiled_config] Could not save {path}: {e}")
+    return compiled
+
+
+_current = None
+
+
+def compiled_config(reload: bool = False) -> CompiledConfig:
+    """
+    This process's compiled config, loaded on first use. The config is not
+    re-fingerprinted per call (that hashes every keyword list); pass
+    reload=True after changing rules settings at runtime.
+    """
+    global _current
+    if _current is None or reload:
+        _current = load_compiled()
+    return _current
+
+
+def main():
+    compiled = load_compiled()
+    print(f"[compiled_config] {artifact_path(compiled.fingerprint)}")
+    for key, value in compiled.describe().items():
+        print(f"  {key:<12} {value}")
+
+
+if __name__ == "__main__":
+    main()
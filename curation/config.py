@@ -12,14 +12,13 @@ KEY CHANGES FROM V1:
 6. Post-LLM validation gate added.
 """
 import os
-from dotenv import load_dotenv
-
-load_dotenv()
 
 # =============================================================================
 # DeepSeek API
 # =============================================================================
-DEEPSEEK_API_KEY = os.getenv("DEEPSEEK_API_KEY", "")
+# DEEPSEEK_API_KEY and DEEPSEEK_RATE_LIMIT come from the environment / .env.
+# The .env file is only read when one of them is first used (see __getattr__
+# at the bottom), so importing the config doesn't cost CLI helpers anything.
 DEEPSEEK_API_URL = "https://api.deepseek.com/v1/chat/completions"
 DEEPSEEK_MODEL = "deepseek-chat"
 LLM_BATCH_SIZE = 5
@@ -205,3 +204,34 @@ CATEGORIES = [
 # Pipeline Settings
 # =============================================================================
 PROGRESS_FILE = "output/pipeline_progress_v2.json"
+# SQLite vendor store (LLM verdicts, vendors, images, scrape results, run history).
+# PROGRESS_FILE above is only read once, to migrate an existing JSON cache.
+STORE_FILE = "output/vendors.db"
+# Run-to-run diff: score moves smaller than this (same verdict, same reason) are not reported
+DIFF_MIN_SCORE_DELTA = 0.05
+# Compiled keyword/domain tables (curation/compiled_config.py), one file per config fingerprint
+COMPILED_CONFIG_DIR = "output/compiled"
+# Fuzzy duplicate vendors (curation/dedup.py): same shop key or username stem,
+# and profile texts at least this similar (estimated Jaccard over shingles)
+DEDUP_MIN_SIMILARITY = 0.7
+# Stripped from usernames before comparing stems ("moonbeads.official" ~ "moonbeads")
+DEDUP_USERNAME_AFFIXES = ['the', 'real', 'its', 'official', 'backup', 'shop', 'store', 'studio', 'designs']
+
+# =============================================================================
+# Environment settings (read on first use)
+# =============================================================================
+_ENV_SETTINGS = {
+    'DEEPSEEK_API_KEY': lambda: os.getenv("DEEPSEEK_API_KEY", ""),
+    # Max DeepSeek calls per minute for this process (0 = unlimited).
+    # Sharded workers each get their own budget (--api-rate).
+    'DEEPSEEK_RATE_LIMIT': lambda: float(os.getenv("DEEPSEEK_RATE_LIMIT", "0") or 0),
+}
+
+
+def __getattr__(name):
+    if name not in _ENV_SETTINGS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from dotenv import load_dotenv
+    load_dotenv()
+    value = globals()[name] = _ENV_SETTINGS[name]()
+    return value
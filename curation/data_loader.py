@@ -2,10 +2,15 @@
 Data loader: CSV ingestion + normalization.
 Handles the messy Instagram scraper output and produces a clean DataFrame.
 """
-import pandas as pd
+from __future__ import annotations
+
 import re
 from urllib.parse import unquote
 
+from .lazy import lazy_import
+
+pd = lazy_import("pandas")
+
 
 def extract_clean_url(raw_url: str) -> str:
     """Extract actual URL from Instagram's redirect wrapper."""
@@ -34,6 +39,27 @@ def extract_domain(url: str) -> str:
     return domain
 
 
+def _join_unique_columns(parts: list, index, sep: str = ' | ') -> pd.Series:
+    """
+    Join several text columns row-wise, skipping empties and values already
+    seen earlier in the same row (first occurrence wins).
+
+    Column-wise equivalent of
+    ``pd.concat(parts, axis=1).apply(lambda row: sep.join(filter(None, row.unique())), axis=1)``
+    without building a Series per row.
+    """
+    joined = pd.Series('', index=index, dtype=object)
+    for i, col in enumerate(parts):
+        col = col.astype(object)
+        keep = col != ''
+        for prev in parts[:i]:
+            keep &= col != prev.astype(object)
+        first = keep & (joined == '')
+        joined = joined.mask(first, col)
+        joined = joined.mask(keep & ~first, joined + sep + col)
+    return joined
+
+
 def load_data(csv_path: str) -> pd.DataFrame:
     """
     Load scraped Instagram CSV and normalize into clean columns.
@@ -133,13 +159,7 @@ def load_data(csv_path: str) -> pd.DataFrame:
         if col in df.columns:
             desc_parts.append(df[col].fillna(''))
 
-    if desc_parts:
-        df['website_description'] = (
-            pd.concat(desc_parts, axis=1)
-            .apply(lambda row: ' | '.join(filter(None, row.unique())), axis=1)
-        )
-    else:
-        df['website_description'] = ''
+    df['website_description'] = _join_unique_columns(desc_parts, index=df.index)
 
     # Website title
     for col in ['websitetitle', 'website_title', 'websiteogtitle']:
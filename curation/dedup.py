@@ -0,0 +1,301 @@
+"""
+Fuzzy duplicate vendors: one shop behind several Instagram accounts.
+
+load_data only drops exact username repeats, but the same vendor often shows
+up as a backup account, a `_name` / `name.official` variant, or a second
+account pointing at the same Etsy shop. Scoring and publishing each copy
+costs LLM calls and shows the vendor twice, so duplicates are clustered
+right after load and only one record per cluster goes on to curation.
+
+  1. Blocking: records are grouped by
+       - shop key: the slug on a hosted platform (etsy.com/<shop>,
+         <shop>.bigcartel.com, linktr.ee/<name>, ...) or the registered
+         domain of their own site
+       - username stem: lowercased, separators, digits and affixes like
+         "official" / "backup" / "shop" removed
+     Only records sharing a block are ever compared.
+  2. Similarity: MinHash signatures over character shingles of each
+     profile's text (bio | website description | title | tags). Records in
+     the same block whose estimated Jaccard similarity is at least
+     DEDUP_MIN_SIMILARITY are duplicates. Large blocks (a shared host) use
+     LSH banding to find candidate pairs instead of comparing every pair.
+  3. Clusters: union-find over duplicate pairs; the record with the most
+     followers (then business accounts, then input order) is kept.
+
+    python -m curation.dedup scraped.csv        # report clusters without running the pipeline
+"""
+from __future__ import annotations
+
+import re
+import sys
+from collections import defaultdict
+from itertools import combinations
+from urllib.parse import urlsplit
+
+from . import config
+from .checkpoints import config_fingerprint
+from .lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+DEDUP_CONFIG = ('DEDUP_MIN_SIMILARITY', 'DEDUP_USERNAME_AFFIXES',
+                'SHOP_DOMAINS', 'LINK_AGGREGATOR_DOMAINS', 'NON_SHOP_DOMAINS')
+NUM_PERM = 64
+LSH_BANDS = 16              # 16 bands x 4 rows: a 0.7-similar pair is a candidate 98.7% of the time
+PAIRWISE_BLOCK_LIMIT = 32   # blocks up to this size compare every pair
+SHINGLE = 5
+MIN_SHINGLES = 16           # shorter texts ("tap in", "austin ✨") say nothing about who wrote them
+# Path segments that come before the shop name on hosted platforms
+SLUG_PREFIXES = {'shop', 'shops', 'store', 'stores', 'people', 'user', 'u', 'c', 'm', 's', 'l'}
+# Second-level labels of country-code registries (shop.co.uk → one domain, not "co.uk")
+SECOND_LEVEL = {'co', 'com', 'org', 'net', 'ac', 'gov'}
+
+
+def dedup_fingerprint() -> str:
+    return config_fingerprint(*DEDUP_CONFIG)
+
+
+# =============================================================================
+# Blocking keys
+# =============================================================================
+
+_platforms = None
+
+
+def _platform_domains():
+    global _platforms
+    if _platforms is None:
+        domains = config.SHOP_DOMAINS + config.LINK_AGGREGATOR_DOMAINS + config.NON_SHOP_DOMAINS
+        _platforms = frozenset(d.lower() for d in domains if d)
+    return _platforms
+
+
+def shop_key(url: str):
+    """'etsy.com/<shop>', '<platform>/<name>' or the site's own registered domain; None if no shop."""
+    if not url:
+        return None
+    parts = urlsplit(url if '://' in url else f"https://{url}")
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if not host or '.' not in host:
+        return None
+    labels = host.split('.')
+    platforms = _platform_domains()
+    if host in platforms:
+        segments = [s for s in parts.path.lower().split('/') if s]
+        while segments and segments[0] in SLUG_PREFIXES:
+            segments.pop(0)
+        slug = segments[0].lstrip('@') if segments else ''
+        return f"{host}/{slug}" if slug else None
+    for n in range(1, len(labels) - 1):
+        platform = '.'.join(labels[n:])
+        if platform in platforms:
+            return f"{platform}/{labels[n - 1]}"
+    if len(labels) > 2 and len(labels[-1]) == 2 and labels[-2] in SECOND_LEVEL:
+        return '.'.join(labels[-3:])
+    return '.'.join(labels[-2:])
+
+
+def username_stem(username: str, affixes=None):
+    """'the_moonstar.official2' → 'moonstar'; None when too little is left to block on."""
+    affixes = config.DEDUP_USERNAME_AFFIXES if affixes is None else affixes
+    words = [w for w in re.split(r'[._\-\d]+', str(username).lower()) if w]
+    while words and words[0] in affixes:
+        words.pop(0)
+    while words and words[-1] in affixes:
+        words.pop()
+    stem = ''.join(words)
+    for affix in affixes:
+        if len(affix) >= 4 and stem.endswith(affix) and len(stem) - len(affix) >= 4:
+            stem = stem[:-len(affix)]
+    return stem if len(stem) >= 4 else None
+
+
+# =============================================================================
+# MinHash
+# =============================================================================
+
+_permutations = None
+
+
+def _hash_params():
+    global _permutations
+    if _permutations is None:
+        # Multiply-shift hashing: h(x) = (a*x + b mod 2**64) >> 32, with a odd
+        rng = np.random.default_rng(0x5EED)
+        a = rng.integers(0, 1 << 63, NUM_PERM, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        b = rng.integers(0, 1 << 63, NUM_PERM, dtype=np.uint64)
+        _permutations = (a[:, None], b[:, None])
+    return _permutations
+
+
+def normalize_text(text) -> bytes:
+    """Lowercased words joined by single spaces, UTF-8 encoded (shingles are byte windows)."""
+    return ' '.join(re.sub(r'[^\w]+', ' ', str(text).lower()).split()).encode('utf-8')
+
+
+def signatures(texts: list, chunk_rows: int = 512):
+    """
+    (len(texts) x NUM_PERM signature matrix, mask of texts long enough to compare).
+
+    Each SHINGLE-byte window is packed into an integer (exact, no string
+    hashing) and the NUM_PERM universal hashes are applied to a whole chunk
+    of texts at once, taking each text's minimum with one reduceat.
+    """
+    a, b = _hash_params()
+    encoded = [normalize_text(t) for t in texts]
+    valid = np.array([len(e) - SHINGLE + 1 >= MIN_SHINGLES for e in encoded], dtype=bool)
+    sigs = np.zeros((len(texts), NUM_PERM), dtype=np.uint32)
+    rows = np.flatnonzero(valid)
+    for lo in range(0, len(rows), chunk_rows):
+        chunk = rows[lo:lo + chunk_rows]
+        buf = np.frombuffer(b''.join(encoded[i] for i in chunk), dtype=np.uint8).astype(np.uint64)
+        lengths = np.array([len(encoded[i]) for i in chunk])
+        ends = np.cumsum(lengths)
+        offsets = ends - lengths
+        # Window starts that stay inside their own text
+        counts = lengths - SHINGLE + 1
+        starts = np.repeat(offsets, counts) + (np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts))
+        packed = buf[starts]
+        for k in range(1, SHINGLE):
+            packed = packed | (buf[starts + k] << np.uint64(8 * k))
+        hashed = ((packed * a + b) >> np.uint64(32)).astype(np.uint32)   # NUM_PERM x windows
+        sigs[chunk] = np.minimum.reduceat(hashed, np.cumsum(counts) - counts, axis=1).T
+    return sigs, valid
+
+
+def minhash(text: str):
+    """NUM_PERM-value MinHash signature of one text (None if too short to compare)."""
+    sigs, valid = signatures([text])
+    return sigs[0] if valid[0] else None
+
+
+def similarity(sig_a, sig_b) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return float((sig_a == sig_b).mean())
+
+
+# =============================================================================
+# Clustering
+# =============================================================================
+
+def _candidate_pairs(members: list, sigs):
+    """Pairs to compare within a block: all of them, or LSH band collisions for big blocks."""
+    if len(members) <= PAIRWISE_BLOCK_LIMIT:
+        return combinations(members, 2)
+    members = np.asarray(members)
+    rows = NUM_PERM // LSH_BANDS
+    bands = sigs[members].reshape(len(members), LSH_BANDS, rows)
+    # One integer per band (wrapping overflow only adds candidates, which are verified anyway)
+    keys = bands[:, :, 0].astype(np.uint64)
+    for r in range(1, rows):
+        keys = keys * np.uint64(0x9E3779B97F4A7C15) + bands[:, :, r]
+    pairs = set()
+    for band in range(LSH_BANDS):
+        order = np.argsort(keys[:, band], kind='stable')
+        ordered = keys[order, band]
+        edges = np.flatnonzero(np.diff(ordered)) + 1
+        starts = np.concatenate(([0], edges))
+        sizes = np.diff(np.concatenate((starts, [len(order)])))
+        for start, size in zip(starts[sizes > 1].tolist(), sizes[sizes > 1].tolist()):
+            bucket = np.sort(members[order[start:start + size]])
+            pairs.update(combinations(bucket.tolist(), 2))
+    return sorted(pairs)
+
+
+def _find(parent: list, i: int) -> int:
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def find_duplicates(df: pd.DataFrame, min_similarity: float = None) -> pd.DataFrame:
+    """
+    One row per duplicate record: position (index into df), username,
+    duplicate_of (username kept for its cluster), similarity to the record
+    it matched and the block key they shared.
+    """
+    min_similarity = config.DEDUP_MIN_SIMILARITY if min_similarity is None else min_similarity
+    columns = ['position', 'username', 'duplicate_of', 'similarity', 'key']
+    if len(df) < 2:
+        return pd.DataFrame(columns=columns)
+
+    blocks = defaultdict(list)
+    for i, (url, username) in enumerate(zip(df['external_url'].tolist(), df['username'].tolist())):
+        key = shop_key(url)
+        if key:
+            blocks['shop:' + key].append(i)
+        stem = username_stem(username)
+        if stem:
+            blocks['user:' + stem].append(i)
+    blocks = {key: members for key, members in blocks.items() if len(members) > 1}
+
+    in_block = sorted({i for members in blocks.values() for i in members})
+    sigs = np.zeros((len(df), NUM_PERM), dtype=np.uint32)
+    valid = np.zeros(len(df), dtype=bool)
+    if in_block:
+        texts = df['all_text'].tolist()
+        sigs[in_block], valid[in_block] = signatures([texts[i] for i in in_block])
+
+    parent = list(range(len(df)))
+    matched = {}
+    for key, members in blocks.items():
+        members = [i for i in members if valid[i]]
+        for i, j in _candidate_pairs(members, sigs):
+            score = similarity(sigs[i], sigs[j])
+            if score >= min_similarity:
+                root_i, root_j = _find(parent, i), _find(parent, j)
+                if root_i != root_j:
+                    parent[max(root_i, root_j)] = min(root_i, root_j)
+                for k in (i, j):
+                    if score > matched.get(k, (0.0, ''))[0]:
+                        matched[k] = (score, key)
+
+    clusters = defaultdict(list)
+    for i in matched:
+        clusters[_find(parent, i)].append(i)
+
+    followers = df['followers'].tolist()
+    business = df['is_business'].tolist() if 'is_business' in df.columns else [False] * len(df)
+    usernames = df['username'].tolist()
+    rows = []
+    for members in clusters.values():
+        keep = min(members, key=lambda i: (-followers[i], not business[i], i))
+        for i in sorted(members):
+            if i != keep:
+                score, key = matched[i]
+                rows.append((i, usernames[i], usernames[keep], round(score, 3), key))
+    rows.sort()
+    return pd.DataFrame(rows, columns=columns)
+
+
+def drop_duplicates(df: pd.DataFrame, min_similarity: float = None):
+    """(df without fuzzy duplicates, the duplicates report from find_duplicates)."""
+    duplicates = find_duplicates(df, min_similarity)
+    if duplicates.empty:
+        return df, duplicates
+    kept = df.drop(index=df.index[duplicates['position'].to_numpy()]).reset_index(drop=True)
+    return kept, duplicates
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python -m curation.dedup <path_to_csv>")
+        sys.exit(1)
+    from .data_loader import load_data
+    df = load_data(sys.argv[1])
+    duplicates = find_duplicates(df)
+    clusters = duplicates.groupby('duplicate_of', sort=False)
+    print(f"\n[dedup] {len(duplicates)} duplicates in {clusters.ngroups} clusters "
+          f"(min similarity {config.DEDUP_MIN_SIMILARITY})")
+    for kept, group in clusters:
+        print(f"  {kept}")
+        for row in group.itertuples():
+            print(f"    = {row.username:<30} {row.similarity:.2f}  {row.key}")
+
+
+if __name__ == "__main__":
+    main()
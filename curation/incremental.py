@@ -0,0 +1,85 @@
+"""
+Incremental runs: only re-curate profiles that are new or changed.
+
+    python -m curation.run_pipeline --input new_crawl.csv --output output/ \
+        --incremental --previous output/
+
+The previous run's final frame (its `tagged` checkpoint) is diffed against
+the newly loaded input by username and a content hash of the normalized
+profile fields. Unchanged profiles carry their rules/LLM/category results
+forward (with raw profile columns refreshed from the new crawl); only new
+or changed profiles go through rules → LLM → gate → tagging.
+
+Follower counts drift every crawl, so they enter the hash only as "above or
+below MIN_FOLLOWERS" — the one follower fact the rules engine acts on.
+"""
+from __future__ import annotations
+
+from .checkpoints import load_checkpoint, checkpoint_info
+from .config import MIN_FOLLOWERS
+from .lazy import lazy_import
+
+pd = lazy_import("pandas")
+
+HASH_COLUMNS = [
+    'username', 'biography', 'is_business', 'external_url',
+    'website_description', 'website_title', 'tags',
+]
+
+
+def content_hash(df: pd.DataFrame) -> pd.Series:
+    """Per-row hash of the normalized fields that curation decisions depend on."""
+    cols = [c for c in HASH_COLUMNS if c in df.columns]
+    fields = df[cols].astype(str)
+    fields['followers_ok'] = (df['followers'].astype(int) >= MIN_FOLLOWERS).astype(str)
+    return pd.util.hash_pandas_object(fields, index=False)
+
+
+def load_previous(previous_dir: str, results_fp: str):
+    """
+    The previous run's final frame, or None (with the reason printed) when
+    it is missing or was produced with a different curation config.
+    """
+    info = checkpoint_info(previous_dir, 'tagged')
+    if not info:
+        print(f"  [incremental] No previous results in {previous_dir} — processing all records")
+        return None
+    if info.get('results_config') != results_fp:
+        print("  [incremental] Curation config changed since previous run — processing all records")
+        return None
+    return load_checkpoint(previous_dir, 'tagged')
+
+
+def split_changed(df: pd.DataFrame, previous: pd.DataFrame):
+    """
+    Split the new frame into (changed, carried):
+      changed: rows that are new or whose content hash differs — to be curated
+      carried: previous results for unchanged rows, with the loaded columns
+               refreshed from the new frame
+    """
+    new_hash = pd.Series(content_hash(df).values, index=df['username'])
+    old_hash = pd.Series(content_hash(previous).values, index=previous['username'])
+    # REVIEW rows left without a verdict (failed LLM batch) are curated again
+    unscored = (previous['rules_classification'] == 'review') & previous['llm_score'].isna()
+    old_hash = old_hash[~unscored.values]
+    unchanged = new_hash.eq(old_hash.reindex(new_hash.index)).values
+
+    changed = df[~unchanged].reset_index(drop=True)
+
+    fresh = df[unchanged].set_index('username')
+    carried = previous[previous['username'].isin(fresh.index)].set_index('username')
+    carried = carried.reindex(fresh.index)
+    for col in fresh.columns:
+        carried[col] = fresh[col]
+    carried = carried.reset_index()
+
+    return changed, carried
+
+
+def merge_results(processed: pd.DataFrame, carried: pd.DataFrame, order: pd.Series) -> pd.DataFrame:
+    """Combine freshly curated and carried-forward rows in the new input's order."""
+    parts = [p for p in (processed, carried) if len(p)]
+    if not parts:
+        return processed
+    merged = pd.concat(parts, ignore_index=True).set_index('username')
+    return merged.reindex(order.values).reset_index()
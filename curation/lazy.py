@@ -0,0 +1,31 @@
+"""
+Deferred imports for heavy dependencies.
+
+pandas (+ numpy/pyarrow) costs ~0.5s to import and requests ~0.1s, which
+used to be paid by every entry point, including `--help`. Modules bind
+them with `lazy_import` instead:
+
+    pd = lazy_import("pandas")
+
+`pd` is a placeholder module that performs the real import on first
+attribute access, i.e. in the stage that actually touches a DataFrame.
+Modules that do this use `from __future__ import annotations` so their
+`pd.DataFrame` annotations are not evaluated at import time.
+"""
+import importlib.util
+import sys
+
+
+def lazy_import(name: str):
+    """The module `name`, imported on first attribute access (or now if already loaded)."""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
@@ -9,17 +9,30 @@ V2 CHANGES:
 5. Smaller batch size (5 vs 10) for better per-record accuracy
 6. Post-LLM validation gate: shop URL required regardless of score
 """
+from __future__ import annotations
+
 import json
-import os
 import time
-import requests
-import pandas as pd
+from . import config
 from .config import (
-    DEEPSEEK_API_KEY, DEEPSEEK_API_URL, DEEPSEEK_MODEL,
+    DEEPSEEK_API_URL, DEEPSEEK_MODEL,
     LLM_BATCH_SIZE, LLM_MAX_RETRIES, LLM_RETRY_DELAY, LLM_TIMEOUT,
-    LLM_YES_THRESHOLD, PROGRESS_FILE,
+    LLM_YES_THRESHOLD, PROGRESS_FILE, STORE_FILE,
     REQUIRE_SHOP_URL, NON_SHOP_DOMAINS,
 )
+from .compact import row_signals
+from .metrics import record
+from .ratelimit import throttle
+from .store import VendorStore
+from .lazy import lazy_import
+
+pd = lazy_import("pandas")
+requests = lazy_import("requests")
+
+# Bio phrases that count as a purchase path when there is no shop URL
+DM_ORDER_PATTERNS = ['dm for orders', 'dm for custom', 'dm for pricing',
+                     'dm to order', 'dm to purchase', 'message for orders',
+                     'message for custom', 'message to order']
 
 SYSTEM_PROMPT = """You are a strict curator for a HANDMADE TRIPPY FESTIVAL VENDOR directory. You are the final gatekeeper. Only approve vendors you'd personally recommend to someone looking for unique, one-of-a-kind festival gear.
 
@@ -65,12 +78,7 @@ def _format_account_for_prompt(row: pd.Series) -> str:
         parts.append(f"({int(followers):,} followers)")
 
     # Include signal analysis from rules engine
-    signals = row.get('signals', {})
-    if isinstance(signals, str):
-        try:
-            signals = json.loads(signals.replace("'", '"'))
-        except:
-            signals = {}
+    signals = row_signals(row)
 
     if signals.get('is_business'):
         parts.append("[business account]")
@@ -106,11 +114,11 @@ def _format_account_for_prompt(row: pd.Series) -> str:
 
 def _call_deepseek(accounts_text: str) -> list[dict]:
     """Make API call to DeepSeek."""
-    if not DEEPSEEK_API_KEY:
+    if not config.DEEPSEEK_API_KEY:
         raise ValueError("DEEPSEEK_API_KEY not set in .env")
 
     headers = {
-        "Authorization": f"Bearer {DEEPSEEK_API_KEY}",
+        "Authorization": f"Bearer {config.DEEPSEEK_API_KEY}",
         "Content-Type": "application/json",
     }
 
@@ -126,11 +134,16 @@ def _call_deepseek(accounts_text: str) -> list[dict]:
 
     for attempt in range(LLM_MAX_RETRIES):
         try:
+            throttle()
+            record(api_calls=1)
             response = requests.post(
                 DEEPSEEK_API_URL, headers=headers, json=payload, timeout=LLM_TIMEOUT,
             )
             response.raise_for_status()
-            content = response.json()['choices'][0]['message']['content'].strip()
+            body = response.json()
+            usage = body.get('usage', {})
+            record(tokens_in=usage.get('prompt_tokens', 0), tokens_out=usage.get('completion_tokens', 0))
+            content = body['choices'][0]['message']['content'].strip()
 
             # Strip markdown fences
             if content.startswith('```'):
@@ -145,6 +158,7 @@ def _call_deepseek(accounts_text: str) -> list[dict]:
         except requests.exceptions.RequestException as e:
             print(f"  [llm] API error (attempt {attempt+1}/{LLM_MAX_RETRIES}): {e}")
             if attempt < LLM_MAX_RETRIES - 1:
+                record(retries=1)
                 time.sleep(LLM_RETRY_DELAY * (2 ** attempt))
             else:
                 raise
@@ -152,32 +166,38 @@ def _call_deepseek(accounts_text: str) -> list[dict]:
             print(f"  [llm] Parse error (attempt {attempt+1}): {e}")
             print(f"  [llm] Raw content: {content[:200]}")
             if attempt < LLM_MAX_RETRIES - 1:
+                record(retries=1)
                 time.sleep(LLM_RETRY_DELAY)
             else:
                 return []
 
 
-def _load_progress() -> dict:
-    if os.path.exists(PROGRESS_FILE):
-        with open(PROGRESS_FILE, 'r') as f:
-            return json.load(f)
-    return {"scored_usernames": {}}
+def _verdict_store(store_file: str = STORE_FILE) -> VendorStore:
+    store = VendorStore(store_file)
+    migrated = store.import_progress(PROGRESS_FILE)
+    if migrated:
+        print(f"  [llm] Migrated {migrated} cached verdicts from {PROGRESS_FILE} to {store_file}")
+    return store
+
+
+def _load_verdicts(store_file: str = STORE_FILE) -> dict:
+    """All cached LLM verdicts: {username: verdict}."""
+    return _verdict_store(store_file).verdicts()
 
 
-def _save_progress(progress: dict):
-    os.makedirs(os.path.dirname(PROGRESS_FILE), exist_ok=True)
-    with open(PROGRESS_FILE, 'w') as f:
-        json.dump(progress, f)
+def _save_verdicts(verdicts: dict, store_file: str = STORE_FILE):
+    """Cache new verdicts (one batch — only these rows are written)."""
+    _verdict_store(store_file).put_verdicts(verdicts)
+
+
+def forget_scores(usernames, store_file: str = STORE_FILE) -> int:
+    """Drop cached LLM verdicts so these usernames are re-scored. Returns how many were dropped."""
+    return _verdict_store(store_file).forget_verdicts(list(usernames))
 
 
 def _has_real_shop_url(row: pd.Series) -> bool:
     """Check if the account has a real shop URL (not tickets, social media, etc)."""
-    signals = row.get('signals', {})
-    if isinstance(signals, str):
-        try:
-            signals = json.loads(signals.replace("'", '"'))
-        except:
-            signals = {}
+    signals = row_signals(row)
 
     url_type = signals.get('url_type', 'none')
 
@@ -191,19 +211,88 @@ def _has_real_shop_url(row: pd.Series) -> bool:
 
     # Bio says "DM for orders/custom" counts as a purchase path
     bio = str(row.get('biography', '')).lower()
-    dm_patterns = ['dm for orders', 'dm for custom', 'dm for pricing',
-                   'dm to order', 'dm to purchase', 'message for orders',
-                   'message for custom', 'message to order']
-    if any(p in bio for p in dm_patterns):
+    if any(p in bio for p in DM_ORDER_PATTERNS):
         return True
 
     return False
 
 
+def score_batch(batch: pd.DataFrame) -> dict:
+    """
+    Score one batch of REVIEW records with a single API call.
+    Returns {username: verdict} in the progress-cache format; raises if the
+    API call fails after retries.
+    """
+    accounts_text = "\n".join(
+        f"{i+1}. {_format_account_for_prompt(row)}"
+        for i, (_, row) in enumerate(batch.iterrows())
+    )
+    results = _call_deepseek(accounts_text)
+
+    result_map = {}
+    for r in results:
+        uname = r.get('username', '').lower().lstrip('@')
+        result_map[uname] = r
+
+    verdicts = {}
+    for username in batch['username']:
+        r = result_map.get(username, {})
+        verdicts[username] = {
+            'score': float(r.get('score', 0.3)),
+            'reason': r.get('reason', 'not returned by LLM'),
+            'sells_products': r.get('sells_products', False),
+            'has_shop': r.get('has_shop', False),
+            'festival_aesthetic': r.get('festival_aesthetic', False),
+        }
+    return verdicts
+
+
+def gate_rejection(row: pd.Series):
+    """
+    Which hard requirement a scored REVIEW record fails, or None if it
+    passes every gate: 'low_score' | 'no_shop' | 'no_products' | 'non_shop_url'.
+    """
+    llm_score = _llm_score(row)
+
+    # Gate 1: LLM score must meet threshold
+    if llm_score < LLM_YES_THRESHOLD:
+        return 'low_score'
+
+    # Gate 2: Must have a real shop URL
+    if REQUIRE_SHOP_URL and not _has_real_shop_url(row):
+        return 'no_shop'
+
+    # Gate 3: LLM must confirm sells_products=true
+    sells = row.get('sells_products')
+    if not pd.isna(sells) and sells == False:
+        return 'no_products'
+
+    # Gate 4: If URL is non-shop domain, reject regardless
+    if row_signals(row).get('url_type') == 'non_shop':
+        return 'non_shop_url'
+
+    return None
+
+
+def _llm_score(row: pd.Series) -> float:
+    """LLM score for a row; unscored (failed batch) counts as 0."""
+    score = row.get('llm_score', 0)
+    return 0.0 if score is None or pd.isna(score) else float(score)
+
+
 def run_llm_curation(df: pd.DataFrame) -> pd.DataFrame:
     """
     Send all REVIEW records through LLM, then apply validation gate.
     """
+    return apply_validation_gate(run_llm_scoring(df))
+
+
+def run_llm_scoring(df: pd.DataFrame, store_file: str = STORE_FILE) -> pd.DataFrame:
+    """
+    Score all REVIEW records with the LLM (no gate). Rules NOs get their
+    final verdict here; REVIEW records are finalized by apply_validation_gate.
+    Verdicts are cached in (and reused from) the vendor store at store_file.
+    """
     df = df.copy()
     df['llm_score'] = pd.NA
     df['llm_reason'] = ''
@@ -228,11 +317,11 @@ def run_llm_curation(df: pd.DataFrame) -> pd.DataFrame:
 
     print(f"[llm_curator v2] Sending {len(review_df)} records to DeepSeek...")
 
-    # Load progress
-    progress = _load_progress()
-    scored = progress.get("scored_usernames", {})
+    # Load cached verdicts
+    scored = _load_verdicts(store_file)
 
     to_process = review_df[~review_df['username'].isin(scored)]
+    record(cache_hits=len(review_df) - len(to_process), cache_misses=len(to_process))
     if len(review_df) - len(to_process) > 0:
         print(f"  Resuming: {len(review_df) - len(to_process)} cached, {len(to_process)} remaining")
 
@@ -252,54 +341,45 @@ def run_llm_curation(df: pd.DataFrame) -> pd.DataFrame:
     for batch_idx, batch in enumerate(batches):
         print(f"  Batch {batch_idx+1}/{len(batches)} ({len(batch)} records)...")
 
-        accounts_text = "\n".join(
-            f"{i+1}. {_format_account_for_prompt(row)}"
-            for i, (_, row) in enumerate(batch.iterrows())
-        )
-
         try:
-            results = _call_deepseek(accounts_text)
+            verdicts = score_batch(batch)
         except Exception as e:
             print(f"  Batch {batch_idx+1} FAILED: {e}")
             continue
 
-        result_map = {}
-        for r in results:
-            uname = r.get('username', '').lower().lstrip('@')
-            result_map[uname] = r
+        for username, verdict in verdicts.items():
+            mask = df['username'] == username
+            df.loc[mask, 'llm_score'] = verdict['score']
+            df.loc[mask, 'llm_reason'] = verdict['reason']
+            df.loc[mask, 'sells_products'] = verdict['sells_products']
+            df.loc[mask, 'has_shop'] = verdict['has_shop']
+            df.loc[mask, 'festival_aesthetic'] = verdict['festival_aesthetic']
+            scored[username] = verdict
 
-        for _, row in batch.iterrows():
-            username = row['username']
-            r = result_map.get(username, {})
+        _save_verdicts(verdicts, store_file)
 
-            llm_score = float(r.get('score', 0.3))
-            llm_reason = r.get('reason', 'not returned by LLM')
-            sells = r.get('sells_products', False)
-            has_shop = r.get('has_shop', False)
-            aesthetic = r.get('festival_aesthetic', False)
+        if batch_idx < len(batches) - 1:
+            time.sleep(1)
 
-            mask = df['username'] == username
-            df.loc[mask, 'llm_score'] = llm_score
-            df.loc[mask, 'llm_reason'] = llm_reason
-            df.loc[mask, 'sells_products'] = sells
-            df.loc[mask, 'has_shop'] = has_shop
-            df.loc[mask, 'festival_aesthetic'] = aesthetic
+    return df
 
-            scored[username] = {
-                'score': llm_score, 'reason': llm_reason,
-                'sells_products': sells, 'has_shop': has_shop,
-                'festival_aesthetic': aesthetic,
-            }
 
-        progress["scored_usernames"] = scored
-        _save_progress(progress)
+def scoring_complete(df: pd.DataFrame) -> bool:
+    """True if every REVIEW record has an LLM verdict (no batch failed), so the frame can be checkpointed."""
+    return not ((df['rules_classification'] == 'review') & df['llm_score'].isna()).any()
 
-        if batch_idx < len(batches) - 1:
-            time.sleep(1)
 
-    # =========================================================================
-    # VALIDATION GATE — hard requirements AFTER LLM scoring
-    # =========================================================================
+def apply_validation_gate(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    VALIDATION GATE — hard requirements AFTER LLM scoring.
+    Depends only on LLM_YES_THRESHOLD / REQUIRE_SHOP_URL, so it is re-run
+    on every pipeline run even when LLM scores come from a checkpoint.
+    """
+    df = df.copy()
+    review_mask = df['rules_classification'] == 'review'
+    if review_mask.sum() == 0:
+        return df
+
     print(f"\n[validation gate] Applying hard requirements...")
     gate_rejections = {'no_shop': 0, 'low_score': 0, 'no_products': 0, 'non_shop_url': 0}
 
@@ -307,46 +387,17 @@ def run_llm_curation(df: pd.DataFrame) -> pd.DataFrame:
         if row['rules_classification'] == 'no':
             continue  # Already rejected
 
-        llm_score = row.get('llm_score', 0) or 0
-
-        # Gate 1: LLM score must meet threshold
-        if llm_score < LLM_YES_THRESHOLD:
-            df.at[idx, 'final_score'] = float(llm_score)
-            df.at[idx, 'final_classification'] = 'no'
-            gate_rejections['low_score'] += 1
+        rejection = gate_rejection(row)
+        df.at[idx, 'final_score'] = _llm_score(row)
+        if rejection is None:
+            # PASSED ALL GATES
+            df.at[idx, 'final_classification'] = 'yes'
             continue
 
-        # Gate 2: Must have a real shop URL
-        if REQUIRE_SHOP_URL and not _has_real_shop_url(row):
-            df.at[idx, 'final_score'] = float(llm_score)
-            df.at[idx, 'final_classification'] = 'no'
+        df.at[idx, 'final_classification'] = 'no'
+        gate_rejections[rejection] += 1
+        if rejection == 'no_shop':
             df.at[idx, 'llm_reason'] = (row.get('llm_reason', '') + ' | GATE: rejected, no shop URL').strip(' |')
-            gate_rejections['no_shop'] += 1
-            continue
-
-        # Gate 3: LLM must confirm sells_products=true
-        if row.get('sells_products') == False:
-            df.at[idx, 'final_score'] = float(llm_score)
-            df.at[idx, 'final_classification'] = 'no'
-            gate_rejections['no_products'] += 1
-            continue
-
-        # Gate 4: If URL is non-shop domain, reject regardless
-        signals = row.get('signals', {})
-        if isinstance(signals, str):
-            try:
-                signals = json.loads(signals.replace("'", '"'))
-            except:
-                signals = {}
-        if signals.get('url_type') == 'non_shop':
-            df.at[idx, 'final_score'] = float(llm_score)
-            df.at[idx, 'final_classification'] = 'no'
-            gate_rejections['non_shop_url'] += 1
-            continue
-
-        # PASSED ALL GATES
-        df.at[idx, 'final_score'] = float(llm_score)
-        df.at[idx, 'final_classification'] = 'yes'
 
     # Stats
     final_yes = (df['final_classification'] == 'yes').sum()
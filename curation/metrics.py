@@ -0,0 +1,146 @@
+"""
+Run instrumentation: per-stage timing, throughput, memory and API counters.
+
+run_pipeline wraps each stage in `RunMetrics.stage(...)` and writes the
+result to `<output_dir>/run_metrics.json`:
+
+    {"stages": {"rules": {"wall_s": ..., "cpu_s": ..., "records": ...,
+                          "records_per_s": ..., "rss_delta_mb": ...,
+                          "process_peak_rss_mb": ...,
+                          "api_calls": ..., "retries": ...,
+                          "tokens_in": ..., "tokens_out": ...,
+                          "cache_hits": ..., "cache_misses": ...,
+                          "cache_hit_rate": ..., "checkpoint_hits": ...}, ...},
+     "totals": {...}, "summary": {...}}
+
+rss_delta_mb is how much the process's resident memory grew (or shrank)
+over the stage; process_peak_rss_mb is the process-lifetime peak when the
+stage ended, so it only moves on stages that set a new high.
+
+API/cache counters are module-level so the LLM stages can record them
+without threading a metrics object through every call (`record(...)`).
+
+With profile_dir set (--profile), each stage also runs under cProfile
+(`profile_<stage>.prof`, open with `python -m pstats`) and tracemalloc, so
+the stage entry gains `tracemalloc_peak_mb`. Both are off by default
+because tracemalloc slows allocation-heavy pandas code noticeably.
+"""
+import cProfile
+import json
+import os
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+from .compact import peak_rss_mb, current_rss_mb
+
+COUNTER_KEYS = [
+    'api_calls', 'retries', 'tokens_in', 'tokens_out',
+    'cache_hits', 'cache_misses', 'checkpoint_hits',
+]
+
+_counters = Counter()
+
+
+def record(**counts):
+    """Add to the global API/cache counters, e.g. record(api_calls=1, tokens_in=812)."""
+    _counters.update({k: v for k, v in counts.items() if v})
+
+
+def counters() -> dict:
+    return {key: _counters.get(key, 0) for key in COUNTER_KEYS}
+
+
+class RunMetrics:
+    def __init__(self, profile_dir: str = None):
+        self.profile_dir = profile_dir
+        self.stages = {}
+        self.started = datetime.now()
+        self._t0 = time.perf_counter()
+        self._cpu0 = time.process_time()
+        self._counters0 = counters()
+
+    @contextmanager
+    def stage(self, name: str, records: int = None):
+        """Measure one stage. `records` may also be set later via set_records()."""
+        before = counters()
+        wall0, cpu0 = time.perf_counter(), time.process_time()
+        rss0 = current_rss_mb()
+        profiler = None
+        if self.profile_dir:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            tracemalloc.start()
+            profiler = cProfile.Profile()
+            profiler.enable()
+        entry = self.stages.setdefault(name, {})
+        if records is not None:
+            entry['records'] = records
+        try:
+            yield entry
+        finally:
+            wall = time.perf_counter() - wall0
+            cpu = time.process_time() - cpu0
+            if profiler:
+                profiler.disable()
+                profiler.dump_stats(os.path.join(self.profile_dir, f"profile_{name}.prof"))
+                entry['tracemalloc_peak_mb'] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+                tracemalloc.stop()
+            after = counters()
+            entry['wall_s'] = round(entry.get('wall_s', 0) + wall, 4)
+            entry['cpu_s'] = round(entry.get('cpu_s', 0) + cpu, 4)
+            rss = current_rss_mb()
+            if rss is not None and rss0 is not None:
+                entry['rss_delta_mb'] = round(entry.get('rss_delta_mb', 0) + rss - rss0, 1)
+            entry['process_peak_rss_mb'] = round(peak_rss_mb(), 1)
+            for key in COUNTER_KEYS:
+                entry[key] = entry.get(key, 0) + after[key] - before[key]
+            self._derive(entry)
+
+    def set_records(self, name: str, records: int):
+        entry = self.stages.setdefault(name, {})
+        entry['records'] = records
+        self._derive(entry)
+
+    @staticmethod
+    def _derive(entry: dict):
+        if entry.get('records') is not None and entry.get('wall_s'):
+            entry['records_per_s'] = round(entry['records'] / entry['wall_s'], 1)
+        lookups = entry.get('cache_hits', 0) + entry.get('cache_misses', 0)
+        if lookups:
+            entry['cache_hit_rate'] = round(entry['cache_hits'] / lookups, 3)
+
+    def totals(self) -> dict:
+        now = counters()
+        totals = {
+            'wall_s': round(time.perf_counter() - self._t0, 3),
+            'cpu_s': round(time.process_time() - self._cpu0, 3),
+            'process_peak_rss_mb': round(peak_rss_mb(), 1),
+        }
+        for key in COUNTER_KEYS:
+            totals[key] = now[key] - self._counters0[key]
+        lookups = totals['cache_hits'] + totals['cache_misses']
+        if lookups:
+            totals['cache_hit_rate'] = round(totals['cache_hits'] / lookups, 3)
+        return totals
+
+    def write(self, path: str, **summary) -> dict:
+        """Write run_metrics.json and return its contents."""
+        data = {
+            'started_at': self.started.isoformat(timespec='seconds'),
+            'stages': self.stages,
+            'totals': self.totals(),
+            'summary': summary,
+        }
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2, default=str)
+        return data
+
+    def print_table(self):
+        print(f"  {'stage':<10} {'wall':>8} {'cpu':>8} {'records':>9} {'rec/s':>10} {'api':>5} {'cache':>6}")
+        for name, e in self.stages.items():
+            rate = e.get('cache_hit_rate')
+            print(f"  {name:<10} {e.get('wall_s', 0):>7.2f}s {e.get('cpu_s', 0):>7.2f}s"
+                  f" {e.get('records', ''):>9} {e.get('records_per_s', ''):>10}"
+                  f" {e.get('api_calls', 0):>5} {'' if rate is None else f'{rate:.0%}':>6}")
@@ -0,0 +1,51 @@
+"""
+Per-process DeepSeek request budget.
+
+Both API clients call `throttle()` before every request. With a budget of
+N calls/minute, calls are spaced at least 60/N seconds apart (shared across
+threads, so --stream's LLM and tagger stages draw from the same budget).
+Each sharded worker process sets its own budget, which keeps a fleet of
+workers under the account-wide rate limit.
+
+Default comes from DEEPSEEK_RATE_LIMIT (0 = unlimited).
+"""
+import threading
+import time
+
+from . import config
+
+_lock = threading.Lock()
+_interval = None  # unset: DEEPSEEK_RATE_LIMIT on first use
+_next_at = 0.0
+
+
+def set_api_rate(calls_per_minute: float):
+    """Set this process's budget in calls/minute (0 or None = unlimited)."""
+    global _interval
+    _interval = 60.0 / calls_per_minute if calls_per_minute else 0.0
+
+
+def _current_interval() -> float:
+    if _interval is None:
+        set_api_rate(config.DEEPSEEK_RATE_LIMIT)
+    return _interval
+
+
+def api_rate() -> float:
+    """Current budget in calls/minute (0 = unlimited)."""
+    interval = _current_interval()
+    return 60.0 / interval if interval else 0.0
+
+
+def throttle():
+    """Block until the next API call fits in the budget."""
+    global _next_at
+    interval = _current_interval()
+    if not interval:
+        return
+    with _lock:
+        now = time.monotonic()
+        wait = _next_at - now
+        _next_at = max(now, _next_at) + interval
+    if wait > 0:
+        time.sleep(wait)
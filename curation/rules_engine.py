@@ -16,29 +16,21 @@ Also computes a "signal strength" score that helps the LLM:
   - negative_signals: count of disqualifying keywords
   - has_shop_url: boolean
   - url_type: "shop" | "aggregator" | "non_shop" | "own_domain" | "none"
+
+Keyword and domain lookups go through the compiled config artifact
+(curation/compiled_config.py) instead of re-walking the config lists.
 """
-import pandas as pd
+from __future__ import annotations
+
 import re
-from .config import (
-    MIN_FOLLOWERS,
-    RULES_NO_THRESHOLD,
-    PRODUCT_KEYWORDS, AESTHETIC_KEYWORDS, NEGATIVE_KEYWORDS,
-    PERSONAL_ACCOUNT_SIGNALS,
-    BIG_BRAND_DOMAINS, NON_SHOP_DOMAINS, SHOP_DOMAINS,
-    SHOP_URL_PATTERNS, LINK_AGGREGATOR_DOMAINS,
-)
-
-
-def _count_keyword_matches(text: str, keywords: list[str]) -> tuple[int, list[str]]:
-    """Count keyword matches, return count and which keywords matched."""
-    if not text:
-        return 0, []
-    text_lower = text.lower()
-    matched = [kw for kw in keywords if kw.lower() in text_lower]
-    return len(matched), matched
-
-
-def _classify_url(url: str, domain: str) -> str:
+from .config import MIN_FOLLOWERS, RULES_NO_THRESHOLD
+from .compiled_config import CompiledConfig, compiled_config
+from .lazy import lazy_import
+
+pd = lazy_import("pandas")
+
+
+def _classify_url(url: str, domain: str, compiled: CompiledConfig) -> str:
     """
     Classify a URL into: shop | aggregator | non_shop | own_domain | none
     This is critical — v1 treated all URLs the same, which was wrong.
@@ -47,30 +39,19 @@ def _classify_url(url: str, domain: str) -> str:
         return "none"
 
     domain_lower = (domain or "").lower().strip()
-    url_lower = url.lower()
-
-    # Check known non-shop domains first (tickets, social media, payment)
-    for nsd in NON_SHOP_DOMAINS:
-        if nsd in domain_lower:
-            return "non_shop"
-
-    # Check known shop domains
-    for sd in SHOP_DOMAINS:
-        if sd in domain_lower:
-            return "shop"
 
-    # Check link aggregators
-    for la in LINK_AGGREGATOR_DOMAINS:
-        if la in domain_lower:
-            return "aggregator"
+    # Known non-shop domains first (tickets, social media, payment), then
+    # shop domains, then link aggregators
+    url_type = compiled.domain_type(domain_lower)
+    if url_type:
+        return url_type
 
     # Check URL patterns that suggest a shop
-    for pattern in SHOP_URL_PATTERNS:
-        if pattern in url_lower:
-            return "shop"
+    if compiled.is_shop_url(url.lower()):
+        return "shop"
 
     # Known big brand
-    if domain_lower in BIG_BRAND_DOMAINS:
+    if compiled.is_big_brand(domain_lower):
         return "non_shop"
 
     # Has their own domain — likely a real business
@@ -80,7 +61,7 @@ def _classify_url(url: str, domain: str) -> str:
     return "own_domain"  # fallback if URL exists
 
 
-def score_record(row: pd.Series) -> dict:
+def score_record(row: pd.Series, compiled: CompiledConfig = None) -> dict:
     """
     Score a single record. Returns:
       - classification: "no" or "review"
@@ -97,15 +78,19 @@ def score_record(row: pd.Series) -> dict:
     is_business = row.get('is_business', False)
 
     reasons = []
+    compiled = compiled or compiled_config()
 
     # Classify URL type
-    url_type = _classify_url(external_url, domain)
+    url_type = _classify_url(external_url, domain, compiled)
 
     # Count signal types
-    product_count, product_matched = _count_keyword_matches(all_text, PRODUCT_KEYWORDS)
-    aesthetic_count, aesthetic_matched = _count_keyword_matches(all_text, AESTHETIC_KEYWORDS)
-    negative_count, negative_matched = _count_keyword_matches(all_text, NEGATIVE_KEYWORDS)
-    personal_count, personal_matched = _count_keyword_matches(all_text, PERSONAL_ACCOUNT_SIGNALS)
+    matches = compiled.match_keywords(all_text)
+    product_matched = matches['PRODUCT_KEYWORDS']
+    aesthetic_matched = matches['AESTHETIC_KEYWORDS']
+    negative_matched = matches['NEGATIVE_KEYWORDS']
+    personal_matched = matches['PERSONAL_ACCOUNT_SIGNALS']
+    product_count, aesthetic_count = len(product_matched), len(aesthetic_matched)
+    negative_count, personal_count = len(negative_matched), len(personal_matched)
 
     # Build signals dict (passed to LLM as context)
     signals = {
@@ -125,7 +110,7 @@ def score_record(row: pd.Series) -> dict:
     # =========================================================================
 
     # Known big brand domain
-    if domain.lower() in BIG_BRAND_DOMAINS:
+    if compiled.is_big_brand(domain.lower()):
         return {
             'score': 0.0, 'classification': 'no',
             'reasons': [f'known big brand: {domain}'],
@@ -242,17 +227,24 @@ def score_record(row: pd.Series) -> dict:
     }
 
 
-def run_rules_engine(df: pd.DataFrame) -> pd.DataFrame:
-    """Apply rules engine to entire DataFrame."""
+def score_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Score every record and attach the rules columns (no stats output)."""
+    compiled = compiled_config()
     results = []
     for _, row in df.iterrows():
-        results.append(score_record(row))
+        results.append(score_record(row, compiled))
 
     df = df.copy()
     df['rules_score'] = [r['score'] for r in results]
     df['rules_classification'] = [r['classification'] for r in results]
     df['rules_reasons'] = [r['reasons'] for r in results]
     df['signals'] = [r['signals'] for r in results]
+    return df
+
+
+def run_rules_engine(df: pd.DataFrame) -> pd.DataFrame:
+    """Apply rules engine to entire DataFrame."""
+    df = score_frame(df)
 
     # Stats
     counts = df['rules_classification'].value_counts()
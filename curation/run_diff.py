@@ -0,0 +1,147 @@
+"""
+Run-to-run diff: who flipped, who appeared, whose score or reason moved.
+
+Every pipeline run snapshots one compact row per record into the vendor
+store (run_verdicts: username, final classification, final score, LLM
+reason), keyed by (run_id, username). At the end of the run the snapshot is
+joined against the previous run's for the same output directory and the
+changes are written to the verdict_changes index, so "what changed in run
+N" is a primary-key lookup however big the input is.
+
+Each run also writes, next to its other outputs:
+  run_diff.json       — counts + every changed record (old/new verdict, score, reason)
+  vendors_delta.json  — curated vendors to upsert / usernames to remove, so the
+                        website build can publish only what changed
+
+    python -m curation.run_diff                     # latest run vs the one before it
+    python -m curation.run_diff --from 12 --to 15 --change rejected
+"""
+import argparse
+import json
+import os
+from collections import Counter
+
+from .config import STORE_FILE, DIFF_MIN_SCORE_DELTA
+from .store import VendorStore
+from .writers import iter_vendor_json
+
+CHANGE_KINDS = ('added', 'removed', 'approved', 'rejected', 'reclassified', 'score', 'reason')
+
+
+def verdict_rows(df):
+    """(username, classification, score, reason) per record of a final frame."""
+    reasons = df['llm_reason'].fillna('').astype(str) if 'llm_reason' in df.columns else [''] * len(df)
+    return zip(df['username'].astype(str).tolist(),
+               df['final_classification'].astype(str).tolist(),
+               df['final_score'].astype(float).round(4).tolist(),
+               list(reasons))
+
+
+def previous_run(store: VendorStore, run_id: int, output_dir: str):
+    """Latest earlier curation run into the same output directory that has a snapshot."""
+    target = os.path.abspath(output_dir)
+    for run in store.runs('curation', limit=50):
+        if (run['id'] < run_id and run.get('output_dir')
+                and os.path.abspath(run['output_dir']) == target
+                and store.has_run_verdicts(run['id'])):
+            return run['id']
+    return None
+
+
+def summarize(changes: list[dict]) -> dict:
+    counts = Counter(c['change'] for c in changes)
+    return {kind: counts.get(kind, 0) for kind in CHANGE_KINDS}
+
+
+def write_vendor_delta(df, changes: list[dict], path: str, from_run: int, to_run: int) -> dict:
+    """
+    Curated vendors whose website record changed (upsert) and usernames that
+    left the curated set (remove). Records use the curated_vendors.json encoding.
+    """
+    upsert = {c['username'] for c in changes if c['new_classification'] == 'yes'}
+    remove = sorted(c['username'] for c in changes
+                    if c['old_classification'] == 'yes' and c['new_classification'] != 'yes')
+    curated = df[df['username'].isin(upsert)].sort_values('final_score', ascending=False)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f'{{"from_run":{from_run},"to_run":{to_run},"upsert":[')
+        for i, record in enumerate(iter_vendor_json(curated)):
+            f.write(',\n' if i else '\n')
+            f.write(record)
+        f.write(f'\n],"remove":{json.dumps(remove)}}}\n')
+    return {'upsert': len(curated), 'remove': len(remove)}
+
+
+def record_run_diff(store: VendorStore, run_id: int, df, output_dir: str,
+                    min_delta: float = DIFF_MIN_SCORE_DELTA):
+    """
+    Snapshot this run's verdicts, diff them against the previous run and
+    write run_diff.json / vendors_delta.json. Returns a summary dict, or
+    None when there is no earlier run to compare with.
+    """
+    store.put_run_verdicts(run_id, verdict_rows(df))
+    prev = previous_run(store, run_id, output_dir)
+    if prev is None:
+        return None
+
+    changes = store.diff_run_verdicts(prev, run_id, min_delta)
+    store.put_verdict_changes(run_id, changes)
+    counts = summarize(changes)
+    approved_before = store.run(prev).get('approved')
+    with open(os.path.join(output_dir, "run_diff.json"), 'w') as f:
+        json.dump({'from_run': prev, 'to_run': run_id, 'min_score_delta': min_delta,
+                   'counts': counts, 'changes': changes}, f, indent=2)
+    delta = write_vendor_delta(df, changes, os.path.join(output_dir, "vendors_delta.json"), prev, run_id)
+    return {'diff_from': prev, 'approved_before': approved_before, 'changes': counts, 'delta': delta}
+
+
+def format_changes(changes: list[dict], limit: int = 50) -> list[str]:
+    lines = []
+    for c in changes[:limit]:
+        old = '' if c['old_score'] is None else f"{c['old_classification']} {c['old_score']:.2f}"
+        new = '' if c['new_score'] is None else f"{c['new_classification']} {c['new_score']:.2f}"
+        lines.append(f"  {c['change']:<13} {c['username']:<30} {old:>9} → {new:<9}")
+        if c['change'] == 'reason':
+            lines.append(f"{'':16}{c['old_reason']!r} → {c['new_reason']!r}")
+    if len(changes) > limit:
+        lines.append(f"  ... and {len(changes) - limit} more")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Diff curation verdicts between two runs")
+    parser.add_argument("--db", default=STORE_FILE)
+    parser.add_argument("--from", dest="from_run", type=int, default=None,
+                        help="Older run id (default: the run the newer one was diffed against)")
+    parser.add_argument("--to", dest="to_run", type=int, default=None,
+                        help="Newer run id (default: latest curation run)")
+    parser.add_argument("--change", choices=CHANGE_KINDS, default=None)
+    parser.add_argument("--min-delta", type=float, default=DIFF_MIN_SCORE_DELTA)
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+
+    store = VendorStore(args.db)
+    to_run = args.to_run
+    if to_run is None:
+        to_run = next((r['id'] for r in store.runs('curation') if store.has_run_verdicts(r['id'])), None)
+        if to_run is None:
+            parser.error(f"no curation runs with verdict snapshots in {args.db}")
+    indexed_from = (store.run(to_run) or {}).get('diff_from')
+    from_run = args.from_run if args.from_run is not None else indexed_from
+    if from_run is None:
+        parser.error(f"run {to_run} has no earlier run to compare with; pass --from")
+
+    if from_run == indexed_from and args.min_delta == DIFF_MIN_SCORE_DELTA:
+        changes = store.verdict_changes(to_run, args.change)
+    else:
+        changes = store.diff_run_verdicts(from_run, to_run, args.min_delta)
+        if args.change:
+            changes = [c for c in changes if c['change'] == args.change]
+
+    print(f"Run {from_run} → run {to_run}: "
+          + ", ".join(f"{kind} {n}" for kind, n in summarize(changes).items() if n))
+    for line in format_changes(changes, args.limit):
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,35 +5,177 @@ Usage:
     python -m curation.run_pipeline --input scraped.csv --output output/
     python -m curation.run_pipeline --input scraped.csv --output output/ --skip-llm
     python -m curation.run_pipeline --input scraped.csv --output output/ --full
+    python -m curation.run_pipeline --input scraped.csv --output output/ --compact
+    python -m curation.run_pipeline --input scraped.csv --output output/ --no-checkpoints
+    python -m curation.run_pipeline --input new.csv --output output/ --incremental --previous output/
+    python -m curation.run_pipeline --input scraped.csv --output output/ --profile
+    python -m curation.run_pipeline --input scraped.csv --output output/ --stream
+
+Each stage checkpoints to <output>/checkpoints/ and is skipped on re-runs
+whose input + config fingerprint is unchanged (see curation/checkpoints.py).
+Per-stage timings, throughput, memory and API usage go to <output>/run_metrics.json
+(and the run history in the vendor store, see curation/store.py).
+Each run's verdicts are snapshotted and diffed against the previous run into
+the same output directory: <output>/run_diff.json and vendors_delta.json
+(see curation/run_diff.py).
+--stream overlaps rules, LLM scoring, the gate and category tagging
+(see curation/streaming.py) instead of running them one after another.
+Fuzzy duplicate vendors (backup accounts, the same shop under several
+usernames) are dropped right after load, before anything is scored, and
+listed in <output>/duplicates.csv (see curation/dedup.py; --keep-duplicates
+turns this off).
+For multi-box runs, curation/sharding.py splits the input by username hash
+into a shared work queue that workers drain with their own API budgets.
 """
+from __future__ import annotations
+
 import argparse
-import json
 import os
-import pandas as pd
 from datetime import datetime
 
 from .data_loader import load_data
 from .rules_engine import run_rules_engine
-from .llm_curator import run_llm_curation
+from .llm_curator import run_llm_scoring, apply_validation_gate, forget_scores, scoring_complete
+from . import llm_curator, category_tagger
 from .category_tagger import run_category_tagger
+from .compact import compact_frame, flatten_signals, frame_memory_mb, peak_rss_mb
+from .checkpoints import (
+    fingerprint, file_fingerprint, config_fingerprint,
+    run_stage, load_checkpoint, save_checkpoint, checkpoint_info, clear_checkpoints,
+)
+from .incremental import load_previous, split_changed, merge_results
+from .metrics import RunMetrics, record
+from .streaming import run_streaming_curation
+from .writers import write_curated_vendors
+from .store import VendorStore
+from .run_diff import record_run_diff
+from .compiled_config import RULES_CONFIG, compiled_config
+from .dedup import drop_duplicates, dedup_fingerprint
+from .lazy import lazy_import
 
+pd = lazy_import("pandas")
 
-def run_pipeline(input_csv, output_dir="output", skip_llm=False, skip_categories=False):
-    os.makedirs(output_dir, exist_ok=True)
-    start = datetime.now()
-    print(f"{'='*60}")
-    print(f"Festival Vendor Curation Pipeline v2")
-    print(f"Started: {start.strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"{'='*60}\n")
+LLM_CONFIG = ('DEEPSEEK_MODEL', 'LLM_BATCH_SIZE')
+GATE_CONFIG = ('LLM_YES_THRESHOLD', 'REQUIRE_SHOP_URL', 'REQUIRE_MIN_FOLLOWERS', 'NON_SHOP_DOMAINS')
+TAGGER_CONFIG = ('DEEPSEEK_MODEL', 'CATEGORIES')
 
-    # Step 1: Load
-    print("STEP 1: Loading data...")
+
+def stage_fingerprints(loaded_fp):
+    """Fingerprints for every stage after load, chained from the loaded frame's."""
+    # Stage fingerprints chain: each includes the one before it
+    fps = {'loaded': loaded_fp}
+    fps['rules'] = fingerprint('rules', fps['loaded'], compiled_config().fingerprint)
+    fps['llm'] = fingerprint('llm', fps['rules'], config_fingerprint(*LLM_CONFIG),
+                             llm_curator.SYSTEM_PROMPT, llm_curator.USER_PROMPT_TEMPLATE)
+    tagger_config = (config_fingerprint(*TAGGER_CONFIG),
+                     category_tagger.SYSTEM_PROMPT, category_tagger.USER_PROMPT_TEMPLATE)
+    fps['tagger'] = fingerprint('tagger', fps['loaded'], *tagger_config)
+    fps['tagged'] = fingerprint('tagged', fps['llm'], config_fingerprint(*GATE_CONFIG), fps['tagger'])
+    # Input-independent: everything that decides a record's results
+    fps['results'] = fingerprint(
+        'results', config_fingerprint(*RULES_CONFIG, *LLM_CONFIG, *GATE_CONFIG),
+        llm_curator.SYSTEM_PROMPT, llm_curator.USER_PROMPT_TEMPLATE, *tagger_config,
+    )
+    return fps
+
+
+def _load_stage(input_csv, compact, memory, output_dir=None, dedup=True):
     df = load_data(input_csv)
-    print(f"  {len(df)} records\n")
+    if dedup:
+        df, duplicates = drop_duplicates(df)
+        if output_dir:
+            duplicates.drop(columns='position').to_csv(os.path.join(output_dir, "duplicates.csv"), index=False)
+        print(f"  Fuzzy duplicates: {len(duplicates)} records folded into "
+              f"{duplicates['duplicate_of'].nunique()} vendors")
+    memory['loaded_mb'] = frame_memory_mb(df)
+    if compact:
+        df = compact_frame(df)
+        memory['compact_mb'] = frame_memory_mb(df)
+        print(f"  Compact layout: {memory['loaded_mb']:.1f} MB → {memory['compact_mb']:.1f} MB\n")
+    return df
+
+
+def _rules_stage(df, compact, memory):
+    df = run_rules_engine(df)
+    memory['rules_mb'] = frame_memory_mb(df)
+    if compact:
+        df = compact_frame(flatten_signals(df))
+        memory['rules_compact_mb'] = frame_memory_mb(df)
+    return df
+
+
+def _tag_stage(df, output_dir, tagger_fp, checkpoints):
+    """Tag approved vendors, reusing tags from the last tagged checkpoint when still valid."""
+    if checkpoints and checkpoint_info(output_dir, 'tagged').get('tagger') == tagger_fp:
+        previous = load_checkpoint(output_dir, 'tagged')
+        if previous is not None:
+            known = previous[previous['final_classification'] == 'yes'].set_index('username')
+            approved = df['final_classification'] == 'yes'
+            df = df.copy()
+            for col in ('categories', 'vendor_tags'):
+                carried = df.loc[approved, 'username'].map(known[col]).fillna('')
+                df[col] = ''
+                df.loc[approved, col] = carried
+    return run_category_tagger(df)
+
+
+def _known_tags(output_dir, tagger_fp):
+    """{username: (categories, vendor_tags)} from the last tagged checkpoint, if still valid."""
+    if checkpoint_info(output_dir, 'tagged').get('tagger') != tagger_fp:
+        return {}
+    previous = load_checkpoint(output_dir, 'tagged')
+    if previous is None:
+        return {}
+    known = previous[previous['final_classification'] == 'yes']
+    return dict(zip(known['username'], zip(known['categories'], known['vendor_tags'])))
+
+
+def _stream_curate(df, output_dir, fps, compact, checkpoints, metrics, store_file):
+    """Steps 2-4 as one overlapped stage graph; checkpoints match the sequential path."""
+    print("STEPS 2-4: Streaming rules → LLM → gate → category tagging...")
+    tagged_meta = {'tagger': fps['tagger'], 'results_config': fps['results']}
+    with metrics.stage('stream', len(df)) as entry:
+        if checkpoints:
+            tagged = load_checkpoint(output_dir, 'tagged', fps['tagged'])
+            if tagged is not None and scoring_complete(tagged):
+                print(f"  [checkpoint] tagged: reusing {len(tagged)} records ({fps['tagged']})")
+                record(checkpoint_hits=1)
+                return tagged
+        rules_df = load_checkpoint(output_dir, 'rules', fps['rules']) if checkpoints else None
+        if rules_df is not None:
+            print(f"  [checkpoint] rules: reusing {len(rules_df)} records ({fps['rules']})")
+            record(checkpoint_hits=1)
+        known = _known_tags(output_dir, fps['tagger']) if checkpoints else {}
+
+        rules_df_out, llm_df, df, stats = run_streaming_curation(
+            df, rules_df=rules_df, compact=compact, known_tags=known, store_file=store_file)
+        entry['substages'] = stats
+        if checkpoints:
+            if rules_df is None:
+                save_checkpoint(rules_df_out, output_dir, 'rules', fps['rules'])
+            if scoring_complete(llm_df):
+                save_checkpoint(llm_df, output_dir, 'llm', fps['llm'])
+                save_checkpoint(df, output_dir, 'tagged', fps['tagged'], tagged_meta)
+            else:
+                print("  [checkpoint] llm, tagged: incomplete, not saved (re-run to retry)")
+    return df
+
+
+def _curate(df, output_dir, fps, skip_llm, skip_categories, compact, checkpoints, metrics, stream=False,
+            store_file=None, memory=None):
+    """
+    Steps 2-4: rules → LLM + gate → category tagging. LLM verdicts are cached
+    in store_file; frame sizes before/after compaction go into `memory`.
+    """
+    store_file = store_file or llm_curator.STORE_FILE
+    memory = {} if memory is None else memory
+    if stream and not (skip_llm or skip_categories):
+        return _stream_curate(df, output_dir, fps, compact, checkpoints, metrics, store_file)
 
     # Step 2: Rules (reject obvious NOs)
     print("STEP 2: Rules engine (filtering trash)...")
-    df = run_rules_engine(df)
+    with metrics.stage('rules', len(df)):
+        df = run_stage(output_dir, 'rules', fps['rules'], lambda: _rules_stage(df, compact, memory), checkpoints)
 
     # Step 3: LLM (judge everything that survived)
     if skip_llm:
@@ -47,7 +189,11 @@ def run_pipeline(input_csv, output_dir="output", skip_llm=False, skip_categories
         )
     else:
         print("\nSTEP 3: LLM curation...")
-        df = run_llm_curation(df)
+        with metrics.stage('llm', int((df['rules_classification'] == 'review').sum())):
+            df = run_stage(output_dir, 'llm', fps['llm'], lambda: run_llm_scoring(df, store_file), checkpoints,
+                           complete=scoring_complete)
+        with metrics.stage('gate', len(df)):
+            df = apply_validation_gate(df)
 
     # Step 4: Categories + Tags
     if skip_categories or skip_llm:
@@ -58,44 +204,27 @@ def run_pipeline(input_csv, output_dir="output", skip_llm=False, skip_categories
             df['vendor_tags'] = ''
     else:
         print("\nSTEP 4: Category tagging...")
-        df = run_category_tagger(df)
+        with metrics.stage('tagging', int((df['final_classification'] == 'yes').sum())):
+            df = run_stage(output_dir, 'tagged', fps['tagged'],
+                           lambda: _tag_stage(df, output_dir, fps['tagger'], checkpoints),
+                           checkpoints, meta={'tagger': fps['tagger'], 'results_config': fps['results']},
+                           complete=scoring_complete)
+    return df
 
-    # Save outputs
-    print(f"\n{'='*60}")
-    print("Saving outputs...")
 
+def _write_outputs(df, output_dir, output_format="json"):
+    """
+    Write full_scored.csv, curated vendors (streamed as a JSON array and/or
+    NDJSON) and curated_vendors.csv. Returns the number of curated vendors.
+    """
     # Full CSV (debug/review)
     df.to_csv(os.path.join(output_dir, "full_scored.csv"), index=False)
 
     # Curated JSON (for website)
     curated = df[df['final_classification'] == 'yes'].sort_values('final_score', ascending=False)
-    vendors_list = []
-    for _, row in curated.iterrows():
-        cats = ['Other Handmade']
-        tags = []
-        try: cats = json.loads(row.get('categories', '[]'))
-        except: pass
-        try: tags = json.loads(row.get('vendor_tags', '[]'))
-        except: pass
-
-        vendors_list.append({
-            'username': row['username'],
-            'biography': row.get('biography', ''),
-            'followers': int(row.get('followers', 0)),
-            'is_business': bool(row.get('is_business', False)),
-            'external_url': row.get('external_url', ''),
-            'domain': row.get('domain', ''),
-            'profile_url': row.get('profile_url', ''),
-            'website_title': row.get('website_title', ''),
-            'website_description': row.get('website_description', ''),
-            'confidence_score': float(row.get('final_score', 0)),
-            'categories': cats,
-            'tags': tags,
-            'llm_reason': row.get('llm_reason', ''),
-        })
-
-    with open(os.path.join(output_dir, "curated_vendors.json"), 'w') as f:
-        json.dump(vendors_list, f, indent=2)
+    formats = ['json', 'ndjson'] if output_format == 'both' else [output_format]
+    for fmt in formats:
+        approved = write_curated_vendors(curated, os.path.join(output_dir, f"curated_vendors.{fmt}"), fmt)
 
     # CSV for human review
     review_cols = ['username', 'biography', 'followers', 'external_url', 'domain',
@@ -104,6 +233,68 @@ def run_pipeline(input_csv, output_dir="output", skip_llm=False, skip_categories
                    'final_score', 'final_classification', 'categories', 'vendor_tags']
     review_cols = [c for c in review_cols if c in df.columns]
     curated[review_cols].to_csv(os.path.join(output_dir, "curated_vendors.csv"), index=False)
+    return approved
+
+
+def run_pipeline(input_csv, output_dir="output", skip_llm=False, skip_categories=False,
+                 compact=False, checkpoints=True, incremental=False, previous_dir=None,
+                 profile=False, output_format="json", stream=False, dedup=True):
+    os.makedirs(output_dir, exist_ok=True)
+    start = datetime.now()
+    metrics = RunMetrics(profile_dir=output_dir if profile else None)
+    store = VendorStore(llm_curator.STORE_FILE)
+    run_id = store.start_run('curation', input=input_csv, output_dir=output_dir)
+    print(f"{'='*60}")
+    print(f"Festival Vendor Curation Pipeline v2")
+    print(f"Started: {start.strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"{'='*60}\n")
+
+    fps = stage_fingerprints(fingerprint('loaded', file_fingerprint(input_csv), compact,
+                                         dedup_fingerprint() if dedup else 'keep-duplicates'))
+
+    # Step 1: Load
+    print("STEP 1: Loading data...")
+    memory = {}
+    with metrics.stage('load'):
+        df = run_stage(output_dir, 'loaded', fps['loaded'],
+                       lambda: _load_stage(input_csv, compact, memory, output_dir, dedup), checkpoints)
+    metrics.set_records('load', len(df))
+    print(f"  {len(df)} records\n")
+
+    # Incremental: curate only new/changed profiles, carry the rest forward
+    carried = None
+    if incremental:
+        previous = load_previous(previous_dir or output_dir, fps['results'])
+        if previous is not None:
+            order = df['username']
+            df, carried = split_changed(df, previous)
+            print(f"  [incremental] {len(df)} new/changed, {len(carried)} unchanged (carried forward)")
+            if not skip_llm:
+                forgotten = forget_scores(df['username'])
+                if forgotten:
+                    print(f"  [incremental] Cleared {forgotten} stale LLM verdicts for changed profiles")
+            print()
+
+    if carried is None:
+        df = _curate(df, output_dir, fps, skip_llm, skip_categories, compact, checkpoints, metrics, stream,
+                     memory=memory)
+    else:
+        if len(df):
+            # Partial frames are not checkpointed; the merged result is below
+            df = _curate(df, output_dir, fps, skip_llm, skip_categories, compact,
+                         checkpoints=False, metrics=metrics, stream=stream, memory=memory)
+        df = merge_results(df, carried, order)
+        if checkpoints and scoring_complete(df):
+            save_checkpoint(df, output_dir, 'tagged', fps['tagged'],
+                            {'tagger': fps['tagger'], 'results_config': fps['results']})
+
+    # Save outputs
+    print(f"\n{'='*60}")
+    print("Saving outputs...")
+    with metrics.stage('write', len(df)):
+        approved = _write_outputs(df, output_dir, output_format)
+    with metrics.stage('diff', len(df)):
+        diff = record_run_diff(store, run_id, df, output_dir)
 
     elapsed = (datetime.now() - start).total_seconds()
     print(f"\n{'='*60}")
@@ -111,11 +302,30 @@ def run_pipeline(input_csv, output_dir="output", skip_llm=False, skip_categories
     print(f"  Records processed: {len(df)}")
     print(f"  Rules rejected: {(df['rules_classification'] == 'no').sum()}")
     print(f"  LLM reviewed: {(df['rules_classification'] == 'review').sum()}")
-    print(f"  Final approved: {len(vendors_list)}")
-    print(f"  Approval rate: {len(vendors_list)/len(df)*100:.1f}%")
+    print(f"  Final approved: {approved}")
+    print(f"  Approval rate: {approved/len(df)*100:.1f}%")
+    if diff:
+        moved = ', '.join(f"{kind} {n}" for kind, n in diff['changes'].items() if n) or 'no changes'
+        print(f"  Since run {diff['diff_from']}: {diff['approved_before']} → {approved} approved ({moved})")
+    if 'compact_mb' in memory:
+        print(f"  Frame memory at load: {memory['loaded_mb']:.1f} MB → {memory['compact_mb']:.1f} MB compact")
+    elif 'loaded_mb' in memory:
+        print(f"  Frame memory at load: {memory['loaded_mb']:.1f} MB")
+    if 'rules_compact_mb' in memory:
+        print(f"  Frame memory after rules: {memory['rules_mb']:.1f} MB → {memory['rules_compact_mb']:.1f} MB compact")
+    print(f"  Process peak RSS: {peak_rss_mb():.1f} MB (compare runs with and without --compact)")
     print(f"  Time: {elapsed:.1f}s")
+    metrics.print_table()
+    run_metrics = metrics.write(
+        os.path.join(output_dir, "run_metrics.json"),
+        input=input_csv, records=len(df), approved=approved,
+        rules_rejected=int((df['rules_classification'] == 'no').sum()),
+        incremental=carried is not None, compact=compact, stream=stream, memory=memory,
+    )
+    store.finish_run(run_id, **run_metrics['summary'], totals=run_metrics['totals'], **(diff or {}))
+    print(f"  Metrics: {os.path.join(output_dir, 'run_metrics.json')}")
     print(f"{'='*60}")
-    return vendors_list
+    return approved
 
 
 def main():
@@ -125,15 +335,43 @@ def main():
     parser.add_argument("--skip-llm", action="store_true")
     parser.add_argument("--skip-categories", action="store_true")
     parser.add_argument("--full", action="store_true", help="Clear cache and reprocess")
+    parser.add_argument("--no-checkpoints", action="store_true",
+                        help="Don't read or write per-stage Parquet checkpoints")
+    parser.add_argument("--compact", action="store_true",
+                        help="Use Arrow strings, categoricals and flattened signals to cut memory")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only curate profiles that are new or changed since the previous run")
+    parser.add_argument("--previous", default=None,
+                        help="Output directory of the previous run (default: --output)")
+    parser.add_argument("--output-format", choices=["json", "ndjson", "both"], default="json",
+                        help="Curated vendors as a JSON array, NDJSON, or both")
+    parser.add_argument("--profile", action="store_true",
+                        help="Write cProfile stats per stage (profile_<stage>.prof) and trace memory")
+    parser.add_argument("--stream", action="store_true",
+                        help="Overlap rules, LLM scoring, gate and tagging with bounded queues")
+    parser.add_argument("--keep-duplicates", action="store_true",
+                        help="Don't fold fuzzy duplicate vendors (same shop / username stem + similar bio)")
     args = parser.parse_args()
 
+    if args.incremental and (args.skip_llm or args.skip_categories):
+        parser.error("--incremental needs a full run (no --skip-llm / --skip-categories)")
+    if args.incremental and args.no_checkpoints:
+        parser.error("--incremental reads and writes checkpoints; drop --no-checkpoints")
+
     if args.full:
         from .config import PROGRESS_FILE
         if os.path.exists(PROGRESS_FILE):
             os.remove(PROGRESS_FILE)
+        if VendorStore(llm_curator.STORE_FILE).clear_verdicts():
             print("Cleared LLM cache for full rerun")
+        if clear_checkpoints(args.output):
+            print("Cleared stage checkpoints for full rerun")
 
-    run_pipeline(args.input, args.output, args.skip_llm, args.skip_categories)
+    run_pipeline(args.input, args.output, args.skip_llm, args.skip_categories,
+                 compact=args.compact, checkpoints=not args.no_checkpoints,
+                 incremental=args.incremental, previous_dir=args.previous,
+                 profile=args.profile, output_format=args.output_format, stream=args.stream,
+                 dedup=not args.keep_duplicates)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,426 @@
+"""
+Sharded pipeline execution: one coordinator, any number of workers.
+
+The coordinator loads the scraper CSV once, folds fuzzy duplicate vendors
+(curation/dedup.py — done here, before splitting, because duplicates hash
+to different shards), splits the clean frame into shards by a stable hash of the username and registers them in a SQLite
+work queue. Workers — on this box or on others that mount the same queue
+directory — claim shards one at a time, run rules → LLM → gate → tagging
+on them with their own API rate budget, and mark them done. Once every
+shard is done, merge stitches the shard results back into input order and
+writes the usual outputs, so the result does not depend on how many
+workers ran or which worker took which shard.
+
+Queue directory layout:
+    queue.db                         shard status / claims (SQLite)
+    duplicates.csv                   records folded into another vendor
+    shards/shard_0003/checkpoints/   loaded → rules → llm → tagged checkpoints
+    shards/shard_0003/run_metrics.json
+
+Claims are leases: a worker renews its lease while it runs, and a shard
+whose worker died is handed out again once the lease expires. Because
+every shard keeps its own checkpoints in the queue directory, the next
+worker resumes where the last one stopped.
+
+LLM verdicts live in the worker's vendor store (--db, default
+output/vendors.db) like in a single-box run: vendors scored by earlier
+runs are not sent to DeepSeek again, and each batch's new verdicts are
+written straight back (SQLite WAL handles concurrent workers). merge
+copies verdicts from the shard results into its own --db, so verdicts
+scored on other boxes end up in the main store too.
+
+Usage:
+    python -m curation.sharding coordinate --input scraped.csv --queue runs/june --shards 32
+    python -m curation.sharding work --queue runs/june --api-rate 30     # on each box
+    python -m curation.sharding status --queue runs/june
+    python -m curation.sharding merge --queue runs/june --output output/
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from .data_loader import load_data
+from .compact import compact_frame
+from .checkpoints import fingerprint, file_fingerprint, save_checkpoint, load_checkpoint, checkpoint_info
+from .metrics import RunMetrics, COUNTER_KEYS
+from .ratelimit import set_api_rate, api_rate
+from .run_pipeline import stage_fingerprints, _curate, _write_outputs
+from .dedup import drop_duplicates, dedup_fingerprint
+from .config import STORE_FILE
+from .store import VendorStore
+from .streaming import VERDICT_COLUMNS
+from .llm_curator import scoring_complete
+from .lazy import lazy_import
+
+pd = lazy_import("pandas")
+
+QUEUE_DB = "queue.db"
+SHARDS_DIR = "shards"
+ORDER_COLUMN = "_input_row"
+LEASE_SECONDS = 15 * 60
+MAX_ATTEMPTS = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS run (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS shards (
+    shard INTEGER PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    records INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',   -- pending | running | done | failed
+    worker TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    claimed_at REAL,
+    finished_at REAL,
+    approved INTEGER,
+    error TEXT
+);
+"""
+
+
+def shard_of(usernames, num_shards: int) -> list[int]:
+    """Stable shard id per username (same on every machine and Python version)."""
+    return [
+        int.from_bytes(hashlib.blake2b(str(u).encode('utf-8'), digest_size=8).digest(), 'big') % num_shards
+        for u in usernames
+    ]
+
+
+def shard_dir(queue_dir: str, shard: int) -> str:
+    return os.path.join(queue_dir, SHARDS_DIR, f"shard_{shard:04d}")
+
+
+def _connect(queue_dir: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(os.path.join(queue_dir, QUEUE_DB), timeout=60, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def run_info(queue_dir: str) -> dict:
+    """Coordinator settings for this queue (input, num_shards, compact, created_at)."""
+    conn = _connect(queue_dir)
+    try:
+        return {row['key']: json.loads(row['value']) for row in conn.execute("SELECT key, value FROM run")}
+    finally:
+        conn.close()
+
+
+# =============================================================================
+# Coordinator
+# =============================================================================
+
+def coordinate(input_csv: str, queue_dir: str, num_shards: int, compact: bool = False,
+               dedup: bool = True) -> int:
+    """
+    Split the input into shards and (re)fill the work queue. Shards whose
+    content is unchanged and already done are left alone. Returns the
+    number of shards queued for work.
+    """
+    os.makedirs(queue_dir, exist_ok=True)
+    df = load_data(input_csv)
+    if dedup:
+        df, duplicates = drop_duplicates(df)
+        duplicates.drop(columns='position').to_csv(os.path.join(queue_dir, "duplicates.csv"), index=False)
+        print(f"[sharding] Folded {len(duplicates)} fuzzy duplicates")
+    if compact:
+        df = compact_frame(df)
+    df[ORDER_COLUMN] = range(len(df))
+    df['_shard'] = shard_of(df['username'], num_shards)
+    input_fp = file_fingerprint(input_csv)
+    dedup_fp = dedup_fingerprint() if dedup else 'keep-duplicates'
+
+    conn = _connect(queue_dir)
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute("DELETE FROM shards WHERE shard >= ?", (num_shards,))
+        for key, value in {'input': input_csv, 'num_shards': num_shards, 'compact': compact,
+                           'created_at': datetime.now().isoformat(timespec='seconds')}.items():
+            conn.execute("INSERT OR REPLACE INTO run (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+        queued = 0
+        groups = dict(tuple(df.groupby('_shard', sort=True)))
+        for shard in range(num_shards):
+            if shard not in groups:
+                # Nothing hashed here (tiny inputs); an empty shard has nothing to curate
+                conn.execute("DELETE FROM shards WHERE shard = ?", (shard,))
+                continue
+            part = groups[shard].drop(columns='_shard').reset_index(drop=True)
+            fp = fingerprint('loaded', input_fp, compact, dedup_fp, shard, num_shards)
+            existing = conn.execute("SELECT fingerprint, status FROM shards WHERE shard = ?", (shard,)).fetchone()
+            if existing and existing['fingerprint'] == fp and existing['status'] == 'done':
+                continue
+            if checkpoint_info(shard_dir(queue_dir, shard), 'loaded').get('fingerprint') != fp:
+                save_checkpoint(part, shard_dir(queue_dir, shard), 'loaded', fp)
+            conn.execute(
+                "INSERT OR REPLACE INTO shards (shard, fingerprint, records, status, attempts) "
+                "VALUES (?, ?, ?, 'pending', 0)", (shard, fp, len(part)),
+            )
+            queued += 1
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+    print(f"[sharding] {len(df)} records → {num_shards} shards in {queue_dir} ({queued} queued)")
+    return queued
+
+
+# =============================================================================
+# Workers
+# =============================================================================
+
+def claim_shard(queue_dir: str, worker: str):
+    """Atomically claim the next pending (or lease-expired) shard. Returns its row or None."""
+    conn = _connect(queue_dir)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute(
+            "SELECT * FROM shards WHERE attempts < ? AND "
+            "(status = 'pending' OR (status = 'running' AND claimed_at < ?)) "
+            "ORDER BY shard LIMIT 1",
+            (MAX_ATTEMPTS, time.time() - LEASE_SECONDS),
+        ).fetchone()
+        if row is not None:
+            conn.execute(
+                "UPDATE shards SET status = 'running', worker = ?, attempts = attempts + 1, "
+                "claimed_at = ?, error = NULL WHERE shard = ?",
+                (worker, time.time(), row['shard']),
+            )
+        conn.execute("COMMIT")
+        return row
+    finally:
+        conn.close()
+
+
+def _renew_lease(queue_dir: str, shard: int, worker: str, stop: threading.Event):
+    while not stop.wait(LEASE_SECONDS / 3):
+        conn = _connect(queue_dir)
+        try:
+            conn.execute("UPDATE shards SET claimed_at = ? WHERE shard = ? AND worker = ? AND status = 'running'",
+                         (time.time(), shard, worker))
+        finally:
+            conn.close()
+
+
+def _finish_shard(queue_dir: str, shard: int, worker: str, status: str, approved=None, error=None):
+    conn = _connect(queue_dir)
+    try:
+        conn.execute(
+            "UPDATE shards SET status = ?, finished_at = ?, approved = ?, error = ? "
+            "WHERE shard = ? AND worker = ?",
+            (status, time.time(), approved, error, shard, worker),
+        )
+    finally:
+        conn.close()
+
+
+def run_shard(queue_dir: str, shard: int, stream: bool = False, store_file: str = STORE_FILE) -> int:
+    """
+    Curate one shard in its own directory, with LLM verdicts cached in the
+    vendor store at store_file. Returns the number of approved vendors.
+    """
+    out_dir = shard_dir(queue_dir, shard)
+    df = load_checkpoint(out_dir, 'loaded')
+    if df is None:
+        raise FileNotFoundError(f"shard {shard} has no loaded checkpoint in {out_dir}")
+    compact = run_info(queue_dir).get('compact', False)
+    fps = stage_fingerprints(checkpoint_info(out_dir, 'loaded')['fingerprint'])
+
+    metrics = RunMetrics()
+    df = _curate(df, out_dir, fps, False, False, compact, True, metrics, stream, store_file)
+    if not scoring_complete(df):
+        # No tagged checkpoint was written; fail the claim so the shard is retried, not merged
+        missing = int(((df['rules_classification'] == 'review') & df['llm_score'].isna()).sum())
+        raise RuntimeError(f"{missing} REVIEW records have no LLM verdict (failed batches)")
+    approved = int((df['final_classification'] == 'yes').sum())
+    metrics.write(os.path.join(out_dir, "run_metrics.json"),
+                  shard=shard, records=len(df), approved=approved, api_rate=api_rate())
+    return approved
+
+
+def work(queue_dir: str, worker: str = None, rate: float = None, stream: bool = False,
+         max_shards: int = None, store_file: str = STORE_FILE) -> int:
+    """Claim and curate shards until the queue is drained. Returns how many this worker finished."""
+    worker = worker or f"{socket.gethostname()}-{os.getpid()}"
+    if rate is not None:
+        set_api_rate(rate)
+    print(f"[sharding] worker {worker} on {queue_dir} (API budget: "
+          f"{f'{api_rate():g}/min' if api_rate() else 'unlimited'})")
+
+    done = 0
+    while max_shards is None or done < max_shards:
+        row = claim_shard(queue_dir, worker)
+        if row is None:
+            break
+        shard = row['shard']
+        print(f"\n[sharding] {worker}: shard {shard} ({row['records']} records, attempt {row['attempts'] + 1})")
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=_renew_lease, args=(queue_dir, shard, worker, stop), daemon=True)
+        heartbeat.start()
+        try:
+            approved = run_shard(queue_dir, shard, stream, store_file)
+        except KeyboardInterrupt:
+            _finish_shard(queue_dir, shard, worker, 'pending', error='interrupted')
+            raise
+        except Exception as e:
+            status = 'failed' if row['attempts'] + 1 >= MAX_ATTEMPTS else 'pending'
+            print(f"[sharding] {worker}: shard {shard} FAILED ({status}): {e}")
+            _finish_shard(queue_dir, shard, worker, status, error=repr(e))
+            continue
+        finally:
+            stop.set()
+            heartbeat.join()
+        _finish_shard(queue_dir, shard, worker, 'done', approved=approved)
+        done += 1
+    print(f"[sharding] {worker}: finished {done} shard(s), queue drained")
+    return done
+
+
+# =============================================================================
+# Status + merge
+# =============================================================================
+
+def queue_status(queue_dir: str) -> list[dict]:
+    conn = _connect(queue_dir)
+    try:
+        return [dict(row) for row in conn.execute("SELECT * FROM shards ORDER BY shard")]
+    finally:
+        conn.close()
+
+
+def _merge_metrics(queue_dir: str, shards: list[int]) -> dict:
+    """Sum per-stage counters/timings across shard run_metrics.json files."""
+    stages = {}
+    for shard in shards:
+        path = os.path.join(shard_dir(queue_dir, shard), "run_metrics.json")
+        if not os.path.exists(path):
+            continue
+        with open(path, 'r') as f:
+            for name, entry in json.load(f)['stages'].items():
+                merged = stages.setdefault(name, {})
+                for key in ('wall_s', 'cpu_s', 'records', *COUNTER_KEYS):
+                    merged[key] = round(merged.get(key, 0) + (entry.get(key) or 0), 4)
+    return stages
+
+
+def _merge_verdicts(queue_dir: str, shards: list[int], store_file: str) -> int:
+    """
+    Add the shards' LLM verdicts missing from the vendor store at store_file,
+    read from each shard's pre-gate `llm` checkpoint (the gate rewrites
+    llm_reason). Returns how many were added.
+    """
+    store = VendorStore(store_file)
+    cached = store.verdicts()
+    verdicts = {}
+    for shard in shards:
+        df = load_checkpoint(shard_dir(queue_dir, shard), 'llm')
+        if df is None:
+            continue
+        scored = df[(df['rules_classification'] == 'review') & df['llm_score'].notna()
+                    & ~df['username'].isin(cached)]
+        verdicts.update(
+            (row['username'], {key: None if pd.isna(row[col]) else row[col] for col, key in VERDICT_COLUMNS.items()})
+            for row in scored.to_dict('records')
+        )
+    store.put_verdicts(verdicts)
+    return len(verdicts)
+
+
+def merge(queue_dir: str, output_dir: str, output_format: str = "json", store_file: str = STORE_FILE) -> int:
+    """
+    Combine all done shards in input order and write outputs; verdicts scored
+    on other boxes are added to the vendor store at store_file. Returns approved count.
+    """
+    shards = queue_status(queue_dir)
+    pending = [s['shard'] for s in shards if s['status'] != 'done']
+    if pending:
+        raise RuntimeError(f"{len(pending)} shard(s) not done yet: {pending[:10]}")
+
+    frames = []
+    for s in shards:
+        part = load_checkpoint(shard_dir(queue_dir, s['shard']), 'tagged')
+        if part is None:
+            raise FileNotFoundError(f"shard {s['shard']} is marked done but has no tagged checkpoint")
+        frames.append(part)
+    df = (pd.concat(frames, ignore_index=True)
+            .sort_values(ORDER_COLUMN, kind='stable')
+            .drop(columns=ORDER_COLUMN)
+            .reset_index(drop=True))
+
+    os.makedirs(output_dir, exist_ok=True)
+    approved = _write_outputs(df, output_dir, output_format)
+    added = _merge_verdicts(queue_dir, [s['shard'] for s in shards], store_file)
+    if added:
+        print(f"[sharding] Added {added} LLM verdicts from other workers to {store_file}")
+    with open(os.path.join(output_dir, "run_metrics.json"), 'w') as f:
+        json.dump({
+            'merged_at': datetime.now().isoformat(timespec='seconds'),
+            'stages': _merge_metrics(queue_dir, [s['shard'] for s in shards]),
+            'shards': {s['shard']: {k: s[k] for k in ('records', 'approved', 'worker', 'attempts')}
+                       for s in shards},
+            'summary': {'queue': queue_dir, 'records': len(df), 'approved': approved},
+        }, f, indent=2)
+    print(f"[sharding] Merged {len(shards)} shards: {len(df)} records, {approved} approved → {output_dir}")
+    return approved
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sharded curation: coordinator / worker / merge")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("coordinate", help="Split the input into shards and fill the work queue")
+    p.add_argument("--input", required=True)
+    p.add_argument("--queue", required=True, help="Shared queue directory")
+    p.add_argument("--shards", type=int, default=16)
+    p.add_argument("--compact", action="store_true")
+    p.add_argument("--keep-duplicates", action="store_true")
+
+    p = sub.add_parser("work", help="Claim and curate shards until the queue is drained")
+    p.add_argument("--queue", required=True)
+    p.add_argument("--worker-id", default=None)
+    p.add_argument("--api-rate", type=float, default=None,
+                   help="DeepSeek calls per minute for this worker (default: DEEPSEEK_RATE_LIMIT)")
+    p.add_argument("--stream", action="store_true")
+    p.add_argument("--max-shards", type=int, default=None)
+    p.add_argument("--db", default=STORE_FILE, help="Vendor store with the cached LLM verdicts")
+
+    p = sub.add_parser("status", help="Show shard progress")
+    p.add_argument("--queue", required=True)
+
+    p = sub.add_parser("merge", help="Merge finished shards into the usual outputs")
+    p.add_argument("--queue", required=True)
+    p.add_argument("--output", default="output")
+    p.add_argument("--output-format", choices=["json", "ndjson", "both"], default="json")
+    p.add_argument("--db", default=STORE_FILE, help="Vendor store to add the shards' LLM verdicts to")
+    args = parser.parse_args()
+
+    if args.command == "coordinate":
+        if args.shards < 1:
+            parser.error("--shards must be at least 1")
+        coordinate(args.input, args.queue, args.shards, args.compact, dedup=not args.keep_duplicates)
+    elif args.command == "work":
+        work(args.queue, args.worker_id, args.api_rate, args.stream, args.max_shards, args.db)
+    elif args.command == "status":
+        rows = queue_status(args.queue)
+        print(f"  {'shard':>5} {'status':<8} {'records':>8} {'approved':>8} {'tries':>5}  worker")
+        for r in rows:
+            print(f"  {r['shard']:>5} {r['status']:<8} {r['records']:>8} {'' if r['approved'] is None else r['approved']:>8}"
+                  f" {r['attempts']:>5}  {r['worker'] or ''}")
+        counts = pd.Series([r['status'] for r in rows]).value_counts().to_dict() if rows else {}
+        print(f"  {counts}")
+    else:
+        merge(args.queue, args.output, args.output_format, args.db)
+
+
+if __name__ == "__main__":
+    main()
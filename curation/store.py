@@ -0,0 +1,668 @@
+"""
+SQLite vendor store: one indexed file instead of a dozen JSON files.
+
+Replaces
+  output/pipeline_progress_v2.json     → verdicts       (LLM cache)
+  website/vendors.json, vendors.json   → vendors + images(kind='site')
+  vendorImages.json / vendorImages.js  → images(kind='gallery')
+  data/vendor_images.json              → images(kind='instagram')
+  scraper/output/<vendor>.json         → scrape_results
+and adds run history (runs), a category index (vendor_categories), a
+compact per-run verdict snapshot (run_verdicts), the changed-verdict
+index between consecutive runs (verdict_changes, see curation/run_diff.py)
+and a per-vendor scrape job queue (scrape_jobs) so an interrupted scraper
+resumes where it stopped and refresh runs only revisit stale vendors.
+
+Tools read and update single rows (O(log n) via the primary keys) instead
+of reloading and rewriting whole files; the website files are generated
+from the store by the exporters:
+
+    python -m curation.store import            # one-time: pull in the legacy JSON files
+    python -m curation.store export            # website/vendors.json, vendors.json, vendorImages.*
+    python -m curation.store stats
+
+Every call opens its own short-lived connection, so a store can be shared
+by threads (--stream) and processes (sharded workers) on one machine.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from .config import STORE_FILE
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS vendors (
+    username TEXT PRIMARY KEY,
+    record TEXT NOT NULL,            -- website record (JSON, without images)
+    score REAL,
+    category TEXT,
+    tier TEXT,
+    position INTEGER,                -- insertion order, tie-break for exports
+    updated_at TEXT
+);
+CREATE INDEX IF NOT EXISTS vendors_score ON vendors (score DESC, position);
+CREATE TABLE IF NOT EXISTS vendor_categories (
+    username TEXT NOT NULL,
+    category TEXT NOT NULL,
+    PRIMARY KEY (username, category)
+);
+CREATE INDEX IF NOT EXISTS vendor_categories_category ON vendor_categories (category);
+CREATE TABLE IF NOT EXISTS images (
+    username TEXT NOT NULL,
+    kind TEXT NOT NULL,              -- site | gallery | instagram
+    position INTEGER NOT NULL,
+    url TEXT NOT NULL,
+    PRIMARY KEY (username, kind, position)
+);
+CREATE TABLE IF NOT EXISTS verdicts (
+    username TEXT PRIMARY KEY,
+    score REAL,
+    verdict TEXT NOT NULL,           -- JSON: score, reason, sells_products, has_shop, festival_aesthetic
+    updated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS scrape_results (
+    username TEXT PRIMARY KEY,
+    platform TEXT,
+    source TEXT,
+    status TEXT,
+    result TEXT NOT NULL,            -- JSON, as the scraper produced it
+    scraped_at TEXT
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT,
+    info TEXT                        -- JSON
+);
+CREATE TABLE IF NOT EXISTS run_verdicts (
+    run_id INTEGER NOT NULL,
+    username TEXT NOT NULL,
+    classification TEXT,             -- final_classification
+    score REAL,                      -- final_score
+    reason TEXT,                     -- llm_reason ('' when the LLM didn't see it)
+    PRIMARY KEY (run_id, username)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS verdict_changes (
+    run_id INTEGER NOT NULL,         -- the newer run; runs.info.diff_from is the older one
+    username TEXT NOT NULL,
+    change TEXT NOT NULL,            -- added | removed | approved | rejected | reclassified | score | reason
+    old_classification TEXT,
+    new_classification TEXT,
+    old_score REAL,
+    new_score REAL,
+    old_reason TEXT,
+    new_reason TEXT,
+    PRIMARY KEY (run_id, username)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS verdict_changes_change ON verdict_changes (run_id, change);
+CREATE TABLE IF NOT EXISTS scrape_jobs (
+    kind TEXT NOT NULL,              -- which scraper's queue: scrape_v2, ...
+    username TEXT NOT NULL,
+    status TEXT NOT NULL,            -- pending | running | done | failed
+    attempts INTEGER NOT NULL DEFAULT 0,   -- since the last success
+    last_error TEXT,
+    last_success_at TEXT,
+    updated_at TEXT,
+    PRIMARY KEY (kind, username)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS scrape_jobs_status ON scrape_jobs (kind, status);
+"""
+
+# One change per username, most significant first
+VERDICT_CHANGE_SQL = """
+SELECT n.username,
+       CASE WHEN o.username IS NULL THEN 'added'
+            WHEN n.classification IS NOT o.classification THEN
+                CASE WHEN n.classification = 'yes' THEN 'approved'
+                     WHEN o.classification = 'yes' THEN 'rejected'
+                     ELSE 'reclassified' END
+            WHEN abs(n.score - o.score) >= :min_delta THEN 'score'
+            ELSE 'reason' END,
+       o.classification, n.classification, o.score, n.score, o.reason, n.reason
+FROM run_verdicts n
+LEFT JOIN run_verdicts o ON o.run_id = :old AND o.username = n.username
+WHERE n.run_id = :new
+  AND (o.username IS NULL
+       OR n.classification IS NOT o.classification
+       OR abs(n.score - o.score) >= :min_delta
+       OR n.reason IS NOT o.reason)
+UNION ALL
+SELECT o.username, 'removed', o.classification, NULL, o.score, NULL, o.reason, NULL
+FROM run_verdicts o
+WHERE o.run_id = :old
+  AND NOT EXISTS (SELECT 1 FROM run_verdicts n WHERE n.run_id = :new AND n.username = o.username)
+"""
+VERDICT_CHANGE_FIELDS = ('username', 'change', 'old_classification', 'new_classification',
+                         'old_score', 'new_score', 'old_reason', 'new_reason')
+
+# Why a scrape job is due, see VendorStore.due_scrape_jobs
+DUE_SCRAPE_JOBS_SQL = """
+SELECT username,
+       CASE WHEN status = 'pending' THEN 'new'
+            WHEN status = 'running' THEN 'interrupted'
+            WHEN status = 'failed' THEN 'retry'
+            ELSE 'stale' END
+FROM scrape_jobs
+WHERE kind = :kind
+  AND (status IN ('pending', 'running')
+       OR (status = 'failed' AND (attempts < :max_attempts OR updated_at < :stale_before))
+       OR (status = 'done' AND last_success_at < :stale_before))
+"""
+
+# Summary files that live next to per-vendor results in scraper/output/
+SCRAPER_SUMMARY_FILES = {
+    'non_etsy_results.json', 'non_etsy_results_v2.json',
+    'scrape_v2_summary.json', 'test_run_final_summary.json',
+    'PHASE1_TEST_SUMMARY.json', 'etsy_scrape_raw.json',
+}
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec='seconds')
+
+
+def _categories_of(record: dict) -> list:
+    categories = record.get('categories')
+    if isinstance(categories, str):
+        try:
+            categories = json.loads(categories)
+        except json.JSONDecodeError:
+            categories = [categories]
+    categories = list(categories or [])
+    if record.get('category') and record['category'] not in categories:
+        categories.insert(0, record['category'])
+    return categories
+
+
+class VendorStore:
+    def __init__(self, path=STORE_FILE):
+        self.path = str(path)
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with self._tx() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _tx(self):
+        """One connection + transaction; commits on success, rolls back on error."""
+        conn = sqlite3.connect(self.path, timeout=60)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # ------------------------------------------------------------------ vendors
+
+    def vendor(self, username: str):
+        """Website record for one vendor (with its site images), or None."""
+        with self._tx() as conn:
+            row = conn.execute("SELECT record FROM vendors WHERE username = ?", (username,)).fetchone()
+            if row is None:
+                return None
+            record = json.loads(row[0])
+            record['images'] = self._images(conn, username, 'site')
+        return record
+
+    def vendors(self, category: str = None) -> list[dict]:
+        """All website records (optionally one category), highest score first."""
+        with self._tx() as conn:
+            if category:
+                rows = conn.execute(
+                    "SELECT v.username, v.record FROM vendors v "
+                    "JOIN vendor_categories c ON c.username = v.username "
+                    "WHERE c.category = ? ORDER BY v.score DESC, v.position", (category,)).fetchall()
+            else:
+                rows = conn.execute(
+                    "SELECT username, record FROM vendors ORDER BY score DESC, position").fetchall()
+            images = self._image_map(conn, 'site')
+        records = []
+        for username, record in rows:
+            record = json.loads(record)
+            record['images'] = images.get(username, [])
+            records.append(record)
+        return records
+
+    def upsert_vendors(self, records) -> int:
+        """
+        Insert or merge website records by username. Keys present in a record
+        overwrite the stored ones; everything else (images, manual tier, ...)
+        is kept. An 'images' key replaces the vendor's site images.
+        """
+        count = 0
+        with self._tx() as conn:
+            position = conn.execute("SELECT COALESCE(MAX(position), -1) FROM vendors").fetchone()[0]
+            for record in records:
+                record = dict(record)
+                username = record['username']
+                images = record.pop('images', None)
+                row = conn.execute("SELECT record, position FROM vendors WHERE username = ?",
+                                   (username,)).fetchone()
+                if row is None:
+                    position += 1
+                    merged, pos = record, position
+                else:
+                    merged, pos = {**json.loads(row[0]), **record}, row[1]
+                conn.execute(
+                    "INSERT OR REPLACE INTO vendors (username, record, score, category, tier, position, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (username, json.dumps(merged, ensure_ascii=False), merged.get('score'),
+                     merged.get('category'), merged.get('tier'), pos, _now()),
+                )
+                conn.execute("DELETE FROM vendor_categories WHERE username = ?", (username,))
+                conn.executemany("INSERT OR IGNORE INTO vendor_categories (username, category) VALUES (?, ?)",
+                                 [(username, c) for c in _categories_of(merged)])
+                if images is not None:
+                    self._set_images(conn, username, 'site', images)
+                count += 1
+        return count
+
+    def update_vendor(self, username: str, **fields) -> bool:
+        """Partial update of one vendor's record. Returns False if it doesn't exist."""
+        with self._tx() as conn:
+            exists = conn.execute("SELECT 1 FROM vendors WHERE username = ?", (username,)).fetchone()
+        if not exists:
+            return False
+        self.upsert_vendors([{'username': username, **fields}])
+        return True
+
+    def usernames(self) -> list[str]:
+        with self._tx() as conn:
+            return [r[0] for r in conn.execute("SELECT username FROM vendors ORDER BY position")]
+
+    # ------------------------------------------------------------------- images
+
+    @staticmethod
+    def _images(conn, username: str, kind: str) -> list:
+        return [r[0] for r in conn.execute(
+            "SELECT url FROM images WHERE username = ? AND kind = ? ORDER BY position", (username, kind))]
+
+    @staticmethod
+    def _image_map(conn, kind: str) -> dict:
+        images = {}
+        for username, url in conn.execute(
+                "SELECT username, url FROM images WHERE kind = ? ORDER BY username, position", (kind,)):
+            images.setdefault(username, []).append(url)
+        return images
+
+    @staticmethod
+    def _set_images(conn, username: str, kind: str, urls):
+        conn.execute("DELETE FROM images WHERE username = ? AND kind = ?", (username, kind))
+        conn.executemany("INSERT INTO images (username, kind, position, url) VALUES (?, ?, ?, ?)",
+                         [(username, kind, i, url) for i, url in enumerate(urls)])
+
+    def images(self, username: str, kind: str = 'site') -> list:
+        with self._tx() as conn:
+            return self._images(conn, username, kind)
+
+    def image_map(self, kind: str = 'site') -> dict:
+        """{username: [urls]} for one image kind."""
+        with self._tx() as conn:
+            return self._image_map(conn, kind)
+
+    def set_images(self, username: str, urls, kind: str = 'site'):
+        with self._tx() as conn:
+            self._set_images(conn, username, kind, urls)
+
+    def set_image_map(self, images: dict, kind: str):
+        """Replace images for every username in `images` (others untouched)."""
+        with self._tx() as conn:
+            for username, urls in images.items():
+                self._set_images(conn, username, kind, urls)
+
+    # ----------------------------------------------------------------- verdicts
+
+    def verdicts(self) -> dict:
+        """All cached LLM verdicts: {username: verdict}."""
+        with self._tx() as conn:
+            return {u: json.loads(v) for u, v in conn.execute("SELECT username, verdict FROM verdicts")}
+
+    def put_verdicts(self, verdicts: dict):
+        with self._tx() as conn:
+            now = _now()
+            conn.executemany(
+                "INSERT OR REPLACE INTO verdicts (username, score, verdict, updated_at) VALUES (?, ?, ?, ?)",
+                [(u, v.get('score'), json.dumps(v), now) for u, v in verdicts.items()],
+            )
+
+    def forget_verdicts(self, usernames) -> int:
+        with self._tx() as conn:
+            return sum(conn.execute("DELETE FROM verdicts WHERE username = ?", (u,)).rowcount
+                       for u in usernames)
+
+    def clear_verdicts(self) -> int:
+        with self._tx() as conn:
+            return conn.execute("DELETE FROM verdicts").rowcount
+
+    def import_progress(self, progress_file) -> int:
+        """Import a legacy pipeline_progress JSON cache if the verdicts table is empty."""
+        if not os.path.exists(progress_file):
+            return 0
+        with self._tx() as conn:
+            if conn.execute("SELECT 1 FROM verdicts LIMIT 1").fetchone():
+                return 0
+        with open(progress_file, 'r') as f:
+            scored = json.load(f).get('scored_usernames', {})
+        self.put_verdicts(scored)
+        return len(scored)
+
+    # ----------------------------------------------------------- scrape results
+
+    def record_scrape(self, result: dict):
+        """Store one scraper result (replaces scraper/output/<vendor>.json)."""
+        with self._tx() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO scrape_results (username, platform, source, status, result, scraped_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (result['username'], result.get('platform'), result.get('source'), result.get('status'),
+                 json.dumps(result, ensure_ascii=False), _now()),
+            )
+
+    def scrape_results(self, source: str = None) -> list[dict]:
+        with self._tx() as conn:
+            if source:
+                rows = conn.execute("SELECT result FROM scrape_results WHERE source = ? ORDER BY username",
+                                    (source,))
+            else:
+                rows = conn.execute("SELECT result FROM scrape_results ORDER BY username")
+            return [json.loads(r[0]) for r in rows]
+
+    # -------------------------------------------------------------- scrape jobs
+
+    def due_scrape_jobs(self, kind: str, usernames, max_attempts: int = 3, stale_before: str = None) -> dict:
+        """
+        Queue any of `usernames` not yet known to `kind`, and return the ones
+        to scrape now as {username: reason}, in the order given: 'new' (never
+        finished), 'interrupted' (left running by a run that died), 'retry'
+        (failed fewer than max_attempts times in a row, or last tried before
+        stale_before) or 'stale' (last success before the ISO timestamp
+        stale_before; None = never stale).
+        """
+        usernames = list(usernames)
+        with self._tx() as conn:
+            conn.executemany("INSERT OR IGNORE INTO scrape_jobs (kind, username, status, updated_at) "
+                             "VALUES (?, ?, 'pending', ?)", [(kind, u, _now()) for u in usernames])
+            due = dict(conn.execute(DUE_SCRAPE_JOBS_SQL, {'kind': kind, 'max_attempts': max_attempts,
+                                                          'stale_before': stale_before}).fetchall())
+        return {u: due[u] for u in usernames if u in due}
+
+    def start_scrape_job(self, kind: str, username: str):
+        with self._tx() as conn:
+            conn.execute(
+                "INSERT INTO scrape_jobs (kind, username, status, attempts, updated_at) "
+                "VALUES (?, ?, 'running', 1, ?) "
+                "ON CONFLICT (kind, username) DO UPDATE SET status = 'running', attempts = attempts + 1, "
+                "updated_at = excluded.updated_at", (kind, username, _now()))
+
+    def finish_scrape_job(self, kind: str, username: str, error: str = None):
+        """Mark a job done (resets attempts) or, with an error, failed."""
+        with self._tx() as conn:
+            if error is None:
+                now = _now()
+                conn.execute("UPDATE scrape_jobs SET status = 'done', attempts = 0, last_error = NULL, "
+                             "last_success_at = ?, updated_at = ? WHERE kind = ? AND username = ?",
+                             (now, now, kind, username))
+            else:
+                conn.execute("UPDATE scrape_jobs SET status = 'failed', last_error = ?, updated_at = ? "
+                             "WHERE kind = ? AND username = ?", (error, _now(), kind, username))
+
+    def scrape_jobs(self, kind: str, status: str = None) -> list[dict]:
+        fields = ('username', 'status', 'attempts', 'last_error', 'last_success_at', 'updated_at')
+        query = f"SELECT {', '.join(fields)} FROM scrape_jobs WHERE kind = ?"
+        args = (kind,)
+        if status:
+            query += " AND status = ?"
+            args = (kind, status)
+        with self._tx() as conn:
+            rows = conn.execute(query + " ORDER BY username", args).fetchall()
+        return [dict(zip(fields, row)) for row in rows]
+
+    # --------------------------------------------------------------------- runs
+
+    def start_run(self, kind: str, **info) -> int:
+        with self._tx() as conn:
+            return conn.execute("INSERT INTO runs (kind, started_at, info) VALUES (?, ?, ?)",
+                                (kind, _now(), json.dumps(info, default=str))).lastrowid
+
+    def finish_run(self, run_id: int, **info):
+        with self._tx() as conn:
+            row = conn.execute("SELECT info FROM runs WHERE id = ?", (run_id,)).fetchone()
+            merged = {**json.loads(row[0] or '{}'), **info} if row else info
+            conn.execute("UPDATE runs SET finished_at = ?, info = ? WHERE id = ?",
+                         (_now(), json.dumps(merged, default=str), run_id))
+
+    def run(self, run_id: int):
+        with self._tx() as conn:
+            row = conn.execute("SELECT id, kind, started_at, finished_at, info FROM runs WHERE id = ?",
+                               (run_id,)).fetchone()
+        return self._run_record(row) if row else None
+
+    @staticmethod
+    def _run_record(row) -> dict:
+        return {'id': row[0], 'kind': row[1], 'started_at': row[2], 'finished_at': row[3],
+                **json.loads(row[4] or '{}')}
+
+    def runs(self, kind: str = None, limit: int = 20) -> list[dict]:
+        with self._tx() as conn:
+            query = "SELECT id, kind, started_at, finished_at, info FROM runs"
+            args = ()
+            if kind:
+                query += " WHERE kind = ?"
+                args = (kind,)
+            rows = conn.execute(query + " ORDER BY id DESC LIMIT ?", (*args, limit)).fetchall()
+        return [self._run_record(r) for r in rows]
+
+    # ------------------------------------------------------ run verdict history
+
+    def put_run_verdicts(self, run_id: int, rows) -> int:
+        """Snapshot (username, classification, score, reason) rows for one run."""
+        rows = [(run_id, *row) for row in rows]
+        with self._tx() as conn:
+            conn.execute("DELETE FROM run_verdicts WHERE run_id = ?", (run_id,))
+            conn.executemany("INSERT INTO run_verdicts (run_id, username, classification, score, reason) "
+                             "VALUES (?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def has_run_verdicts(self, run_id: int) -> bool:
+        with self._tx() as conn:
+            return conn.execute("SELECT 1 FROM run_verdicts WHERE run_id = ? LIMIT 1",
+                                (run_id,)).fetchone() is not None
+
+    def diff_run_verdicts(self, old_run: int, new_run: int, min_delta: float = 0.0) -> list[dict]:
+        """Changed verdicts between two snapshots, joined on (run_id, username)."""
+        with self._tx() as conn:
+            rows = conn.execute(VERDICT_CHANGE_SQL + " ORDER BY 1",
+                                {'old': old_run, 'new': new_run, 'min_delta': min_delta}).fetchall()
+        return [dict(zip(VERDICT_CHANGE_FIELDS, row)) for row in rows]
+
+    def put_verdict_changes(self, run_id: int, changes: list[dict]):
+        with self._tx() as conn:
+            conn.execute("DELETE FROM verdict_changes WHERE run_id = ?", (run_id,))
+            conn.executemany(
+                f"INSERT INTO verdict_changes (run_id, {', '.join(VERDICT_CHANGE_FIELDS)}) "
+                f"VALUES (?{', ?' * len(VERDICT_CHANGE_FIELDS)})",
+                [(run_id, *(c[f] for f in VERDICT_CHANGE_FIELDS)) for c in changes],
+            )
+
+    def verdict_changes(self, run_id: int, change: str = None) -> list[dict]:
+        """Indexed lookup of what changed in `run_id` (optionally one kind of change)."""
+        query = f"SELECT {', '.join(VERDICT_CHANGE_FIELDS)} FROM verdict_changes WHERE run_id = ?"
+        args = (run_id,)
+        if change:
+            query += " AND change = ?"
+            args = (run_id, change)
+        with self._tx() as conn:
+            rows = conn.execute(query + " ORDER BY username", args).fetchall()
+        return [dict(zip(VERDICT_CHANGE_FIELDS, row)) for row in rows]
+
+    # ---------------------------------------------------------------- exporters
+
+    def export_site(self, *paths, manifest_file=None) -> dict:
+        """
+        Write the website's vendors.json to each path. With images/manifest.json
+        (scraper/image_resize.py), each vendor also gets 'sources': {image path:
+        {MIME type: srcset}} for the images that have AVIF/WebP variants, which
+        the site renders as <picture> sources in front of the JPEG.
+        """
+        vendors = self.vendors()
+        manifest = load_manifest(manifest_file) if manifest_file else {}
+        for vendor in vendors:
+            sources = {path: image_sources(path, manifest[path]) for path in vendor['images'] if path in manifest}
+            sources = {path: srcsets for path, srcsets in sources.items() if srcsets}
+            if sources:
+                vendor['sources'] = sources
+        site = {
+            'generated_at': datetime.now().isoformat(),
+            'total_vendors': len(vendors),
+            'categories': sorted({v['category'] for v in vendors if v.get('category')}),
+            'tags': sorted({t for v in vendors for t in v.get('tags', [])}),
+            'vendors': vendors,
+        }
+        for path in paths:
+            os.makedirs(os.path.dirname(str(path)) or '.', exist_ok=True)
+            with open(path, 'w') as f:
+                json.dump(site, f, indent=2)
+        return site
+
+    def export_vendor_images(self, json_path=None, js_path=None) -> dict:
+        """Write vendorImages.json and/or the vendorImages.js snippet from gallery images."""
+        gallery = dict(sorted(self.image_map('gallery').items()))
+        if json_path:
+            with open(json_path, 'w') as f:
+                json.dump(gallery, f, indent=2)
+        if js_path:
+            entries = [
+                f"    '{username}': [\n" + ",\n".join(f"      '{url}'" for url in urls) + "\n    ]"
+                for username, urls in gallery.items()
+            ]
+            with open(js_path, 'w') as f:
+                f.write("  const vendorImages = {\n" + ",\n".join(entries) + "\n  };")
+        return gallery
+
+    # ---------------------------------------------------------------- migration
+
+    def import_legacy(self, base_dir) -> dict:
+        """Pull every legacy JSON file under `base_dir` into the store. Returns counts."""
+        base = Path(base_dir)
+        counts = {}
+
+        site_file = base / "website" / "vendors.json"
+        if site_file.exists():
+            with open(site_file, 'r') as f:
+                counts['vendors'] = self.upsert_vendors(json.load(f)['vendors'])
+
+        gallery_file = base / "vendorImages.json"
+        if gallery_file.exists():
+            with open(gallery_file, 'r') as f:
+                gallery = json.load(f)
+            self.set_image_map(gallery, 'gallery')
+            counts['gallery_images'] = len(gallery)
+
+        instagram_file = base / "data" / "vendor_images.json"
+        if instagram_file.exists():
+            with open(instagram_file, 'r') as f:
+                instagram = json.load(f)
+            self.set_image_map(instagram, 'instagram')
+            counts['instagram_images'] = len(instagram)
+
+        scraper_dir = base / "scraper" / "output"
+        if scraper_dir.is_dir():
+            counts['scrape_results'] = self.import_scrape_files(scraper_dir)
+
+        counts['verdicts'] = self.import_progress(base / "output" / "pipeline_progress_v2.json")
+        return counts
+
+    def import_scrape_files(self, scraper_dir) -> int:
+        """Import per-vendor scraper JSON files (summary files are skipped)."""
+        count = 0
+        for path in sorted(Path(scraper_dir).glob("*.json")):
+            if path.name in SCRAPER_SUMMARY_FILES:
+                continue
+            try:
+                with open(path, 'r') as f:
+                    result = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                continue
+            if isinstance(result, dict) and result.get('username'):
+                self.record_scrape(result)
+                count += 1
+        return count
+
+    def stats(self) -> dict:
+        with self._tx() as conn:
+            stats = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                     for table in ('vendors', 'verdicts', 'scrape_results', 'runs', 'verdict_changes')}
+            for kind, n in conn.execute("SELECT kind, COUNT(DISTINCT username) FROM images GROUP BY kind"):
+                stats[f'images_{kind}'] = n
+            for kind, status, n in conn.execute(
+                    "SELECT kind, status, COUNT(*) FROM scrape_jobs GROUP BY kind, status ORDER BY kind, status"):
+                stats[f'{kind}_{status}'] = n
+        return stats
+
+
+def load_manifest(path) -> dict:
+    """images/manifest.json as {JPEG path: entry}; {} if it is missing or unreadable."""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def image_sources(path: str, entry: dict) -> dict:
+    """{'image/avif': 'images/x/product_1-320.avif 320w, ...', ...} for manifest[path]."""
+    folder = os.path.dirname(path)
+    sources = {}
+    for variant in entry.get('variants', []):
+        sources.setdefault(variant['type'], []).append(f"{os.path.join(folder, variant['file'])} {variant['width']}w")
+    return {mime: ', '.join(candidates) for mime, candidates in sources.items()}
+
+
+def open_vendor_store(path=STORE_FILE, base_dir=".") -> VendorStore:
+    """
+    The store at `path`, for scripts that read vendors from it. An empty store
+    (fresh checkout) first imports the legacy JSON files under base_dir; if
+    there are none either, exit naming the import command instead of running
+    on zero vendors.
+    """
+    store = VendorStore(path)
+    if not store.usernames():
+        counts = store.import_legacy(base_dir)
+        if counts.get('vendors'):
+            print(f"[store] {path} was empty, imported the JSON files under {base_dir}: {counts}")
+        else:
+            sys.exit(f"[store] No vendors in {path}. Run `python -m curation.store import --db {path}` "
+                     f"from the repository root (it reads website/vendors.json).")
+    return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite vendor store")
+    parser.add_argument("command", choices=["import", "export", "stats"])
+    parser.add_argument("--db", default=STORE_FILE)
+    parser.add_argument("--base", default=".", help="Repository root holding the legacy/website files")
+    args = parser.parse_args()
+
+    store = VendorStore(args.db)
+    base = Path(args.base)
+    if args.command == "import":
+        counts = store.import_legacy(base)
+        print(f"[store] Imported into {args.db}: {counts}")
+    elif args.command == "export":
+        site = store.export_site(base / "website" / "vendors.json", base / "vendors.json",
+                                 manifest_file=base / "images" / "manifest.json")
+        gallery = store.export_vendor_images(base / "vendorImages.json", base / "vendorImages.js")
+        print(f"[store] Exported {site['total_vendors']} vendors, {len(gallery)} image galleries")
+    else:
+        for key, value in store.stats().items():
+            print(f"  {key:<20} {value}")
+
+
+if __name__ == "__main__":
+    main()
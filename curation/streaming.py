@@ -0,0 +1,288 @@
+"""
+Streaming stage graph (opt-in via --stream).
+
+The default pipeline runs each stage to completion before the next starts,
+so category tagging waits for the very last LLM batch. Here the stages run
+as threads connected by bounded queues and records flow through as soon as
+they are ready:
+
+    rules ──▶ llm ──▶ gate ──▶ tagger
+         (queue)  (queue)  (queue)
+
+  rules   scores input chunks (or replays a rules checkpoint) and forwards
+          the REVIEW records
+  llm     answers from the progress cache when it can, otherwise fills
+          LLM_BATCH_SIZE batches and calls DeepSeek
+  gate    applies the hard requirements per record
+  tagger  batches approved vendors and categorizes them while the LLM
+          stage is still working
+
+Queues are bounded (queue_size items), so a slow stage applies
+back-pressure instead of buffering the whole crawl. End-to-end time
+approaches the slowest stage instead of the sum of all of them.
+
+The result is assembled into the same frames the sequential path produces
+(rules-scored, LLM-scored, final), so checkpoints and output writing are
+shared.
+"""
+from __future__ import annotations
+
+import json
+import queue
+import threading
+import time
+
+from .config import LLM_BATCH_SIZE, STORE_FILE
+from .rules_engine import score_frame
+from .llm_curator import score_batch, gate_rejection, _load_verdicts, _save_verdicts
+from .category_tagger import tag_batch
+from .compact import compact_frame, flatten_signals
+from .metrics import record
+from .lazy import lazy_import
+
+pd = lazy_import("pandas")
+
+_DONE = object()
+RULES_CHUNK = 500
+VERDICT_COLUMNS = {
+    'llm_score': 'score', 'llm_reason': 'reason', 'sells_products': 'sells_products',
+    'has_shop': 'has_shop', 'festival_aesthetic': 'festival_aesthetic',
+}
+NO_SHOP_SUFFIX = ' | GATE: rejected, no shop URL'
+
+
+class _Stage(threading.Thread):
+    """
+    One node of the graph: pulls items from `inbox`, pushes whatever
+    `handle(item)` returns to `outbox`, then `finish()` output and _DONE.
+    After an error it keeps draining its inbox so upstream never blocks.
+    """
+
+    def __init__(self, name, handle, inbox, outbox=None, finish=None):
+        super().__init__(name=f"stage-{name}", daemon=True)
+        self.stage_name = name
+        self.handle = handle
+        self.finish = finish
+        self.inbox = inbox
+        self.outbox = outbox
+        self.error = None
+        self.busy_s = 0.0
+        self.items = 0
+
+    def _emit(self, outputs):
+        if self.outbox is not None:
+            for out in outputs or ():
+                self.outbox.put(out)
+
+    def run(self):
+        while True:
+            item = self.inbox.get()
+            if item is _DONE:
+                break
+            if self.error is not None:
+                continue
+            try:
+                t0 = time.perf_counter()
+                self._emit(self.handle(item))
+                self.busy_s += time.perf_counter() - t0
+                self.items += 1
+            except Exception as e:
+                self.error = e
+        try:
+            if self.error is None and self.finish:
+                self._emit(self.finish())
+        except Exception as e:
+            self.error = e
+        if self.outbox is not None:
+            self.outbox.put(_DONE)
+
+
+def run_streaming_curation(df: pd.DataFrame, rules_df: pd.DataFrame = None, compact: bool = False,
+                           known_tags: dict = None, queue_size: int = 8, tag_batch_size: int = 10,
+                           store_file: str = STORE_FILE):
+    """
+    Run rules → LLM → gate → tagger concurrently.
+
+    df         loaded frame (ignored when `rules_df` is given)
+    rules_df   rules-scored frame from a checkpoint, replayed instead of re-scoring
+    known_tags {username: (categories_json, tags_json)} reused instead of re-tagging
+    store_file vendor store holding the cached LLM verdicts
+
+    Returns (rules_df, llm_df, final_df, stats).
+    """
+    known_tags = known_tags or {}
+    llm_q, gate_q, tag_q = (queue.Queue(maxsize=queue_size) for _ in range(3))
+    rules_chunks = []
+    verdicts = {}
+    gate_results = {}
+    tags = {}
+
+    scored = _load_verdicts(store_file)
+    pending = []  # uncached REVIEW rows waiting to fill an LLM batch
+    tag_pending = []
+
+    # --- llm ---------------------------------------------------------------
+    def _call_llm(rows):
+        batch = pd.DataFrame(rows)
+        try:
+            batch_verdicts = score_batch(batch)
+        except Exception as e:
+            print(f"  [stream] LLM batch FAILED: {e}")
+            return None
+        scored.update(batch_verdicts)
+        _save_verdicts(batch_verdicts, store_file)
+        time.sleep(1)
+        return _with_verdicts(batch, batch_verdicts)
+
+    def llm_handle(chunk):
+        out = []
+        cached = chunk['username'].isin(scored)
+        record(cache_hits=int(cached.sum()), cache_misses=int((~cached).sum()))
+        if cached.any():
+            hit = chunk[cached]
+            out.append(_with_verdicts(hit, {u: scored[u] for u in hit['username']}))
+        pending.extend(row for _, row in chunk[~cached].iterrows())
+        while len(pending) >= LLM_BATCH_SIZE:
+            rows = pending[:LLM_BATCH_SIZE]
+            del pending[:LLM_BATCH_SIZE]
+            out.append(_call_llm(rows))
+        return [o for o in out if o is not None]
+
+    def llm_finish():
+        out = _call_llm(pending) if pending else None
+        pending.clear()
+        return [out] if out is not None else []
+
+    def _with_verdicts(batch, batch_verdicts):
+        batch = batch.copy()
+        for col, key in VERDICT_COLUMNS.items():
+            batch[col] = [batch_verdicts[u].get(key) for u in batch['username']]
+        verdicts.update(batch_verdicts)
+        return batch
+
+    # --- gate --------------------------------------------------------------
+    def gate_handle(batch):
+        approved = []
+        for _, row in batch.iterrows():
+            rejection = gate_rejection(row)
+            gate_results[row['username']] = rejection
+            if rejection is None:
+                approved.append(row)
+        return approved
+
+    # --- tagger ------------------------------------------------------------
+    def _tag(rows):
+        tags.update(tag_batch(pd.DataFrame(rows)))
+        time.sleep(1)
+
+    def tag_handle(row):
+        if row['username'] in known_tags:
+            record(cache_hits=1)
+            return
+        record(cache_misses=1)
+        tag_pending.append(row)
+        if len(tag_pending) >= tag_batch_size:
+            _tag(tag_pending[:])
+            tag_pending.clear()
+
+    def tag_finish():
+        if tag_pending:
+            _tag(tag_pending[:])
+            tag_pending.clear()
+
+    stages = [
+        _Stage('llm', llm_handle, llm_q, gate_q, llm_finish),
+        _Stage('gate', gate_handle, gate_q, tag_q),
+        _Stage('tagger', tag_handle, tag_q, None, tag_finish),
+    ]
+    for stage in stages:
+        stage.start()
+
+    # --- rules (source, runs on this thread) -------------------------------
+    t0 = time.perf_counter()
+    source = rules_df if rules_df is not None else df
+    for start in range(0, len(source), RULES_CHUNK):
+        chunk = source.iloc[start:start + RULES_CHUNK]
+        if rules_df is None:
+            chunk = score_frame(chunk)
+            if compact:
+                chunk = compact_frame(flatten_signals(chunk))
+        rules_chunks.append(chunk)
+        review = chunk[chunk['rules_classification'] == 'review']
+        if len(review):
+            llm_q.put(review)
+        if any(s.error for s in stages):
+            break
+    rules_busy = time.perf_counter() - t0
+    llm_q.put(_DONE)
+    for stage in stages:
+        stage.join()
+    for stage in stages:
+        if stage.error is not None:
+            raise RuntimeError(f"stream stage '{stage.stage_name}' failed") from stage.error
+
+    stats = {'rules': {'busy_s': round(rules_busy, 3), 'items': len(rules_chunks)}}
+    stats.update({s.stage_name: {'busy_s': round(s.busy_s, 3), 'items': s.items} for s in stages})
+
+    rules_out = pd.concat(rules_chunks) if rules_chunks else source.iloc[:0]
+    if rules_df is None:
+        rules_out = rules_out.reset_index(drop=True)
+        if compact:
+            rules_out = compact_frame(rules_out)
+    llm_df = _assemble_llm(rules_out, verdicts)
+    final_df = _assemble_final(llm_df, gate_results, {**known_tags, **{
+        u: (json.dumps(t['categories']), json.dumps(t['tags'])) for u, t in tags.items()
+    }})
+    return rules_out, llm_df, final_df, stats
+
+
+def _assemble_llm(rules_df: pd.DataFrame, verdicts: dict) -> pd.DataFrame:
+    """Rules-scored frame + LLM columns, matching run_llm_scoring's output."""
+    df = rules_df.copy()
+    for col in VERDICT_COLUMNS:
+        df[col] = '' if col == 'llm_reason' else pd.NA
+    df['final_score'] = 0.0
+    df['final_classification'] = 'no'
+
+    no_mask = df['rules_classification'] == 'no'
+    df.loc[no_mask, 'final_score'] = df.loc[no_mask, 'rules_score']
+
+    review = (df['rules_classification'] == 'review') & df['username'].isin(verdicts)
+    users = df.loc[review, 'username']
+    for col, key in VERDICT_COLUMNS.items():
+        df.loc[review, col] = pd.Series([verdicts[u].get(key) for u in users], index=users.index, dtype=object)
+    return df
+
+
+def _assemble_final(llm_df: pd.DataFrame, gate_results: dict, tags: dict) -> pd.DataFrame:
+    """Apply gate verdicts and category tags, matching apply_validation_gate + tagger output."""
+    df = llm_df.copy()
+    review = df['rules_classification'] == 'review'
+    scores = pd.to_numeric(df.loc[review, 'llm_score'], errors='coerce').fillna(0.0)
+    df.loc[review, 'final_score'] = scores.astype(float)
+
+    outcome = df['username'].map(gate_results)
+    # Review records never reached the gate only if their LLM batch failed: low score
+    outcome = outcome.where(~review | df['username'].isin(gate_results), 'low_score')
+    approved = review & df['username'].isin(gate_results) & outcome.isna()
+    df.loc[review, 'final_classification'] = 'no'
+    df.loc[approved, 'final_classification'] = 'yes'
+
+    no_shop = review & (outcome == 'no_shop')
+    df.loc[no_shop, 'llm_reason'] = [
+        (reason + NO_SHOP_SUFFIX).strip(' |') for reason in df.loc[no_shop, 'llm_reason']
+    ]
+
+    df['categories'] = ''
+    df['vendor_tags'] = ''
+    users = df.loc[approved, 'username']
+    default = (json.dumps(['Other Handmade']), json.dumps([]))
+    df.loc[approved, 'categories'] = [tags.get(u, default)[0] for u in users]
+    df.loc[approved, 'vendor_tags'] = [tags.get(u, default)[1] for u in users]
+
+    counts = outcome[review].value_counts(dropna=False)
+    print(f"\n[stream] Final results:")
+    print(f"  LLM reviewed: {int(review.sum())}")
+    print(f"  Gate rejections: { {k: int(counts.get(k, 0)) for k in ('no_shop', 'low_score', 'no_products', 'non_shop_url')} }")
+    print(f"  Final YES: {int(approved.sum())}")
+    return df
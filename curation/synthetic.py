@@ -0,0 +1,161 @@
+"""
+Synthetic Instagram-export generator for benchmarks and scale tests.
+
+Produces CSVs shaped like the scraper output that `load_data` consumes:
+bios mixing the config keyword lists with filler text, external URLs across
+shop / aggregator / non-shop / big-brand / own domains (most wrapped in
+Instagram's l.instagram.com redirect), website og/meta descriptions that
+often repeat each other, duplicate usernames and private accounts.
+
+Usage:
+    python -m curation.synthetic --rows 100000 --out data/synthetic_100k.csv
+"""
+import argparse
+import csv
+import os
+import random
+from urllib.parse import quote
+
+from .config import (
+    PRODUCT_KEYWORDS, AESTHETIC_KEYWORDS, NEGATIVE_KEYWORDS, PERSONAL_ACCOUNT_SIGNALS,
+    SHOP_DOMAINS, LINK_AGGREGATOR_DOMAINS, NON_SHOP_DOMAINS, BIG_BRAND_DOMAINS,
+)
+
+COLUMNS = [
+    'id', 'username', 'fullName', 'biography', 'profileURL', 'externalUrl',
+    'websiteOgDescription', 'websiteMetaDescription', 'websiteTitle', 'tags',
+    'followersCount', 'followsCount', 'postsCount', 'isBusinessAccount', 'isPrivate',
+]
+
+FILLER = [
+    "based in", "LA", "Denver", "Austin", "PNW", "est. 2019", "✨", "🍄", "🌈",
+    "good energy", "new pieces weekly", "link below", "tap in", "love and light",
+    "art", "studio", "community", "she/her", "they/them", "dreamer", "vibes",
+]
+NAME_PARTS = [
+    "moon", "star", "cosmic", "kandi", "fae", "wild", "sun", "mystic", "lotus",
+    "velvet", "glow", "third_eye", "astral", "fungi", "prism", "rave", "bead",
+    "thread", "stitch", "clay", "spiral", "dream", "honey", "neon", "gypsy",
+]
+URL_TYPES = [  # (kind, weight)
+    ('none', 30), ('shop', 20), ('own_domain', 20), ('aggregator', 15),
+    ('non_shop', 10), ('big_brand', 5),
+]
+SHOP_PATHS = ["", "/", "/shop", "/products/item", "/collections/all", "/store"]
+
+
+def _username(rng: random.Random, i: int) -> str:
+    name = rng.choice(NAME_PARTS) + rng.choice(['', '.', '_']) + rng.choice(NAME_PARTS)
+    return f"{name}{i}" if rng.random() < 0.7 else f"{name}.{i}"
+
+
+def _bio(rng: random.Random) -> str:
+    parts = rng.sample(FILLER, rng.randint(1, 4))
+    profile = rng.random()
+    if profile < 0.35:  # maker
+        parts += rng.sample(PRODUCT_KEYWORDS, rng.randint(1, 3))
+        parts += rng.sample(AESTHETIC_KEYWORDS, rng.randint(0, 2))
+    elif profile < 0.55:  # festival-adjacent personal account
+        parts += rng.sample(PERSONAL_ACCOUNT_SIGNALS, rng.randint(1, 2))
+        parts += rng.sample(AESTHETIC_KEYWORDS, rng.randint(0, 1))
+    elif profile < 0.75:  # services / influencers
+        parts += rng.sample(NEGATIVE_KEYWORDS, rng.randint(1, 3))
+    rng.shuffle(parts)
+    bio = ' '.join(parts)
+    return bio if rng.random() > 0.3 else bio.title()
+
+
+def _external_url(rng: random.Random, username: str) -> str:
+    kind = rng.choices([k for k, _ in URL_TYPES], weights=[w for _, w in URL_TYPES])[0]
+    slug = username.replace('.', '').replace('_', '')
+    if kind == 'none':
+        return ''
+    if kind == 'shop':
+        domain = rng.choice(SHOP_DOMAINS)
+        url = f"https://www.{domain}/shop/{slug}" if domain == 'etsy.com' else f"https://{slug}.{domain}/"
+    elif kind == 'own_domain':
+        url = f"https://www.{slug}.{rng.choice(['com', 'co', 'shop', 'art'])}{rng.choice(SHOP_PATHS)}"
+    elif kind == 'aggregator':
+        url = f"https://{rng.choice(LINK_AGGREGATOR_DOMAINS)}/{slug}"
+    elif kind == 'non_shop':
+        url = f"https://www.{rng.choice(NON_SHOP_DOMAINS)}/{slug}"
+    else:
+        url = f"https://{rng.choice(BIG_BRAND_DOMAINS)}/"
+    if rng.random() < 0.6:
+        return f"https://l.instagram.com/?u={quote(url, safe='')}&e=AT{rng.getrandbits(32):x}"
+    return url
+
+
+def _record(rng: random.Random, i: int, username: str = None) -> dict:
+    username = username or _username(rng, i)
+    external = _external_url(rng, username)
+    has_site = bool(external) and rng.random() < 0.6
+    og = ''
+    meta = ''
+    title = ''
+    if has_site:
+        og = ' '.join(rng.sample(PRODUCT_KEYWORDS + AESTHETIC_KEYWORDS + FILLER, 4))
+        meta = og if rng.random() < 0.5 else ' '.join(rng.sample(FILLER, 3))
+        title = f"{username.replace('.', ' ').title()} | {rng.choice(['Shop', 'Home', 'Store', 'Art'])}"
+    return {
+        'id': str(10_000_000 + i),
+        'username': username,
+        'fullName': username.replace('.', ' ').replace('_', ' ').title(),
+        'biography': _bio(rng),
+        'profileURL': f"https://www.instagram.com/{username}/",
+        'externalUrl': external,
+        'websiteOgDescription': og,
+        'websiteMetaDescription': meta,
+        'websiteTitle': title,
+        'tags': ', '.join(rng.sample(AESTHETIC_KEYWORDS, rng.randint(0, 2))),
+        'followersCount': str(int(rng.lognormvariate(7, 1.6))),
+        'followsCount': str(int(rng.lognormvariate(6, 1))),
+        'postsCount': str(int(rng.lognormvariate(5, 1.2))),
+        'isBusinessAccount': rng.choice(['TRUE', 'FALSE']),
+        'isPrivate': 'TRUE' if rng.random() < 0.05 else 'FALSE',
+    }
+
+
+def generate_csv(path: str, rows: int, seed: int = 42, duplicate_rate: float = 0.03) -> str:
+    """Write `rows` synthetic records to `path` (deterministic for a given seed)."""
+    rng = random.Random(seed)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    recent = []
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS)
+        writer.writeheader()
+        for i in range(rows):
+            if recent and rng.random() < duplicate_rate:
+                # Re-scraped account: same username, messy casing/whitespace
+                dup = rng.choice(recent)
+                record = _record(rng, i, username=f" {dup.upper()} " if rng.random() < 0.5 else dup)
+            else:
+                record = _record(rng, i)
+                recent.append(record['username'])
+                if len(recent) > 1000:
+                    recent.pop(0)
+            writer.writerow(record)
+    return path
+
+
+def parse_size(text: str) -> int:
+    """'10k' → 10000, '1m' → 1000000, '2500' → 2500."""
+    text = text.strip().lower()
+    multiplier = {'k': 1_000, 'm': 1_000_000}.get(text[-1:], 1)
+    return int(float(text.rstrip('km')) * multiplier)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic scraper CSV")
+    parser.add_argument("--rows", default="10k", help="Row count, e.g. 10k, 100k, 1m")
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rows = parse_size(args.rows)
+    generate_csv(args.out, rows, seed=args.seed)
+    print(f"[synthetic] Wrote {rows:,} records to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,24 @@
 Test suite v2: validates against known cases from the audit.
 Run: python -m curation.test_curation
 """
+import json
+import os
+import tempfile
 import pandas as pd
-from .rules_engine import score_record
+from .data_loader import _join_unique_columns, load_data
+from .synthetic import generate_csv
+from .incremental import split_changed
+from .checkpoints import run_stage, load_checkpoint
+from .llm_curator import scoring_complete
+from .sharding import shard_of, coordinate, claim_shard, queue_status
+from .store import VendorStore
+from .run_diff import record_run_diff
+from .rules_engine import score_record, score_frame
+from .whatif import simulation_frame, simulate
+from .compiled_config import load_compiled, artifact_path, compiled_config, KEYWORD_LISTS
+from .dedup import drop_duplicates
+from .writers import write_curated_vendors
+from . import config
 
 # Ground truth YES vendors — should survive rules (classification=review)
 KNOWN_YES = [
@@ -158,6 +174,211 @@ def run_tests():
         if not ok:
             print(f"    Reasons: {result['reasons']}")
 
+    print("\n--- DATA LOADER (website_description join matches row-wise unique) ---")
+    parts = [
+        pd.Series(['Foo shop', '', 'a', '', 'x']),
+        pd.Series(['Foo shop', 'meta', 'b', '', 'y']),
+        pd.Series(['', 'meta', 'a', '', 'x']),
+    ]
+    expected = (
+        pd.concat(parts, axis=1)
+        .apply(lambda row: ' | '.join(filter(None, row.unique())), axis=1)
+        .tolist()
+    )
+    got = _join_unique_columns(parts, index=parts[0].index).tolist()
+    ok = got == expected
+    if ok: passed += 1
+    else: failed += 1
+    print(f"  {'✓' if ok else '✗'} {'PASS' if ok else 'FAIL'} website_description → {got}")
+
+    print("\n--- INCREMENTAL (only new/changed profiles are re-curated) ---")
+    previous = pd.DataFrame(KNOWN_YES)
+    previous['rules_classification'] = 'review'
+    previous['llm_score'] = 0.9
+    previous['final_classification'] = 'yes'
+    new = pd.DataFrame(KNOWN_YES[:2] + KNOWN_NO[:1])
+    new.loc[0, 'followers'] += 50                   # follower drift: unchanged
+    new.loc[1, 'biography'] += ' new drop!'          # bio edit: changed
+    changed, carried = split_changed(new, previous)
+    ok = (sorted(changed['username']) == ['go.with.the.bo', 'mindfulldesign.co']
+          and carried['username'].tolist() == ['dnbeadz']
+          and carried.loc[0, 'followers'] == new.loc[0, 'followers'])
+    if ok: passed += 1
+    else: failed += 1
+    print(f"  {'✓' if ok else '✗'} {'PASS' if ok else 'FAIL'} changed={sorted(changed['username'])}"
+          f" carried={carried['username'].tolist()}")
+
+    print("\n--- CHECKPOINTS (failed LLM batches are neither saved nor reused) ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        scored = previous.copy()
+        scored.loc[0, 'llm_score'] = pd.NA               # batch failed
+        builds = []
+        build = lambda frame: lambda: builds.append(1) or frame
+        run_stage(tmp, 'llm', 'fp', build(scored), complete=scoring_complete)
+        saved_partial = load_checkpoint(tmp, 'llm') is not None
+        run_stage(tmp, 'llm', 'fp', build(previous), complete=scoring_complete)
+        run_stage(tmp, 'llm', 'fp', build(previous), complete=scoring_complete)
+        retried, _ = split_changed(pd.DataFrame(KNOWN_YES), scored)
+    ok = not saved_partial and len(builds) == 2 and retried['username'].tolist() == [scored.loc[0, 'username']]
+    if ok: passed += 1
+    else: failed += 1
+    print(f"  {'✓' if ok else '✗'} {'PASS' if ok else 'FAIL'} partial saved={saved_partial}, "
+          f"builds={len(builds)}, re-curated={retried['username'].tolist()}")
+
+    print("\n--- WRITERS (malformed category/tag text can't break the JSON output) ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        curated = pd.DataFrame(KNOWN_YES)
+        curated['final_score'] = 0.9
+        curated['categories'] = ['["Jewelry", "Art"]', "['Jewelry']", '']
+        curated['vendor_tags'] = ['["beads"]', '[beads]', '["beads"]']
+        path = os.path.join(tmp, 'curated_vendors.json')
+        write_curated_vendors(curated, path)
+        with open(path) as f:
+            written = [(v['categories'], v['tags']) for v in json.load(f)]
+    ok = written == [(['Jewelry', 'Art'], ['beads']), (['Other Handmade'], []), (['Other Handmade'], ['beads'])]
+    if ok: passed += 1
+    else: failed += 1
+    print(f"  {'✓' if ok else '✗'} {'PASS' if ok else 'FAIL'} {written}")
+
+    print("\n--- DEDUP (backup accounts and shared shops fold into one vendor) ---")
+    bio = 'handmade kandi cuffs and perler beads for raves, restocks every friday'
+    vendors = pd.DataFrame({
+        'username': ['kandikid', 'kandikid.backup', 'kandi_kid_shop', 'glowthreads', 'glowthreads2'],
+        'external_url': ['https://www.etsy.com/shop/KandiKid', 'https://etsy.com/shop/kandikid', '',
+                         'https://linktr.ee/glowthreads', 'https://linktr.ee/glowthreads'],
+        'all_text': [bio, bio + ' | backup account', bio.replace('friday', 'saturday'),
+                     'crochet festival tops and bucket hats made to order',
+                     'stick and poke tattoos, denver. books open monthly'],
+        'followers': [900, 40, 1200, 300, 300],
+        'is_business': [True, False, True, True, True],
+    })
+    kept, duplicates = drop_duplicates(vendors)
+    ok = (kept['username'].tolist() == ['kandi_kid_shop', 'glowthreads', 'glowthreads2']
+          and set(duplicates['duplicate_of']) == {'kandi_kid_shop'})
+    if ok: passed += 1
+    else: failed += 1
+    print(f"  {'✓' if ok else '✗'} {'PASS' if ok else 'FAIL'} kept={kept['username'].tolist()}")
+
+    print("\n--- SYNTHETIC EXPORT (generator output loads cleanly) ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = generate_csv(os.path.join(tmp, 'synthetic.csv'), 500, seed=7)
+        raw = pd.read_csv(path, dtype=str)
+        df = load_data(path)
+    ok = (len(df) < len(raw)
+          and df['username'].is_unique
+          and (df['external_url'] != '').any()
+          and not df['external_url'].str.contains('l.instagram.com').any())
+    if ok: passed += 1
+    else: failed += 1
+    print(f"  {'✓' if ok else '✗'} {'PASS' if ok else 'FAIL'} {len(raw)} raw rows → {len(df)} loaded")
+
+    print("\n--- RULES EQUIVALENCE (what-if simulator matches the rules engine) ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        scored = score_frame(load_data(generate_csv(os.path.join(tmp, 'synthetic.csv'), 300, seed=4)))
+    frame = simulation_frame(scored)
+    same = simulate(frame)
+    stricter = simulate(frame, {'MIN_FOLLOWERS': 300})
+    expected = (scored['rules_classification'] == 'review') & (scored['followers'] >= 300)
+    ok = ((same['rules_classification'] == scored['rules_classification']).all()
+          and (same['rules_score'] - scored['rules_score']).abs().max() < 1e-9
+          and ((stricter['rules_classification'] == 'review') == expected).all())
+    if ok: passed += 1
+    else: failed += 1
+    print(f"  {'✓' if ok else '✗'} {'PASS' if ok else 'FAIL'} {len(scored)} records, "
+          f"{int(expected.sum())} review at MIN_FOLLOWERS=300")
+
+    print("\n--- COMPILED CONFIG (artifact is reused and matches the config lists) ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        first = load_compiled(tmp)
+        second = load_compiled(tmp)
+        files = os.listdir(tmp)
+    texts = [KNOWN_YES[0]['all_text'], 'HAND MADE tie-dye, made to order | dm for orders', '']
+    expected = [{name: [kw for kw in getattr(config, name) if t and kw.lower() in t.lower()]
+                 for name in KEYWORD_LISTS} for t in texts]
+    ok = (files == [os.path.basename(artifact_path(first.fingerprint))]
+          and second.fingerprint == first.fingerprint
+          and compiled_config() is compiled_config()
+          and [second.match_keywords(t) for t in texts] == expected)
+    if ok: passed += 1
+    else: failed += 1
+    print(f"  {'✓' if ok else '✗'} {'PASS' if ok else 'FAIL'} {files}")
+
+    print("\n--- SHARDING (every record in exactly one shard, claims are exclusive) ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = generate_csv(os.path.join(tmp, 'synthetic.csv'), 300, seed=3)
+        queue_dir = os.path.join(tmp, 'queue')
+        coordinate(path, queue_dir, num_shards=4)
+        shards = queue_status(queue_dir)
+        claims = [claim_shard(queue_dir, f"w{i}") for i in range(len(shards) + 1)]
+        total_records = sum(s['records'] for s in shards)
+        loaded = len(load_data(path))
+    ok = (total_records == loaded
+          and shard_of(['moon.star1'], 4) == shard_of(['moon.star1'], 4)
+          and len({c['shard'] for c in claims[:-1]}) == len(shards)
+          and claims[-1] is None)
+    if ok: passed += 1
+    else: failed += 1
+    print(f"  {'✓' if ok else '✗'} {'PASS' if ok else 'FAIL'} {loaded} records → "
+          f"{[s['records'] for s in shards]}, {len(shards)} distinct claims")
+
+    print("\n--- STORE (partial updates keep the rest of the record) ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = VendorStore(os.path.join(tmp, 'vendors.db'))
+        store.upsert_vendors([
+            {'username': 'a', 'score': 0.9, 'category': 'Jewelry', 'tags': ['beads'], 'images': ['1.jpg']},
+            {'username': 'b', 'score': 0.7, 'category': 'Clothing', 'tags': [], 'images': []},
+        ])
+        store.update_vendor('a', bio='Hand beaded')
+        store.set_images('b', ['2.jpg', '3.jpg'])
+        manifest = os.path.join(tmp, 'manifest.json')
+        with open(manifest, 'w') as f:
+            json.dump({'2.jpg': {'variants': [{'file': '2-320.webp', 'type': 'image/webp', 'width': 320}]}}, f)
+        site = store.export_site(os.path.join(tmp, 'site', 'vendors.json'), manifest_file=manifest)
+    a, b = site['vendors']
+    ok = (a['bio'] == 'Hand beaded' and a['images'] == ['1.jpg'] and 'sources' not in a
+          and b['images'] == ['2.jpg', '3.jpg'] and site['tags'] == ['beads']
+          and b['sources'] == {'2.jpg': {'image/webp': '2-320.webp 320w'}})
+    if ok: passed += 1
+    else: failed += 1
+    print(f"  {'✓' if ok else '✗'} {'PASS' if ok else 'FAIL'} {site['total_vendors']} vendors exported")
+
+    print("\n--- RUN DIFF (flips, additions and removals between runs) ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = VendorStore(os.path.join(tmp, 'vendors.db'))
+        first = pd.DataFrame({'username': ['a', 'b', 'c'], 'final_classification': ['yes', 'yes', 'no'],
+                              'final_score': [0.9, 0.8, 0.2], 'llm_reason': ['shop', 'shop', '']})
+        second = pd.DataFrame({'username': ['a', 'b', 'd'], 'final_classification': ['yes', 'no', 'yes'],
+                               'final_score': [0.91, 0.3, 0.7], 'llm_reason': ['shop', 'no shop', 'shop']})
+        for frame in (first, second):
+            run_id = store.start_run('curation', output_dir=tmp)
+            diff = record_run_diff(store, run_id, frame, tmp)
+            store.finish_run(run_id, **(diff or {}))
+        indexed = {c['username']: c['change'] for c in store.verdict_changes(run_id)}
+    ok = (indexed == {'b': 'rejected', 'c': 'removed', 'd': 'added'}
+          and diff['delta'] == {'upsert': 1, 'remove': 1})
+    if ok: passed += 1
+    else: failed += 1
+    print(f"  {'✓' if ok else '✗'} {'PASS' if ok else 'FAIL'} {indexed}")
+
+    print("\n--- SCRAPE JOBS (resume interrupted, retry failed, refresh stale) ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = VendorStore(os.path.join(tmp, 'vendors.db'))
+        store.due_scrape_jobs('scrape', ['a', 'b', 'c', 'd'])
+        store.start_scrape_job('scrape', 'a')
+        store.finish_scrape_job('scrape', 'a')
+        for _ in range(3):
+            store.start_scrape_job('scrape', 'b')
+            store.finish_scrape_job('scrape', 'b', '❌ All images filtered out')
+        store.start_scrape_job('scrape', 'c')          # run died before c finished
+        resumed = store.due_scrape_jobs('scrape', ['d', 'c', 'b', 'a'], max_attempts=3)
+        refresh = store.due_scrape_jobs('scrape', ['a', 'b'], stale_before='9999-01-01')
+        b = store.scrape_jobs('scrape', status='failed')[0]
+    ok = (resumed == {'d': 'new', 'c': 'interrupted'} and refresh == {'a': 'stale', 'b': 'retry'}
+          and b['attempts'] == 3 and b['last_error'] == '❌ All images filtered out')
+    if ok: passed += 1
+    else: failed += 1
+    print(f"  {'✓' if ok else '✗'} {'PASS' if ok else 'FAIL'} resume {resumed}, refresh {refresh}")
+
     total = passed + failed
     print(f"\n{'='*60}")
     print(f"Results: {passed}/{total} passed, {failed} failed")
@@ -0,0 +1,330 @@
+"""
+What-if simulator: replay rules + gate under an alternative config, no API calls.
+
+    python -m curation.whatif --output output/ --set LLM_YES_THRESHOLD=0.65
+    python -m curation.whatif --output output/ --set MIN_FOLLOWERS=100 \
+        --add PRODUCT_KEYWORDS="hand dyed" --remove NEGATIVE_KEYWORDS=merch
+    python -m curation.whatif --output output/ --interactive
+
+Starts from the last run's checkpoint (rules signals + LLM verdicts) plus the
+verdict cache in the vendor store, and re-applies the rules engine and the
+validation gate to whole columns at once (same decisions as score_record /
+gate_rejection, see the RULES EQUIVALENCE test). Keyword list edits only
+scan the text for the added/removed keywords; the other counts come from the
+cached signals. Changing the URL domain lists still needs a pipeline run.
+
+Records that the alternative config would newly send to the LLM and that
+have no cached verdict can't be decided offline; they are reported as
+`needs_llm` instead of being guessed.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import shlex
+import time
+
+from . import config
+from .checkpoints import load_checkpoint
+from .compact import COUNT_SIGNALS
+from .llm_curator import DM_ORDER_PATTERNS
+from .store import VendorStore
+from .lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+THRESHOLDS = ('RULES_NO_THRESHOLD', 'LLM_YES_THRESHOLD', 'MIN_FOLLOWERS', 'REQUIRE_SHOP_URL')
+# Keyword list → the cached signal count it produces
+KEYWORD_LISTS = {
+    'PRODUCT_KEYWORDS': 'product_signals',
+    'AESTHETIC_KEYWORDS': 'aesthetic_signals',
+    'NEGATIVE_KEYWORDS': 'negative_signals',
+    'PERSONAL_ACCOUNT_SIGNALS': 'personal_signals',
+}
+LISTS = (*KEYWORD_LISTS, 'BIG_BRAND_DOMAINS')
+URL_BONUS = {'shop': 0.15, 'own_domain': 0.10, 'aggregator': 0.05, 'non_shop': -0.10}
+
+
+def baseline_settings() -> dict:
+    """Current values of everything the simulator can change."""
+    return {name: getattr(config, name) for name in (*THRESHOLDS, *LISTS)}
+
+
+def load_cached(output_dir: str, store_file: str = config.STORE_FILE) -> pd.DataFrame:
+    """
+    The last run's final frame (tagged, else llm checkpoint) reduced to the
+    columns the simulator needs, with LLM verdicts from the store filled in.
+    """
+    df = load_checkpoint(output_dir, 'tagged')
+    if df is None:
+        df = load_checkpoint(output_dir, 'llm')
+    if df is None:
+        raise FileNotFoundError(f"No tagged/llm checkpoint in {output_dir}; run the pipeline first")
+    return simulation_frame(df, VendorStore(store_file).verdicts())
+
+
+def simulation_frame(df: pd.DataFrame, cached: dict = None) -> pd.DataFrame:
+    """Reduce a rules-scored (optionally LLM-scored) frame to the simulator's columns."""
+    cached = cached or {}
+    if 'url_type' in df.columns:
+        signals = df[['url_type', *COUNT_SIGNALS]].copy()
+    else:
+        signals = pd.DataFrame.from_records(
+            [s if isinstance(s, dict) else {} for s in df['signals']], index=df.index)
+    frame = pd.DataFrame({
+        'username': df['username'].astype(str),
+        'all_text': df['all_text'].fillna('').astype(str),
+        'biography': df['biography'].astype(str).str.lower(),
+        'followers': pd.to_numeric(df['followers'], errors='coerce').fillna(0),
+        'domain': df['domain'].fillna('').astype(str).str.strip().str.lower(),
+        'has_url': df['external_url'].fillna('').astype(str).str.strip() != '',
+        'is_business': df['is_business'].fillna(False).astype(bool),
+        'url_type': signals['url_type'].fillna('none').astype(str),
+        'recorded': df['final_classification'].astype(str) if 'final_classification' in df.columns else '',
+    }, index=df.index)
+    for col in COUNT_SIGNALS:
+        frame[col] = pd.to_numeric(signals[col], errors='coerce').fillna(0).astype(int)
+
+    # LLM verdicts: from the run itself, then anything else in the cache
+    llm_score = pd.to_numeric(df['llm_score'], errors='coerce') if 'llm_score' in df.columns \
+        else pd.Series(np.nan, index=df.index)
+    sells = df['sells_products'] if 'sells_products' in df.columns else pd.Series(pd.NA, index=df.index)
+    missing = llm_score.isna() & frame['username'].isin(cached)
+    if missing.any():
+        names = frame.loc[missing, 'username']
+        llm_score[missing] = [cached[u].get('score') for u in names]
+        sells = sells.astype(object)
+        sells[missing] = [cached[u].get('sells_products') for u in names]
+    frame['llm_score'] = pd.to_numeric(llm_score, errors='coerce')
+    frame['sells_products'] = [None if v is None or v is pd.NA or (isinstance(v, float) and np.isnan(v))
+                               else bool(v) for v in sells]
+    return frame.reset_index(drop=True)
+
+
+def _keyword_hits(text: pd.Series, keywords) -> pd.Series:
+    hits = pd.Series(0, index=text.index)
+    for kw in keywords:
+        hits += text.str.contains(kw.lower(), regex=False)
+    return hits
+
+
+def simulate(frame: pd.DataFrame, settings: dict = None) -> pd.DataFrame:
+    """
+    Rules classification + gate for every record under `settings` (defaults:
+    current config). Returns rules_score, rules_classification, rejection
+    (rules | needs_llm | low_score | no_shop | no_products | non_shop_url | None)
+    and final_classification.
+    """
+    base = baseline_settings()
+    settings = {**base, **(settings or {})}
+
+    counts = {}
+    lowered = None
+    for name, col in KEYWORD_LISTS.items():
+        added = set(settings[name]) - set(base[name])
+        removed = set(base[name]) - set(settings[name])
+        counts[col] = frame[col]
+        if added or removed:
+            if lowered is None:
+                lowered = frame['all_text'].str.lower()
+            counts[col] = frame[col] + _keyword_hits(lowered, added) - _keyword_hits(lowered, removed)
+    product, aesthetic = counts['product_signals'], counts['aesthetic_signals']
+    negative, personal = counts['negative_signals'], counts['personal_signals']
+    url_type = frame['url_type']
+
+    # Instant rejects, in score_record's order
+    empty_text = frame['all_text'].str.replace('|', '', regex=False).str.strip() == ''
+    rejects = [
+        (frame['domain'].isin(settings['BIG_BRAND_DOMAINS']), 0.0),
+        (frame['followers'] < settings['MIN_FOLLOWERS'], 0.05),
+        (empty_text & ~frame['has_url'], 0.0),
+        ((url_type == 'none') & ~frame['is_business'] & (product == 0) & (aesthetic == 0), 0.05),
+        ((personal > 0) & (product == 0), 0.10),
+        ((url_type == 'non_shop') & (product == 0), 0.10),
+        ((negative >= 2) & (product == 0) & (aesthetic == 0), 0.10),
+    ]
+    rejected = np.logical_or.reduce([mask for mask, _ in rejects])
+
+    score = (0.3
+             + np.minimum(product * 0.06, 0.25)
+             + np.minimum(aesthetic * 0.04, 0.15)
+             + url_type.map(URL_BONUS).fillna(0.0)
+             + frame['is_business'] * 0.05
+             - np.minimum(negative * 0.08, 0.25))
+    score = score.clip(0.0, 1.0)
+    review = ~rejected & (score >= settings['RULES_NO_THRESHOLD'])
+    score = pd.Series(np.select([m for m, _ in rejects], [s for _, s in rejects], default=score.round(3)),
+                      index=frame.index)
+
+    # Validation gate (gate_rejection), for review records with a verdict
+    has_shop = url_type.isin(['shop', 'own_domain', 'aggregator']) | frame['biography'].str.contains(
+        '|'.join(map(re.escape, DM_ORDER_PATTERNS)))
+    rejection = np.select(
+        [~review,
+         frame['llm_score'].isna(),
+         frame['llm_score'] < settings['LLM_YES_THRESHOLD'],
+         settings['REQUIRE_SHOP_URL'] & ~has_shop,
+         frame['sells_products'] == False,  # noqa: E712 — None (unknown) passes, like the gate
+         url_type == 'non_shop'],
+        ['rules', 'needs_llm', 'low_score', 'no_shop', 'no_products', 'non_shop_url'],
+        default='',
+    )
+    return pd.DataFrame({
+        'username': frame['username'],
+        'rules_score': score,
+        'rules_classification': np.where(review, 'review', 'no'),
+        'rejection': pd.Series(rejection, index=frame.index).replace('', None),
+        'final_classification': np.where(rejection == '', 'yes', 'no'),
+    })
+
+
+def compare(frame: pd.DataFrame, settings: dict) -> dict:
+    """Baseline vs what-if counts plus the vendors that flip either way."""
+    start = time.perf_counter()
+    before = simulate(frame)
+    after = simulate(frame, settings)
+    elapsed = time.perf_counter() - start
+
+    approved_before = before['final_classification'] == 'yes'
+    approved_after = after['final_classification'] == 'yes'
+    gained = after[approved_after & ~approved_before]
+    lost = after[approved_before & ~approved_after]
+    return {
+        'records': len(frame),
+        'reproduced': int((before['final_classification'] == frame['recorded']).sum()),
+        'approved': (int(approved_before.sum()), int(approved_after.sum())),
+        'review': (int((before['rules_classification'] == 'review').sum()),
+                   int((after['rules_classification'] == 'review').sum())),
+        'needs_llm': int((after['rejection'] == 'needs_llm').sum()),
+        'rejections': after['rejection'].value_counts().to_dict(),
+        'gained': list(zip(gained['username'], frame.loc[gained.index, 'llm_score'])),
+        'lost': list(zip(lost['username'], lost['rejection'])),
+        'seconds': elapsed,
+    }
+
+
+def print_report(report: dict, limit: int = 20):
+    before, after = report['approved']
+    print(f"  Approved:      {before} → {after} ({after - before:+d})")
+    print(f"  Sent to LLM:   {report['review'][0]} → {report['review'][1]}"
+          f" ({report['needs_llm']} without a cached verdict)")
+    print(f"  Rejections:    {report['rejections']}")
+    for label, rows in (('Newly approved', report['gained']), ('Newly rejected', report['lost'])):
+        if rows:
+            print(f"  {label} ({len(rows)}):")
+            for username, detail in rows[:limit]:
+                print(f"    {username:<30} {detail}")
+            if len(rows) > limit:
+                print(f"    ... and {len(rows) - limit} more")
+    print(f"  ({report['records']} records in {report['seconds'] * 1000:.0f} ms)")
+
+
+def apply_change(settings: dict, op: str, name: str, value: str) -> dict:
+    """settings with one `set NAME=value` / `add LIST=item` / `remove LIST=item` applied."""
+    settings = dict(settings)
+    if op == 'set':
+        if name not in THRESHOLDS:
+            raise ValueError(f"can only set {', '.join(THRESHOLDS)}")
+        try:
+            settings[name] = json.loads(value.lower() if value.lower() in ('true', 'false') else value)
+        except json.JSONDecodeError:
+            raise ValueError(f"{name}: not a number/boolean: {value}")
+    elif op in ('add', 'remove'):
+        if name not in LISTS:
+            raise ValueError(f"can only {op} to/from {', '.join(LISTS)}")
+        items = list(settings[name])
+        if op == 'add' and value not in items:
+            items.append(value)
+        elif op == 'remove':
+            items = [item for item in items if item != value]
+        settings[name] = items
+    else:
+        raise ValueError(f"unknown change: {op}")
+    return settings
+
+
+def describe_changes(settings: dict) -> list[str]:
+    base = baseline_settings()
+    lines = []
+    for name in THRESHOLDS:
+        if settings[name] != base[name]:
+            lines.append(f"{name}: {base[name]} → {settings[name]}")
+    for name in LISTS:
+        added = [k for k in settings[name] if k not in base[name]]
+        removed = [k for k in base[name] if k not in settings[name]]
+        if added or removed:
+            lines.append(f"{name}: " + ' '.join([f"+{k!r}" for k in added] + [f"-{k!r}" for k in removed]))
+    return lines
+
+
+def _split(change: str):
+    name, sep, value = change.partition('=')
+    if not sep:
+        raise ValueError(f"expected NAME=value, got {change!r}")
+    return name.strip(), value.strip()
+
+
+def interactive(frame: pd.DataFrame, settings: dict, limit: int = 20):
+    print("Commands: set NAME=value | add LIST=keyword | remove LIST=keyword | reset | show | quit")
+    while True:
+        try:
+            line = input("whatif> ").strip()
+        except EOFError:
+            break
+        if not line:
+            continue
+        op, _, rest = line.partition(' ')
+        if op in ('quit', 'exit'):
+            break
+        if op == 'reset':
+            settings = baseline_settings()
+        elif op != 'show':
+            try:
+                settings = apply_change(settings, op, *_split(' '.join(shlex.split(rest))))
+            except ValueError as e:
+                print(f"  {e}")
+                continue
+        for line in describe_changes(settings) or ['(current config)']:
+            print(f"  {line}")
+        print_report(compare(frame, settings), limit)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rules/gate what-if simulator (no API calls)")
+    parser.add_argument("--output", default="output", help="Output directory of the run to replay")
+    parser.add_argument("--db", default=config.STORE_FILE, help="Vendor store with cached LLM verdicts")
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE",
+                        help=f"Override one of {', '.join(THRESHOLDS)}")
+    parser.add_argument("--add", action="append", default=[], metavar="LIST=KEYWORD",
+                        help=f"Add a keyword/domain to one of {', '.join(LISTS)}")
+    parser.add_argument("--remove", action="append", default=[], metavar="LIST=KEYWORD")
+    parser.add_argument("--interactive", action="store_true", help="Prompt for changes after loading once")
+    parser.add_argument("--limit", type=int, default=20, help="Flipped vendors to list per direction")
+    args = parser.parse_args()
+
+    settings = baseline_settings()
+    try:
+        for op in ('set', 'add', 'remove'):
+            for change in getattr(args, op):
+                settings = apply_change(settings, op, *_split(change))
+    except ValueError as e:
+        parser.error(str(e))
+
+    frame = load_cached(args.output, args.db)
+    print(f"[whatif] {len(frame)} records from {args.output}")
+    if args.interactive:
+        interactive(frame, settings, args.limit)
+        return
+    for line in describe_changes(settings) or ['(current config)']:
+        print(f"  {line}")
+    report = compare(frame, settings)
+    if report['reproduced'] < report['records']:
+        print(f"  Note: current config reproduces {report['reproduced']}/{report['records']} recorded "
+              f"verdicts (config changed since the run?)")
+    print_report(report, args.limit)
+
+
+if __name__ == "__main__":
+    main()
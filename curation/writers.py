@@ -0,0 +1,122 @@
+"""
+Streaming writers for curated vendor output.
+
+Vendors are encoded straight from DataFrame columns in fixed-size chunks and
+written one record at a time, so memory stays flat regardless of how many
+vendors are approved. `categories` / `vendor_tags` hold JSON array text (as
+written by the category tagger); each distinct string is parsed and
+re-encoded once per write and the result reused for every row that repeats
+it, so malformed values (e.g. a Python list repr) fall back to the default
+instead of breaking the output.
+
+Formats:
+  json   — compact JSON array (curated_vendors.json, read by build_site_data)
+  ndjson — one vendor object per line (curated_vendors.ndjson)
+
+Uses orjson when installed, otherwise the stdlib json encoder.
+"""
+from __future__ import annotations
+
+import json
+
+from .lazy import lazy_import
+
+pd = lazy_import("pandas")
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+CHUNK_ROWS = 10_000
+DEFAULT_CATEGORIES = '["Other Handmade"]'
+DEFAULT_TAGS = '[]'
+
+# (output key, column, default, cast) — order matches the website schema
+HEAD_FIELDS = [
+    ('username', 'username', '', str),
+    ('biography', 'biography', '', None),
+    ('followers', 'followers', 0, int),
+    ('is_business', 'is_business', False, bool),
+    ('external_url', 'external_url', '', None),
+    ('domain', 'domain', '', None),
+    ('profile_url', 'profile_url', '', None),
+    ('website_title', 'website_title', '', None),
+    ('website_description', 'website_description', '', None),
+    ('confidence_score', 'final_score', 0, float),
+]
+TAIL_FIELDS = [
+    ('llm_reason', 'llm_reason', '', None),
+]
+
+
+def _dumps(obj) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj).decode('utf-8')
+    return json.dumps(obj, separators=(',', ':'))
+
+
+def _json_array_or(value, default: str, cache: dict) -> str:
+    """Compact JSON array re-encoded from `value`, or `default` when missing/invalid (memoized in cache)."""
+    if not isinstance(value, str):
+        return default
+    encoded = cache.get(value)
+    if encoded is None:
+        try:
+            parsed = json.loads(value)
+        except ValueError:
+            parsed = None
+        encoded = _dumps(parsed) if isinstance(parsed, list) else default
+        cache[value] = encoded
+    return encoded
+
+
+def _column(chunk: pd.DataFrame, col: str, default, cast) -> list:
+    if col not in chunk.columns:
+        return [default] * len(chunk)
+    values = chunk[col].tolist()
+    if cast is None:
+        return values
+    return [default if v is None or v is pd.NA else cast(v) for v in values]
+
+
+def iter_vendor_json(curated: pd.DataFrame):
+    """Yield one encoded JSON object (str) per curated vendor, in frame order."""
+    encoded_cats, encoded_tags = {}, {}
+    for start in range(0, len(curated), CHUNK_ROWS):
+        chunk = curated.iloc[start:start + CHUNK_ROWS]
+        head_cols = [_column(chunk, col, default, cast) for _, col, default, cast in HEAD_FIELDS]
+        tail_cols = [_column(chunk, col, default, cast) for _, col, default, cast in TAIL_FIELDS]
+        cats = _column(chunk, 'categories', '', None)
+        tags = _column(chunk, 'vendor_tags', '', None)
+        head_keys = [key for key, *_ in HEAD_FIELDS]
+        tail_keys = [key for key, *_ in TAIL_FIELDS]
+
+        for i in range(len(chunk)):
+            head = _dumps(dict(zip(head_keys, (c[i] for c in head_cols))))
+            tail = _dumps(dict(zip(tail_keys, (c[i] for c in tail_cols))))
+            yield (
+                f'{head[:-1]},"categories":{_json_array_or(cats[i], DEFAULT_CATEGORIES, encoded_cats)}'
+                f',"tags":{_json_array_or(tags[i], DEFAULT_TAGS, encoded_tags)},{tail[1:]}'
+            )
+
+
+def write_curated_vendors(curated: pd.DataFrame, path: str, fmt: str = 'json') -> int:
+    """Stream curated vendors to `path` as a JSON array or NDJSON. Returns the count."""
+    if fmt not in ('json', 'ndjson'):
+        raise ValueError(f"Unknown output format: {fmt}")
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        if fmt == 'json':
+            f.write('[')
+        for record in iter_vendor_json(curated):
+            if fmt == 'json':
+                f.write(',\n' if count else '\n')
+                f.write(record)
+            else:
+                f.write(record)
+                f.write('\n')
+            count += 1
+        if fmt == 'json':
+            f.write('\n]\n' if count else ']\n')
+    return count
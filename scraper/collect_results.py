@@ -1,48 +1,39 @@
 """
-Collect individual vendor JSON files into a single results file.
+Collect scraper results from the vendor store (and import any leftover
+per-vendor JSON files from older scraper runs).
 """
-import json
+import sys
 from pathlib import Path
 
-OUTPUT_DIR = Path(__file__).parent / "output"
+BASE_DIR = Path(__file__).parent.parent
+OUTPUT_DIR = BASE_DIR / "scraper" / "output"
+STORE_FILE = BASE_DIR / "output" / "vendors.db"
+
+sys.path.insert(0, str(BASE_DIR))
+from curation.store import VendorStore
 
 def main():
     print("📦 Collecting individual vendor results...")
-    
-    results = []
-    json_files = sorted(OUTPUT_DIR.glob("*.json"))
-    
-    # Skip summary files
-    skip_files = {'non_etsy_results.json', 'non_etsy_results_v2.json', 
-                  'scrape_v2_summary.json', 'test_run_final_summary.json',
-                  'PHASE1_TEST_SUMMARY.json', 'etsy_scrape_raw.json'}
-    
-    for json_file in json_files:
-        if json_file.name in skip_files:
-            continue
-        
-        try:
-            with open(json_file, 'r') as f:
-                data = json.load(f)
-                results.append(data)
-                print(f"  ✓ {data['username']}")
-        except Exception as e:
-            print(f"  ✗ {json_file.name}: {e}")
-    
-    # Save collected results
-    output_file = OUTPUT_DIR / "non_etsy_results_v2.json"
-    with open(output_file, 'w') as f:
-        json.dump(results, f, indent=2)
-    
+
+    store = VendorStore(STORE_FILE)
+    if OUTPUT_DIR.is_dir():
+        imported = store.import_scrape_files(OUTPUT_DIR)
+        if imported:
+            print(f"  ✓ Imported {imported} per-vendor files from {OUTPUT_DIR}")
+
+    results = [r for r in store.scrape_results() if 'images' in r]
+    for r in results:
+        print(f"  ✓ {r['username']}")
+
     print(f"\n✅ Collected {len(results)} vendor results")
-    print(f"💾 Saved to: {output_file}")
-    
+    print(f"💾 Stored in: {STORE_FILE}")
+
     # Create summary
     source_counts = {}
     for r in results:
         source = r.get('source', 'unknown')
         source_counts[source] = source_counts.get(source, 0) + 1
-    
+
     print(f"\n📊 Source Breakdown:")
     for source, count in sorted(source_counts.items()):
         print(f"   {source.ljust(25)} {count:3d}")
@@ -0,0 +1,226 @@
+"""
+Concurrent, polite HTTP for the scrapers.
+
+Vendors are scraped many at a time on an asyncio event loop, but every
+request goes through one Fetcher, which keeps per-host limits:
+  - at most HOST_CONCURRENCY requests in flight to a host, and
+  - at least HOST_DELAY seconds between the starts of two requests to it
+    (a (min, max) pair gives a random delay in that range).
+Image CDNs shared by many shops (cdn.shopify.com, ...) get their own,
+looser limits in CDN_LIMITS so one vendor's images don't queue behind
+another's. Global throughput grows with the number of vendors; no single
+shop sees more than one request at a time.
+
+The blocking `requests` calls run on a thread pool (one pooled Session per
+thread), so the scraping code stays plain `requests`/BeautifulSoup. With a
+`cache` (scraper/http_cache.py), GETs are revalidated against the on-disk
+copy and 304s are served from disk. With `processes`, CPU-bound work
+(image decode/resize) goes to a process pool via run_cpu, fed by the
+downloads as they finish.
+
+    async def scrape(vendor, fetcher):
+        response = await fetcher.get(vendor['shop_url'])
+        soup = await fetcher.run(parse_html, response.content)
+
+    async def main():
+        async with Fetcher() as fetcher:
+            async for vendor, result in fetcher.map(scrape, vendors):
+                ...
+"""
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from functools import partial
+from urllib.parse import urlsplit
+
+import requests
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+REQUEST_TIMEOUT = 15
+CONCURRENCY = 16          # requests in flight across all hosts
+VENDOR_CONCURRENCY = 32   # vendors being scraped at once
+HOST_CONCURRENCY = 1
+HOST_DELAY = 0.5          # seconds between requests to one host (or a (min, max) range)
+# host suffix → (concurrency, delay) for CDNs that serve many shops
+CDN_LIMITS = {
+    'cdn.shopify.com': (8, 0.0),
+    'assets.bigcartel.com': (4, 0.1),
+    'images.squarespace-cdn.com': (4, 0.1),
+    'static.wixstatic.com': (4, 0.1),
+    'cloudfront.net': (4, 0.1),
+}
+
+
+def host_of(url: str) -> str:
+    return (urlsplit(url).hostname or '').lower()
+
+
+class Fetcher:
+    def __init__(self, concurrency: int = CONCURRENCY, host_concurrency: int = HOST_CONCURRENCY,
+                 host_delay=HOST_DELAY, headers: dict = None, timeout: float = REQUEST_TIMEOUT,
+                 cache=None, processes: int = 0):
+        self.concurrency = concurrency
+        self.host_concurrency = host_concurrency
+        self.host_delay = host_delay
+        self.headers = dict(HEADERS if headers is None else headers)
+        self.timeout = timeout
+        self.cache = cache
+        self.stats = {'requests': 0, 'errors': 0, 'bytes': 0, 'hosts': 0, 'cached': 0, 'cached_bytes': 0}
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='fetch')
+        self._processes = ProcessPoolExecutor(max_workers=processes) if processes else None
+        self._local = threading.local()
+        self._hosts = {}      # host → [semaphore, next start time, delay]
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if self._processes is not None:
+            self._processes.shutdown(wait=True, cancel_futures=True)
+
+    # ------------------------------------------------------------ politeness
+
+    def _limits(self, host: str):
+        for suffix, limits in CDN_LIMITS.items():
+            if host == suffix or host.endswith('.' + suffix):
+                return limits
+        return self.host_concurrency, self.host_delay
+
+    def _host_state(self, host: str):
+        state = self._hosts.get(host)
+        if state is None:
+            concurrency, delay = self._limits(host)
+            state = self._hosts[host] = [asyncio.Semaphore(concurrency), 0.0, delay]
+            self.stats['hosts'] += 1
+        return state
+
+    async def _wait_turn(self, state):
+        """Reserve this host's next start slot and sleep until it (event loop time)."""
+        delay = state[2]
+        if isinstance(delay, tuple):
+            delay = random.uniform(*delay)
+        now = time.monotonic()
+        start = max(now, state[1])
+        state[1] = start + delay
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    # --------------------------------------------------------------- requests
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            session.headers.update(self.headers)
+        return session
+
+    def _send(self, method: str, url: str, kwargs: dict) -> requests.Response:
+        kwargs.setdefault('timeout', self.timeout)
+        if method == 'GET' and self.cache is not None:
+            return self.cache.get(self._session(), url, **kwargs)
+        return self._session().request(method, url, **kwargs)
+
+    def _send_prefix(self, url: str, size: int) -> dict:
+        """GET the first `size` bytes (Range request; servers that ignore it are cut off)."""
+        response = self._session().get(url, headers={'Range': f'bytes=0-{size - 1}'},
+                                       stream=True, timeout=self.timeout)
+        try:
+            data = response.raw.read(size, decode_content=True) if response.ok else b''
+            total = None
+            if response.status_code == 206:
+                total = response.headers.get('Content-Range', '').rpartition('/')[2]
+                total = int(total) if total.isdigit() else None
+            elif response.ok:
+                more = response.raw.read(1, decode_content=True)
+                total = len(data) if not more else (int(response.headers['Content-Length'])
+                                                    if response.headers.get('Content-Length', '').isdigit() else None)
+            return {'response': response, 'data': data, 'total': total,
+                    'complete': total is not None and len(data) >= total}
+        finally:
+            response.close()
+
+    async def _call(self, url: str, func, *args):
+        """func(*args) on the thread pool, under url's host limits."""
+        state = self._host_state(host_of(url))
+        async with state[0]:
+            await self._wait_turn(state)
+            loop = asyncio.get_running_loop()
+            try:
+                return await loop.run_in_executor(self._executor, func, *args)
+            except Exception:
+                self.stats['errors'] += 1
+                raise
+            finally:
+                self.stats['requests'] += 1
+
+    async def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """One HTTP request under the host's limits (raises like requests does)."""
+        if url.startswith('//'):
+            url = 'https:' + url
+        response = await self._call(url, self._send, method, url, kwargs)
+        if getattr(response, 'from_cache', False):
+            self.stats['cached'] += 1
+            self.stats['cached_bytes'] += len(response.content)
+        elif response.content:
+            self.stats['bytes'] += len(response.content)
+        return response
+
+    async def get_prefix(self, url: str, size: int) -> dict:
+        """
+        The first `size` bytes of url: {'response', 'data', 'total' (full size
+        if known), 'complete' (data is the whole body)}. Not cached.
+        """
+        if url.startswith('//'):
+            url = 'https:' + url
+        prefix = await self._call(url, self._send_prefix, url, size)
+        self.stats['bytes'] += len(prefix['data'])
+        return prefix
+
+    async def get(self, url: str, **kwargs) -> requests.Response:
+        return await self.request('GET', url, **kwargs)
+
+    async def head(self, url: str, **kwargs) -> requests.Response:
+        return await self.request('HEAD', url, **kwargs)
+
+    async def run(self, func, *args, **kwargs):
+        """Run blocking/CPU work (parsing, image decoding) off the event loop."""
+        return await asyncio.get_running_loop().run_in_executor(None, partial(func, *args, **kwargs))
+
+    async def run_cpu(self, func, *args):
+        """Run a picklable top-level function in the process pool (or a thread if there is none)."""
+        if self._processes is None:
+            return await self.run(func, *args)
+        return await asyncio.get_running_loop().run_in_executor(self._processes, func, *args)
+
+    # --------------------------------------------------------------- vendors
+
+    async def map(self, func, items, limit: int = VENDOR_CONCURRENCY):
+        """
+        Yield (item, result) as `func(item, self)` finishes for each item, with
+        at most `limit` in progress. An exception is yielded as the result.
+        """
+        items = list(items)
+        pending = set()
+        position = 0
+
+        async def one(item):
+            try:
+                return item, await func(item, self)
+            except Exception as e:
+                return item, e
+
+        while position < len(items) or pending:
+            while position < len(items) and len(pending) < limit:
+                pending.add(asyncio.ensure_future(one(items[position])))
+                position += 1
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
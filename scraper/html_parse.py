@@ -0,0 +1,31 @@
+"""
+HTML parsing for the scrapers: lxml when installed, and only the tags we read.
+
+Most extractors only look at <img> (product images), <meta> (description,
+og:*) and <title>, so parse_html() keeps just img/meta/link/title elements by default
+(bs4's SoupStrainer): the rest of the page - scripts, inline styles, the
+nested divs of a Squarespace/Wix template - is never built into a tree.
+Callers that walk the page structure (CSS selectors like `.product img`,
+an "about" section) pass only=None for the whole tree.
+
+Without lxml, or if it fails on a page, the pure-Python 'html.parser' is used.
+"""
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml  # noqa: F401
+    PARSER = 'lxml'
+except ImportError:
+    PARSER = 'html.parser'
+
+ASSET_TAGS = SoupStrainer(['img', 'meta', 'link', 'title'])
+
+
+def parse_html(content, only=ASSET_TAGS) -> BeautifulSoup:
+    """BeautifulSoup of content, restricted to the `only` strainer (None = whole tree)."""
+    if PARSER != 'html.parser':
+        try:
+            return BeautifulSoup(content, PARSER, parse_only=only)
+        except Exception:
+            pass
+    return BeautifulSoup(content, 'html.parser', parse_only=only)
@@ -0,0 +1,148 @@
+"""
+On-disk HTTP cache for the scrapers, revalidated with conditional requests.
+
+Every successful GET whose response carries a validator (ETag or
+Last-Modified) is stored under output/http_cache/, one file per URL:
+a JSON header line (url, status headers, validators, fetched_at) followed
+by the body. The next GET for that URL sends If-None-Match /
+If-Modified-Since; a 304 is answered from disk, so a refresh scrape only
+transfers what changed. Responses are rebuilt as ordinary 200
+`requests.Response` objects with `from_cache = True`.
+
+Ranged and non-GET requests pass straight through.
+
+    python scraper/http_cache.py            # entries / size on disk
+    python scraper/http_cache.py --clear
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+CACHE_DIR = Path(__file__).parent.parent / "output" / "http_cache"
+# Headers kept with a cached body (the rest describe the old transfer, not the content)
+KEPT_HEADERS = ('Content-Type', 'Content-Length', 'ETag', 'Last-Modified', 'Cache-Control', 'Content-Language')
+
+
+class HttpCache:
+    def __init__(self, directory=CACHE_DIR):
+        self.directory = Path(directory)
+        self.stats = {'hits': 0, 'misses': 0, 'stored': 0, 'bytes_transferred': 0, 'bytes_from_cache': 0}
+        self._lock = threading.Lock()
+
+    def _path(self, url: str) -> Path:
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return self.directory / key[:2] / key
+
+    def _count(self, **deltas):
+        with self._lock:
+            for key, n in deltas.items():
+                self.stats[key] += n
+
+    # ------------------------------------------------------------------ entries
+
+    def load(self, url: str):
+        """(meta, body) cached for url, or None."""
+        try:
+            with open(self._path(url), 'rb') as f:
+                meta = json.loads(f.readline())
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        return (meta, body) if meta.get('url') == url else None
+
+    def save(self, url: str, response: requests.Response):
+        headers = {k: response.headers[k] for k in KEPT_HEADERS if k in response.headers}
+        meta = {'url': url, 'headers': headers, 'fetched_at': time.time()}
+        path = self._path(url)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp, 'wb') as f:
+                f.write(json.dumps(meta).encode('utf-8') + b'\n')
+                f.write(response.content)
+            os.replace(tmp, path)
+        except OSError:
+            return
+        self._count(stored=1)
+
+    @staticmethod
+    def _replay(meta: dict, body: bytes, revalidation: requests.Response) -> requests.Response:
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = 'OK'
+        response.url = meta['url']
+        response.headers = CaseInsensitiveDict(meta['headers'])
+        response._content = body
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.request = revalidation.request
+        response.elapsed = revalidation.elapsed
+        response.from_cache = True
+        return response
+
+    # ----------------------------------------------------------------- requests
+
+    def get(self, session, url: str, **kwargs) -> requests.Response:
+        """session.get(url, **kwargs), revalidating against / filling the cache."""
+        headers = dict(kwargs.pop('headers', None) or {})
+        if 'Range' in headers or kwargs.get('stream'):
+            response = session.get(url, headers=headers, **kwargs)
+            response.from_cache = False
+            return response
+
+        cached = self.load(url)
+        if cached is not None:
+            validators = cached[0]['headers']
+            if 'ETag' in validators:
+                headers['If-None-Match'] = validators['ETag']
+            if 'Last-Modified' in validators:
+                headers['If-Modified-Since'] = validators['Last-Modified']
+
+        response = session.get(url, headers=headers, **kwargs)
+        self._count(bytes_transferred=len(response.content or b''))
+        if response.status_code == 304 and cached is not None:
+            self._count(hits=1, bytes_from_cache=len(cached[1]))
+            return self._replay(*cached, response)
+
+        self._count(misses=1)
+        response.from_cache = False
+        if response.status_code == 200 and ('ETag' in response.headers or 'Last-Modified' in response.headers):
+            self.save(url, response)
+        return response
+
+    # -------------------------------------------------------------------- admin
+
+    def entries(self):
+        return [p for p in self.directory.glob('*/*') if not p.name.endswith('.tmp')]
+
+    def clear(self) -> int:
+        removed = 0
+        for path in self.directory.glob('*/*'):
+            path.unlink(missing_ok=True)
+            removed += 1
+        return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scraper HTTP cache")
+    parser.add_argument("--dir", default=str(CACHE_DIR))
+    parser.add_argument("--clear", action="store_true")
+    args = parser.parse_args()
+
+    cache = HttpCache(args.dir)
+    if args.clear:
+        print(f"🧹 Removed {cache.clear()} cached responses from {cache.directory}")
+        return
+    entries = cache.entries()
+    size = sum(p.stat().st_size for p in entries)
+    print(f"📦 {len(entries)} cached responses, {size / 1e6:.1f} MB in {cache.directory}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Duplicate product images: same URL at another size, same file, same photo.
+
+Three layers, cheapest first:
+  - canonical_image_url() drops CDN size/format parameters (Shopify
+    `_800x` / `?width=`, Squarespace `?format=500w`, ...) so one image
+    linked at several sizes is only probed once;
+  - fingerprint() gives the SHA-256 of the downloaded bytes and a 64-bit
+    difference hash (dHash) of the picture; images within
+    PHASH_MAX_DISTANCE bits of an accepted one are the same photo
+    recompressed, resized or lightly cropped, and don't count against a
+    vendor's image cap;
+  - ImageStore keeps each resized image (JPEG + variants) once per content
+    hash under output/image_store/ and hard-links it into images/<vendor>/,
+    so a photo seen again (re-scrape, or shared between shops) is neither
+    re-encoded nor stored twice.
+"""
+import hashlib
+import json
+import os
+import re
+import shutil
+from io import BytesIO
+from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from PIL import Image
+
+STORE_DIR = Path(__file__).parent.parent / "output" / "image_store"
+PHASH_MAX_DISTANCE = 6        # of 64 bits
+# Query parameters that only pick a rendition of the same image
+SIZE_PARAMS = frozenset({'width', 'height', 'w', 'h', 'size', 'format', 'fit', 'crop', 'quality', 'q',
+                         'auto', 'dpr', 'v', 'version'})
+# Shopify-style size suffixes before the extension: photo_800x.jpg, photo_1024x1024@2x.jpg, photo_grande.jpg
+_SIZE_SUFFIX = re.compile(r'_(?:\d+x\d*|x\d+|pico|icon|thumb|small|compact|medium|large|grande|original|master)'
+                          r'(?:_crop_\w+)?(?:@\dx)?(?=\.\w+$)', re.IGNORECASE)
+# Wix: /v1/fill/w_300,h_300,.../name.jpg
+_WIX_TRANSFORM = re.compile(r'/v1/(?:fill|fit|crop)/[^/]+/[^/]+$')
+
+
+def canonical_image_url(url: str) -> str:
+    """url without rendition parameters, for spotting one image linked at several sizes."""
+    if url.startswith('//'):
+        url = 'https:' + url
+    parts = urlsplit(url)
+    path = _WIX_TRANSFORM.sub('', parts.path)
+    path = _SIZE_SUFFIX.sub('', path)
+    query = urlencode([(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                       if k.lower() not in SIZE_PARAMS])
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, query, ''))
+
+
+def dhash(img: Image.Image) -> int:
+    """64-bit difference hash: is each pixel of a 9x8 grayscale thumbnail brighter than its right neighbour."""
+    if img.format == 'JPEG':
+        img.draft('L', (64, 64))
+    small = img.convert('L').resize((9, 8), Image.Resampling.BILINEAR)
+    pixels = small.tobytes()
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            bits = (bits << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return bits
+
+
+def fingerprint(content: bytes):
+    """(sha256 hex, dhash) of an image file, or None if it can't be decoded."""
+    try:
+        img = Image.open(BytesIO(content))
+        return hashlib.sha256(content).hexdigest(), dhash(img)
+    except Exception:
+        return None
+
+
+def is_duplicate(print_, accepted) -> bool:
+    """True if fingerprint print_ matches one in `accepted` (same bytes, or dHash within PHASH_MAX_DISTANCE)."""
+    sha, phash = print_
+    return any(sha == other_sha or bin(phash ^ other_phash).count('1') <= PHASH_MAX_DISTANCE
+               for other_sha, other_phash in accepted)
+
+
+def _link(source: Path, target: Path):
+    target.unlink(missing_ok=True)
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
+
+
+class ImageStore:
+    """Resized images by content hash: <dir>/<sha[:2]>/<sha>/{image.jpg, image-320.avif, ..., entry.json}."""
+
+    def __init__(self, directory=STORE_DIR):
+        self.directory = Path(directory)
+        self.stats = {'reused': 0, 'stored': 0}
+
+    def _dir(self, sha: str) -> Path:
+        return self.directory / sha[:2] / sha
+
+    def place(self, sha: str, output_path) -> dict:
+        """Link a stored image to output_path (and its variants beside it); its manifest entry, or None."""
+        folder = self._dir(sha)
+        try:
+            entry = json.loads((folder / 'entry.json').read_text(encoding='utf-8'))
+            output_path = Path(output_path)
+            _link(folder / 'image.jpg', output_path)
+            for variant in entry['variants']:
+                name = f"{output_path.stem}{variant['file']}"
+                _link(folder / f"image{variant['file']}", output_path.with_name(name))
+            entry['variants'] = [dict(v, file=f"{output_path.stem}{v['file']}") for v in entry['variants']]
+        except (OSError, ValueError, KeyError):
+            return None
+        self.stats['reused'] += 1
+        return dict(entry, sha256=sha)
+
+    def add(self, sha: str, output_path, entry: dict):
+        """Keep the image just written to output_path (and its variants) under its content hash."""
+        output_path = Path(output_path)
+        folder = self._dir(sha)
+        stored = dict(entry, variants=[])
+        try:
+            folder.mkdir(parents=True, exist_ok=True)
+            _link(output_path, folder / 'image.jpg')
+            for variant in entry['variants']:
+                suffix = variant['file'][len(output_path.stem):]      # "-320.avif"
+                _link(output_path.with_name(variant['file']), folder / f"image{suffix}")
+                stored['variants'].append(dict(variant, file=suffix))
+            stored.pop('sha256', None)
+            (folder / 'entry.json').write_text(json.dumps(stored), encoding='utf-8')
+        except OSError:
+            return
+        self.stats['stored'] += 1
@@ -0,0 +1,64 @@
+"""
+Image dimensions from the first bytes of a file (no decoding, no Pillow).
+
+    image_size(data) -> ('jpeg' | 'png' | 'gif' | 'webp', width, height) or None
+
+Used with a ranged GET of the first SNIFF_BYTES of an image so tiny images
+(icons, spacers, tracking pixels) are rejected before the full download.
+None means the format is unknown or its size field lies beyond `data`
+(e.g. a JPEG whose SOF marker follows a large EXIF block).
+"""
+import struct
+
+SNIFF_BYTES = 32 * 1024
+
+# JPEG start-of-frame markers (C4 = DHT, C8 = JPG, CC = DAC are not frames)
+_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def _jpeg_size(data: bytes):
+    i = 2
+    while i + 9 <= len(data):
+        if data[i] != 0xFF:
+            i += 1
+            continue
+        marker = data[i + 1]
+        if marker == 0xFF:                       # fill byte
+            i += 1
+            continue
+        if marker in (0x01, 0xD8) or 0xD0 <= marker <= 0xD7:   # standalone markers
+            i += 2
+            continue
+        if marker in _SOF_MARKERS:
+            height, width = struct.unpack('>HH', data[i + 5:i + 9])
+            return width, height
+        i += 2 + struct.unpack('>H', data[i + 2:i + 4])[0]
+    return None
+
+
+def _webp_size(data: bytes):
+    chunk = data[12:16]
+    if chunk == b'VP8 ' and len(data) >= 30 and data[23:26] == b'\x9d\x01\x2a':
+        width, height = struct.unpack('<HH', data[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b'VP8L' and len(data) >= 25 and data[20] == 0x2F:
+        bits = int.from_bytes(data[21:25], 'little')
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b'VP8X' and len(data) >= 30:
+        return int.from_bytes(data[24:27], 'little') + 1, int.from_bytes(data[27:30], 'little') + 1
+    return None
+
+
+def image_size(data: bytes):
+    """(format, width, height) parsed from an image's leading bytes, or None."""
+    if data[:2] == b'\xff\xd8':
+        size = _jpeg_size(data)
+        return ('jpeg', *size) if size else None
+    if data[:8] == b'\x89PNG\r\n\x1a\n' and data[12:16] == b'IHDR' and len(data) >= 24:
+        return ('png', *struct.unpack('>II', data[16:24]))
+    if data[:6] in (b'GIF87a', b'GIF89a') and len(data) >= 10:
+        return ('gif', *struct.unpack('<HH', data[6:10]))
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        size = _webp_size(data)
+        return ('webp', *size) if size else None
+    return None
@@ -0,0 +1,211 @@
+"""
+Decode → flatten → resize → save for downloaded product images.
+
+`resize_image` is a plain top-level function so it can run in a worker
+process (Fetcher.run_cpu), keeping image decoding off the threads that
+do network I/O. JPEGs wider than the target are opened in Pillow's draft
+mode, which lets the JPEG decoder scale by 1/2, 1/4 or 1/8 while decoding
+(never below the target size), so a 4000px photo is not fully decoded
+just to be shrunk to 800px; LANCZOS then does the final resize.
+
+`resize_variants` also writes responsive variants next to the JPEG
+fallback (product_1.jpg → product_1-320.webp, product_1-320.avif, ...,
+one per VARIANT_WIDTHS width up to max_width, in every VARIANT_FORMATS
+format this Pillow can encode) and returns a manifest entry for them.
+images/manifest.json maps each fallback path to its entry; the site export
+(VendorStore.export_site) turns those into <picture>/srcset sources:
+
+    python scraper/image_resize.py            # backfill variants + manifest for images/
+"""
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from pathlib import Path
+
+from PIL import Image, features
+
+MAX_WIDTH = 800
+MIN_SIZE = 100
+JPEG_QUALITY = 85
+VARIANT_WIDTHS = (320, 640, 800)
+# format → (Pillow encoder, MIME type, save options); skipped if Pillow lacks the codec
+VARIANT_FORMATS = {
+    'avif': ('AVIF', 'image/avif', {'quality': 55, 'speed': 8}),
+    'webp': ('WEBP', 'image/webp', {'quality': 80, 'method': 4}),
+}
+IMAGES_DIR = Path(__file__).parent.parent / "images"
+MANIFEST_FILE = IMAGES_DIR / "manifest.json"
+
+
+def _save(img, path, encoder: str, **options):
+    # Replace rather than overwrite: the old file may be a hard link into the image store
+    Path(path).unlink(missing_ok=True)
+    img.save(path, encoder, **options)
+
+
+def _decode(content: bytes, max_width: int, min_size: int):
+    """(RGB image at most max_width wide, message); image is None if too small."""
+    img = Image.open(BytesIO(content))
+    width, height = img.size
+
+    # Validate dimensions (skip small images)
+    if width < min_size or height < min_size:
+        return None, f"⚠️ Too small ({width}x{height})"
+
+    target = (max_width, int(height * max_width / width)) if width > max_width else None
+    if target and img.format == 'JPEG':
+        img.draft('RGB', target)
+
+    # Convert to RGB
+    if img.mode in ('RGBA', 'LA', 'P'):
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        if img.mode == 'P':
+            img = img.convert('RGBA')
+        if img.mode in ('RGBA', 'LA'):
+            background.paste(img, mask=img.split()[-1])
+        else:
+            background.paste(img)
+        img = background
+    elif img.mode != 'RGB':
+        img = img.convert('RGB')
+
+    # Resize if needed (from the draft-decoded size, to the original aspect ratio)
+    if target and img.size != target:
+        img = img.resize(target, Image.Resampling.LANCZOS)
+    return img, ''
+
+
+def resize_image(content: bytes, output_path: str, max_width: int = MAX_WIDTH, min_size: int = MIN_SIZE):
+    """
+    Save `content` as an RGB JPEG at most max_width wide. Returns (saved, message),
+    message being '' or why the image was skipped.
+    """
+    try:
+        img, message = _decode(content, max_width, min_size)
+        if img is None:
+            return False, message
+        _save(img, output_path, 'JPEG', quality=JPEG_QUALITY)
+        return True, ''
+    except Exception as e:
+        return False, f"❌ {str(e)[:40]}"
+
+
+def variant_formats() -> list:
+    """VARIANT_FORMATS this Pillow build can encode."""
+    return [fmt for fmt in VARIANT_FORMATS if features.check(fmt)]
+
+
+def _save_variants(img, output_path: Path, widths, formats) -> list:
+    variants = []
+    for width in sorted({w for w in widths if w < img.width} | {img.width}):
+        resized = img if width == img.width else img.resize(
+            (width, round(img.height * width / img.width)), Image.Resampling.LANCZOS)
+        for fmt in formats:
+            encoder, mime, options = VARIANT_FORMATS[fmt]
+            path = output_path.with_name(f"{output_path.stem}-{width}.{fmt}")
+            _save(resized, path, encoder, **options)
+            variants.append({'file': path.name, 'type': mime, 'width': width, 'height': resized.height,
+                             'bytes': path.stat().st_size})
+    return variants
+
+
+def resize_variants(content: bytes, output_path: str, max_width: int = MAX_WIDTH, min_size: int = MIN_SIZE,
+                    widths=VARIANT_WIDTHS, formats=None):
+    """
+    resize_image plus responsive variants. Returns (entry, message); entry is
+    None if nothing was saved, else {'width', 'height', 'bytes', 'variants':
+    [{'file' (name, next to the JPEG), 'type', 'width', 'height', 'bytes'}]}.
+    """
+    output_path = Path(output_path)
+    try:
+        img, message = _decode(content, max_width, min_size)
+        if img is None:
+            return None, message
+        _save(img, output_path, 'JPEG', quality=JPEG_QUALITY)
+        entry = {'width': img.width, 'height': img.height, 'bytes': output_path.stat().st_size}
+    except Exception as e:
+        return None, f"❌ {str(e)[:40]}"
+    try:
+        entry['variants'] = _save_variants(img, output_path, widths,
+                                           variant_formats() if formats is None else formats)
+    except Exception as e:
+        # The JPEG alone is still a usable image
+        entry['variants'] = []
+        message = f"⚠️ No variants ({str(e)[:40]})"
+    return entry, message
+
+
+# ---------------------------------------------------------------------- manifest
+
+def load_manifest(path=MANIFEST_FILE) -> dict:
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def update_manifest(entries: dict, path=MANIFEST_FILE) -> dict:
+    """
+    Merge {fallback path: entry} into the manifest. Every vendor directory
+    in `entries` is replaced as a whole, so images a re-scrape no longer
+    produced drop out.
+    """
+    path = Path(path)
+    manifest = load_manifest(path)
+    rescraped = {os.path.dirname(key) for key in entries}
+    manifest = {key: entry for key, entry in manifest.items() if os.path.dirname(key) not in rescraped}
+    manifest.update(entries)
+    manifest = dict(sorted(manifest.items()))
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1, ensure_ascii=False)
+    os.replace(tmp, path)
+    return manifest
+
+
+def _backfill_one(jpeg: Path, max_width: int):
+    try:
+        img, _ = _decode(jpeg.read_bytes(), max_width, min_size=1)
+        return {'width': img.width, 'height': img.height, 'bytes': jpeg.stat().st_size,
+                'variants': _save_variants(img, jpeg, VARIANT_WIDTHS, variant_formats())}
+    except Exception:
+        return None
+
+
+def backfill(images_dir=IMAGES_DIR, manifest_file=MANIFEST_FILE, max_width: int = MAX_WIDTH,
+             workers: int = None) -> dict:
+    """Build variants + manifest entries for the JPEGs already under images_dir."""
+    images_dir = Path(images_dir)
+    base = images_dir.parent
+    jpegs = sorted(images_dir.glob('*/*.jpg'))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(_backfill_one, jpegs, [max_width] * len(jpegs), chunksize=8)
+        entries = {str(jpeg.relative_to(base)): entry for jpeg, entry in zip(jpegs, results) if entry}
+    return update_manifest(entries, manifest_file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Responsive image variants + manifest")
+    parser.add_argument("--dir", default=str(IMAGES_DIR))
+    parser.add_argument("--workers", type=int, default=None, help="encoder processes (default: all cores)")
+    args = parser.parse_args()
+
+    images_dir = Path(args.dir)
+    manifest = backfill(images_dir, images_dir / MANIFEST_FILE.name, workers=args.workers)
+    jpeg = sum(e['bytes'] for e in manifest.values())
+    print(f"🖼️  {len(manifest)} images, formats: {', '.join(variant_formats()) or 'none'}")
+    for mime in sorted({v['type'] for e in manifest.values() for v in e['variants']}):
+        for width in VARIANT_WIDTHS:
+            size = sum(v['bytes'] for e in manifest.values() for v in e['variants']
+                       if v['type'] == mime and v['width'] == width)
+            if size:
+                print(f"   {mime.ljust(11)} {width:4d}w  {size / 1e6:6.1f} MB")
+    print(f"   {'image/jpeg'.ljust(11)} fallback {jpeg / 1e6:6.1f} MB")
+    print(f"📋 Manifest: {images_dir / MANIFEST_FILE.name}")
+
+
+if __name__ == "__main__":
+    main()
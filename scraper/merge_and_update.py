@@ -1,18 +1,20 @@
 """
-Merge scraper results into vendors.json and apply Instagram fallback for ALL vendors.
+Merge scraper results into the vendor store and apply Instagram fallback for ALL vendors.
 This script:
-1. Loads the new scrape results
-2. Updates vendors.json with new image data
+1. Loads the new scrape results from the store
+2. Updates each vendor's images in the store
 3. Applies Instagram fallback to ANY vendor with empty/missing images (including Etsy)
-4. Copies to website/ and root directories for GitHub Pages
+4. Exports vendors.json to website/ and root directories for GitHub Pages
 """
-import json
+import sys
 from pathlib import Path
 
 BASE_DIR = Path(__file__).parent.parent
-OUTPUT_DIR = BASE_DIR / "scraper" / "output"
 VENDORS_FILE = BASE_DIR / "website" / "vendors.json"
-INSTAGRAM_IMAGES_FILE = BASE_DIR / "data" / "vendor_images.json"
+STORE_FILE = BASE_DIR / "output" / "vendors.db"
+
+sys.path.insert(0, str(BASE_DIR))
+from curation.store import open_vendor_store
 
 
 def slugify(text):
@@ -50,22 +52,17 @@ def main():
     
     # Load data
     print("\n📂 Loading data...")
-    with open(VENDORS_FILE, 'r') as f:
-        vendors_data = json.load(f)
-    
-    with open(INSTAGRAM_IMAGES_FILE, 'r') as f:
-        instagram_images = json.load(f)
+    store = open_vendor_store(STORE_FILE, BASE_DIR)
+    vendors = store.vendors()
+    instagram_images = store.image_map('instagram')
     
-    # Load scrape results
-    results_file = OUTPUT_DIR / "non_etsy_results_v2.json"
-    if not results_file.exists():
-        print(f"❌ Results file not found: {results_file}")
+    # Load scrape results (image scrapes only, not the description-only batch)
+    scrape_results = [r for r in store.scrape_results() if 'images' in r]
+    if not scrape_results:
+        print(f"❌ No scrape results in {STORE_FILE}")
         return
     
-    with open(results_file, 'r') as f:
-        scrape_results = json.load(f)
-    
-    print(f"   ✓ {len(vendors_data['vendors'])} vendors")
+    print(f"   ✓ {len(vendors)} vendors")
     print(f"   ✓ {len(scrape_results)} scrape results")
     print(f"   ✓ {len(instagram_images)} Instagram profiles")
     
@@ -84,7 +81,7 @@ def main():
     already_have_images = 0
     no_images_available = 0
     
-    for vendor in vendors_data['vendors']:
+    for vendor in vendors:
         username = vendor['username']
         slug = slugify(username)
         
@@ -134,21 +131,15 @@ def main():
                 vendor['images'] = []
                 no_images_available += 1
     
-    # Update timestamp
-    from datetime import datetime
-    vendors_data['generated_at'] = datetime.now().isoformat()
-    
-    # Save updated vendors.json
-    print(f"\n💾 Saving updated vendors.json...")
-    with open(VENDORS_FILE, 'w') as f:
-        json.dump(vendors_data, f, indent=2)
-    print(f"   ✓ Saved to {VENDORS_FILE}")
+    # Save only the image lists (partial update per vendor)
+    print(f"\n💾 Saving images to store...")
+    for vendor in vendors:
+        store.set_images(vendor['username'], vendor['images'])
     
-    # Copy to root for GitHub Pages
+    # Export vendors.json (website + root for GitHub Pages)
     root_vendors_file = BASE_DIR / "vendors.json"
-    with open(root_vendors_file, 'w') as f:
-        json.dump(vendors_data, f, indent=2)
-    print(f"   ✓ Copied to {root_vendors_file}")
+    store.export_site(VENDORS_FILE, root_vendors_file, manifest_file=BASE_DIR / "images" / "manifest.json")
+    print(f"   ✓ Exported {VENDORS_FILE} and {root_vendors_file}")
     
     # Copy index.html if it changed
     website_index = BASE_DIR / "website" / "index.html"
@@ -163,7 +154,7 @@ def main():
     print(f"✅ UPDATE COMPLETE")
     print(f"{'='*70}")
     print(f"📊 Statistics:")
-    print(f"   Total vendors:               {len(vendors_data['vendors'])}")
+    print(f"   Total vendors:               {len(vendors)}")
     print(f"   Updated from scrape:         {updated_count}")
     print(f"   Already had images:          {already_have_images}")
     print(f"   Instagram fallback applied:  {fallback_count}")
@@ -0,0 +1,360 @@
+"""
+Platform adapters for the scrapers, selected by shop URL.
+
+    platform = classify(shop_url)        # 'shopify' | 'etsy' | 'bigcartel' | 'squarespace' | 'wix' | 'depop' | 'custom'
+    adapter = PLATFORMS[platform]
+    result = await adapter.scrape(vendor, fetcher, log)
+    # {'images': [urls], 'description', 'name', 'source'} or None
+    result = await adapter.scrape(vendor, fetcher, log, want=3, deep=False)
+    # homepage only (plus products.json on Shopify), stop at 3 image URLs
+
+Every scraper (vendor_scraper_v2 and, through it, scrape_all; the metadata
+batch in scrape_non_etsy_batch) picks adapters here and runs them on one
+Fetcher, so the HTTP client, cache and politeness limits are shared and a
+platform's scraping is changed in one place.
+
+Every adapter takes `want` (image URLs to collect) and `deep`: deep scrapes
+try the platform's product pages before the homepage; deep=False fetches
+the homepage only (and, on Shopify, /products.json), for runs that just
+need a few images per shop and should cost each shop as few requests as
+possible. Failed pages are reported through the caller's `log`.
+
+Adapters register with @adapter(name, label, hosts). classify() matches the
+shop's host against every registered host suffix with one compiled pattern
+(memoized per host) and falls back to 'custom'. A platform registered with
+no scrape function (Depop) is skipped; Etsy blocks scraping, so its adapter
+finds nothing and the vendor goes to instagram_fallback() like any other
+empty result.
+"""
+import re
+from dataclasses import dataclass
+from typing import Callable, Optional
+from urllib.parse import urlsplit, urlunsplit, urljoin, parse_qsl, urlencode
+
+import shopify
+from html_parse import parse_html
+
+WANT_IMAGES = 10          # candidate image URLs collected per vendor
+ENOUGH_IMAGES = 5         # stop trying further pages once this many are found
+IMAGE_WIDTH = shopify.IMAGE_WIDTH
+
+# Image validation patterns (junk keywords to skip)
+JUNK_PATTERNS = [
+    'icon', 'logo', 'social', 'facebook', 'instagram', 'twitter',
+    'pinterest', 'payment', 'badge', 'sprite', 'favicon', 'avatar',
+    'profile', 'placeholder', 'loading', 'button', 'arrow', 'cart',
+    'menu', 'nav', 'header', 'footer', 'banner'
+]
+SOCIAL_CDNS = ['facebook.com', 'twitter.com', 'instagram.com/static',
+               'pinterest.com', 'addtoany.com', 'sharethis.com']
+
+
+@dataclass(frozen=True)
+class Platform:
+    name: str
+    label: str                          # log line when a vendor is routed here
+    hosts: tuple = ()                   # host suffixes that select this platform
+    scrape: Optional[Callable] = None   # async (vendor, fetcher, log, want, deep) -> result or None; None = not scraped
+
+
+PLATFORMS = {}
+_host_platforms = {}
+_host_pattern = None
+
+
+def adapter(name: str, label: str, hosts=()):
+    """Register the decorated async scrape function as platform `name`."""
+    def register(scrape):
+        register_platform(Platform(name, label, tuple(hosts), scrape))
+        return scrape
+    return register
+
+
+def register_platform(platform: Platform):
+    global _host_pattern
+    PLATFORMS[platform.name] = platform
+    _host_platforms.clear()
+    _host_pattern = None
+
+
+def _pattern():
+    """One regex over every registered host suffix; the named group says which platform matched."""
+    global _host_pattern
+    if _host_pattern is None:
+        groups = [f"(?P<{p.name}>{'|'.join(map(re.escape, p.hosts))})"
+                  for p in PLATFORMS.values() if p.hosts]
+        _host_pattern = re.compile(rf"(?:^|\.)(?:{'|'.join(groups)})$") if groups else None
+    return _host_pattern
+
+
+def normalize_url(url: str) -> str:
+    """Shop URLs from the CSV sometimes lack a scheme."""
+    url = (url or '').strip()
+    if url.startswith('//'):
+        return 'https:' + url
+    return url if '://' in url else f"https://{url}"
+
+
+def classify(shop_url: str) -> str:
+    """Platform name for a shop URL ('custom' unless a registered host suffix matches)."""
+    host = (urlsplit(normalize_url(shop_url)).hostname or '').lower()
+    platform = _host_platforms.get(host)
+    if platform is None:
+        pattern = _pattern()
+        match = pattern.search(host) if pattern is not None and host else None
+        platform = _host_platforms[host] = match.lastgroup if match else 'custom'
+    return platform
+
+
+def group_by_platform(vendors) -> dict:
+    """{platform: [vendors]} for every registered platform (vendors without a shop URL are left out)."""
+    groups = {name: [] for name in PLATFORMS}
+    for vendor in vendors:
+        if vendor.get('shop_url'):
+            groups[classify(vendor['shop_url'])].append(vendor)
+    return groups
+
+
+# ------------------------------------------------------------------ image URLs
+
+def is_valid_image_url(url):
+    """Check if URL looks like a valid product image."""
+    if not url:
+        return False
+
+    url_lower = url.lower()
+
+    # Skip SVGs (usually icons)
+    if url_lower.endswith('.svg'):
+        return False
+
+    # Skip if contains junk patterns / known social CDNs
+    if any(pattern in url_lower for pattern in JUNK_PATTERNS):
+        return False
+    if any(cdn in url_lower for cdn in SOCIAL_CDNS):
+        return False
+
+    return True
+
+
+_WIX_MEDIA = re.compile(r'^(/media/[^/]+)(?:/v1/.*)?$')
+
+
+def sized_image_url(url: str, width: int = IMAGE_WIDTH) -> str:
+    """url as a rendition about `width` wide on CDNs that resize on the fly; others unchanged."""
+    if shopify.is_shopify_cdn(url):
+        return shopify.sized_image_url(url, width)
+    parts = urlsplit(url)
+    host = (parts.hostname or '').lower()
+    if host == 'images.squarespace-cdn.com':
+        # Squarespace serves fixed widths (…, 750w, 1000w, …); take the next one up
+        query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k != 'format']
+        query.append(('format', '1000w' if width > 750 else '750w'))
+        return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ''))
+    if host == 'static.wixstatic.com':
+        match = _WIX_MEDIA.match(parts.path)
+        if match:
+            name = match.group(1).rsplit('/', 1)[1]
+            path = f"{match.group(1)}/v1/fit/w_{width},h_{width * 2},q_90/{name}"
+            return urlunsplit((parts.scheme, parts.netloc, path, '', ''))
+    return url
+
+
+def page_images(soup, page_url: str, image_urls: list, limit: int = WANT_IMAGES):
+    """Append the page's product-looking <img> URLs (absolute, sized) to image_urls, up to limit."""
+    for img in soup.find_all('img', src=True):
+        src = img.get('data-src') or img.get('src')
+        if src and is_valid_image_url(src):
+            if src.startswith('//'):
+                src = 'https:' + src
+            elif not src.startswith('http'):
+                src = urljoin(page_url, src)
+            src = sized_image_url(src)
+
+            if src not in image_urls:
+                image_urls.append(src)
+            if len(image_urls) >= limit:
+                break
+
+
+def page_meta(soup):
+    """(site name, description) from a page's meta tags / title."""
+    name = soup.find('meta', {'property': 'og:site_name'})
+    name = name.get('content', '') if name else ''
+    if not name and soup.title and soup.title.string:
+        name = soup.title.string.strip()
+    description = soup.find('meta', {'name': 'description'}) or soup.find('meta', {'property': 'og:description'})
+    return name, description.get('content', '') if description else ''
+
+
+def _failure(e) -> str:
+    """Short reason a page fetch failed: the HTTP status, else the error text."""
+    response = getattr(e, 'response', None)
+    return f"HTTP {response.status_code}" if response is not None else str(e)[:60]
+
+
+async def scrape_pages(urls, fetcher, source: str, log=print, want: int = WANT_IMAGES):
+    """
+    Up to `want` images, plus name and description, from `urls` in order,
+    stopping once ENOUGH_IMAGES (or `want`, if fewer) have been found.
+    """
+    enough = min(ENOUGH_IMAGES, want)
+    image_urls = []
+    name = description = ""
+    for url in urls:
+        try:
+            response = await fetcher.get(url)
+            response.raise_for_status()
+            soup = await fetcher.run(parse_html, response.content)
+        except Exception as e:
+            log(f"  ⚠️ {url} failed: {_failure(e)}")
+            continue
+        page_name, page_description = page_meta(soup)
+        name = name or page_name
+        description = description or page_description
+        page_images(soup, url, image_urls, limit=want)
+        if len(image_urls) >= enough:
+            break
+
+    if not image_urls:
+        return None
+    return {'images': image_urls[:want], 'description': description, 'name': name, 'source': source}
+
+
+async def homepage_meta(shop_url: str, fetcher, log=print):
+    """(site name, description) from the homepage's meta tags, ('', '') if it can't be fetched."""
+    try:
+        response = await fetcher.get(shop_url)
+        response.raise_for_status()
+        return page_meta(await fetcher.run(parse_html, response.content))
+    except Exception as e:
+        log(f"  ⚠️ {shop_url} failed: {_failure(e)}")
+        return '', ''
+
+
+# -------------------------------------------------------------------- adapters
+
+@adapter('shopify', "🛍️ Shopify → Deep scrape (products.json + collections)", hosts=('myshopify.com', 'shopify.com'))
+async def scrape_shopify(vendor, fetcher, log=print, want=WANT_IMAGES, deep=True):
+    """
+    /products.json in 250-product pages (sized CDN image URLs); /collections/all
+    only if deep and the JSON didn't give enough images. products.json has no
+    shop blurb, so the description comes from the homepage's meta tags.
+    """
+    shop_url = normalize_url(vendor['shop_url'])
+    domain = urlsplit(shop_url).netloc
+    image_urls = []
+    name = ""
+
+    try:
+        products, image_urls = await shopify.fetch_products(domain, fetcher, want=want,
+                                                            accept=is_valid_image_url, log=log)
+        if products:
+            name = products[0].get('vendor', '')
+    except Exception as e:
+        log(f"  ⚠️ /products.json failed: {e}")
+
+    if deep and len(image_urls) < min(ENOUGH_IMAGES, want):
+        html = await scrape_pages([f"https://{domain}/collections/all"], fetcher, 'shopify_deep', log, want)
+        for src in (html or {}).get('images', []):
+            if src not in image_urls and len(image_urls) < want:
+                image_urls.append(src)
+
+    if not image_urls:
+        return None
+    site_name, description = await homepage_meta(shop_url, fetcher, log)
+    return {'images': image_urls[:want], 'description': description, 'name': name or site_name,
+            'source': 'shopify_deep'}
+
+
+@adapter('etsy', "🎨 Etsy → Instagram images", hosts=('etsy.com', 'etsy.me'))
+async def scrape_etsy(vendor, fetcher, log=print, want=WANT_IMAGES, deep=True):
+    """Etsy blocks direct scraping (403); vendors fall through to instagram_fallback()."""
+    return None
+
+
+@adapter('bigcartel', "🛒 BigCartel → Deep scrape (products page)", hosts=('bigcartel.com',))
+async def scrape_bigcartel(vendor, fetcher, log=print, want=WANT_IMAGES, deep=True):
+    """/products page (if deep), then the homepage."""
+    shop_url = normalize_url(vendor['shop_url'])
+    urls = [f"{shop_url.rstrip('/')}/products", shop_url] if deep else [shop_url]
+    return await scrape_pages(urls, fetcher, 'bigcartel_deep', log, want)
+
+
+# Common product page paths, homepage last
+CUSTOM_PATHS = ['/shop', '/products', '/collections', '/store', '/catalog', '/gallery', '']
+
+
+@adapter('custom', "🌐 Custom → Deep scrape (shop/products/collections)")
+async def scrape_custom(vendor, fetcher, log=print, want=WANT_IMAGES, deep=True):
+    """Common product paths (if deep), then the homepage."""
+    shop_url = normalize_url(vendor['shop_url']).rstrip('/')
+    paths = CUSTOM_PATHS if deep else ['']
+    return await scrape_pages([shop_url + path for path in paths], fetcher, 'custom_deep', log, want)
+
+
+@adapter('squarespace', "⬛ Squarespace → Collection JSON (?format=json)", hosts=('squarespace.com',))
+async def scrape_squarespace(vendor, fetcher, log=print, want=WANT_IMAGES, deep=True):
+    """
+    Squarespace serves any collection page as JSON with ?format=json; its
+    items' assetUrl are the product images. HTML scrape if no collection has
+    items. Without deep, only the homepage HTML is fetched.
+    """
+    shop_url = normalize_url(vendor['shop_url']).rstrip('/')
+    for path in ('/shop', '/store', '/products', '') if deep else ():
+        try:
+            response = await fetcher.get(f"{shop_url}{path}?format=json")
+            response.raise_for_status()
+            data = response.json()
+        except Exception:
+            continue
+        image_urls = []
+        for item in data.get('items') or []:
+            src = item.get('assetUrl')
+            if src and is_valid_image_url(src):
+                src = sized_image_url(src)
+                if src not in image_urls:
+                    image_urls.append(src)
+            if len(image_urls) >= want:
+                break
+        if image_urls:
+            website = data.get('website') or {}
+            name = website.get('siteTitle', '')
+            description = re.sub(r'<[^>]+>', '', website.get('siteDescription') or '').strip()
+            return {'images': image_urls, 'description': description, 'name': name, 'source': 'squarespace_json'}
+    result = await scrape_custom(vendor, fetcher, log, want, deep)
+    return dict(result, source='squarespace_html') if result else None
+
+
+@adapter('wix', "🟦 Wix → Deep scrape (sized wixstatic images)", hosts=('wixsite.com', 'wix.com'))
+async def scrape_wix(vendor, fetcher, log=print, want=WANT_IMAGES, deep=True):
+    """Wix pages carry server-rendered <img> tags on static.wixstatic.com (rewritten to sized renditions)."""
+    result = await scrape_custom(vendor, fetcher, log, want, deep)
+    return dict(result, source='wix_deep') if result else None
+
+
+register_platform(Platform('depop', "⏭️ Depop → Skip (manual)", hosts=('depop.com',)))
+
+
+def instagram_fallback(vendor, instagram_images, log=print):
+    """
+    Instagram images for vendors with no product images (tries a few
+    spellings of the username). Returns a list of image URLs or None.
+    """
+    username = vendor['username']
+
+    # Try multiple username variations
+    variations = [
+        username,
+        f"_{username}",
+        username.replace('_', ''),
+        username.replace('-', '_')
+    ]
+
+    for variant in variations:
+        images = instagram_images.get(variant)
+        if images:
+            log(f"  📸 Instagram fallback: {len(images)} images found")
+            return images[:5]
+
+    return None
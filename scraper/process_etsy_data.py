@@ -4,10 +4,17 @@ Process Etsy scrape data and update festival vendor website.
 """
 
 import json
+import sys
 from collections import defaultdict
 from pathlib import Path
 import re
 
+BASE_DIR = Path(__file__).parent.parent
+STORE_FILE = BASE_DIR / "output" / "vendors.db"
+
+sys.path.insert(0, str(BASE_DIR))
+from curation.store import open_vendor_store
+
 # Mapping from Etsy seller names to vendor IDs (from vendors.json)
 SELLER_TO_VENDOR_ID = {
     'EtherealAdornmentsUS': 'etherealadornmentsdesign',
@@ -45,11 +52,6 @@ def load_json(path):
     with open(path, 'r', encoding='utf-8') as f:
         return json.load(f)
 
-def save_json(path, data):
-    """Save JSON file with nice formatting."""
-    with open(path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-
 def group_by_seller(products):
     """Group products by seller name."""
     sellers = defaultdict(list)
@@ -230,17 +232,16 @@ def find_vendor_by_instagram(vendors, instagram_username):
 
 def main():
     # Paths
-    base_dir = Path('/home/bumby/.openclaw/workspace/festival-vendors')
-    etsy_data_path = base_dir / 'scraper' / 'output' / 'etsy_scrape_raw.json'
-    vendors_path = base_dir / 'website' / 'vendors.json'
+    etsy_data_path = BASE_DIR / 'scraper' / 'output' / 'etsy_scrape_raw.json'
+    vendors_path = BASE_DIR / 'website' / 'vendors.json'
     
     print("Loading Etsy data...")
     etsy_products = load_json(etsy_data_path)
     print(f"Loaded {len(etsy_products)} products")
     
-    print("\nLoading vendors.json...")
-    vendors_data = load_json(vendors_path)
-    vendors = vendors_data['vendors']
+    print("\nLoading vendors from store...")
+    store = open_vendor_store(STORE_FILE, BASE_DIR)
+    vendors = store.vendors()
     print(f"Loaded {len(vendors)} vendors")
     
     # Group products by seller
@@ -284,8 +285,7 @@ def main():
         bio = generate_bio(products)
         
         # Update vendor (use 'images' field name to match existing website code)
-        vendor['bio'] = bio
-        vendor['images'] = product_images
+        store.update_vendor(vendor['username'], bio=bio, images=product_images)
         
         matched_count += 1
         updates.append({
@@ -299,8 +299,8 @@ def main():
     
     # Save updated vendors.json
     print(f"\n✅ Matched and updated {matched_count} vendors")
-    print(f"\n💾 Saving vendors.json...")
-    save_json(vendors_path, vendors_data)
+    print(f"\n💾 Exporting vendors.json...")
+    store.export_site(vendors_path, manifest_file=BASE_DIR / 'images' / 'manifest.json')
     
     # Print summary
     print(f"\n📊 Summary:")
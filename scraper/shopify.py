@@ -0,0 +1,79 @@
+"""
+Shopify storefront products via /products.json.
+
+Pages are requested PAGE_SIZE (250, Shopify's maximum) products at a time
+and only as many pages as it takes to collect the wanted number of image
+URLs — usually one request per shop instead of the default 30-product page
+plus an HTML scrape of /collections/all. Images are taken round-robin
+across products (every product's first image, then every second image,
+...) for variety, and rewritten to Shopify's sized renditions
+(`?width=800`) so the CDN sends a thumbnail instead of the original upload.
+
+The storefront endpoint has no field selection; each page is parsed once
+and only image srcs and the vendor name are kept.
+"""
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+PAGE_SIZE = 250
+MAX_PAGES = 4
+IMAGE_WIDTH = 800     # matches the resize target, see image_resize.MAX_WIDTH
+
+
+def products_url(domain: str, page: int = 1) -> str:
+    return f"https://{domain}/products.json?limit={PAGE_SIZE}&page={page}"
+
+
+def is_shopify_cdn(url: str) -> bool:
+    parts = urlsplit(url if not url.startswith('//') else 'https:' + url)
+    return parts.hostname == 'cdn.shopify.com' or parts.path.startswith('/cdn/shop/')
+
+
+def sized_image_url(src: str, width: int = IMAGE_WIDTH) -> str:
+    """src as a `width`-wide rendition if it is on Shopify's CDN (which resizes on the fly)."""
+    if src.startswith('//'):
+        src = 'https:' + src
+    if not is_shopify_cdn(src):
+        return src
+    parts = urlsplit(src)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in ('width', 'height')]
+    query.append(('width', str(width)))
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ''))
+
+
+def product_images(products, want: int, accept=lambda src: True) -> list:
+    """Up to `want` distinct sized image URLs, round-robin across products."""
+    per_product = [[img.get('src') for img in product.get('images') or [] if img.get('src')]
+                   for product in products]
+    urls = []
+    depth = 0
+    while len(urls) < want and any(len(srcs) > depth for srcs in per_product):
+        for srcs in per_product:
+            if depth < len(srcs) and accept(srcs[depth]):
+                url = sized_image_url(srcs[depth])
+                if url not in urls:
+                    urls.append(url)
+                if len(urls) >= want:
+                    break
+        depth += 1
+    return urls
+
+
+async def fetch_products(domain: str, fetcher, want: int, accept=lambda src: True, log=print):
+    """
+    Products from /products.json, paging until `want` image URLs are found,
+    a page comes back short, or MAX_PAGES. Returns (products, image URLs).
+    """
+    products = []
+    images = []
+    for page in range(1, MAX_PAGES + 1):
+        response = await fetcher.get(products_url(domain, page))
+        response.raise_for_status()
+        batch = [{'vendor': p.get('vendor', ''), 'images': [{'src': img.get('src')} for img in p.get('images') or []]}
+                 for p in response.json().get('products', [])]
+        products.extend(batch)
+        images = product_images(products, want, accept)
+        if len(images) >= want or len(batch) < PAGE_SIZE:
+            break
+    if page > 1:
+        log(f"  🛍️ {len(products)} products over {page} pages")
+    return products, images
@@ -1,8 +1,10 @@
 """
 Test the v2 scraper on a small sample of vendors.
 """
+import asyncio
 import sys
-sys.path.insert(0, '/home/bumby/.openclaw/workspace/festival-vendors/scraper')
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
 
 from vendor_scraper_v2 import *
 
@@ -12,47 +14,20 @@ def main():
     print("="*60)
     
     # Load data
-    with open(VENDORS_FILE, 'r') as f:
-        vendors_data = json.load(f)
-    vendors = vendors_data['vendors']
+    store = open_vendor_store(STORE_FILE, BASE_DIR)
+    vendors = store.vendors()
+    instagram_images = store.image_map('instagram')
     
-    with open(INSTAGRAM_IMAGES_FILE, 'r') as f:
-        instagram_images = json.load(f)
-    
-    # Pick test vendors (one of each platform)
-    test_vendors = []
-    
-    # Find one Shopify
-    for v in vendors:
-        if 'shopify' in v.get('shop_url', '').lower():
-            test_vendors.append(v)
-            break
-    
-    # Find one BigCartel
-    for v in vendors:
-        if 'bigcartel' in v.get('shop_url', '').lower():
-            test_vendors.append(v)
-            break
-    
-    # Find one custom
-    for v in vendors:
-        url = v.get('shop_url', '').lower()
-        if url and 'shopify' not in url and 'bigcartel' not in url and 'etsy' not in url and 'depop' not in url:
-            test_vendors.append(v)
-            break
+    # Pick test vendors (one of each scraped platform)
+    platforms = group_by_platform(vendors)
+    test_vendors = [vlist[0] for platform, vlist in platforms.items()
+                    if vlist and platform not in SKIPPED_PLATFORMS]
     
     print(f"\n🎯 Testing {len(test_vendors)} vendors")
     
     results = []
-    for vendor in test_vendors:
-        try:
-            result = process_vendor(vendor, instagram_images)
-            if result:
-                results.append(result)
-        except Exception as e:
-            print(f"❌ Error: {e}")
-            import traceback
-            traceback.print_exc()
+    failed = []
+    asyncio.run(scrape_vendors(test_vendors, instagram_images, store, results, failed))
     
     print(f"\n{'='*60}")
     print(f"✅ Test complete: {len(results)}/{len(test_vendors)} successful")
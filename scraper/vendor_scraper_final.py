@@ -2,9 +2,9 @@
 Vendor product scraping pipeline for festival vendors - Final Version.
 Uses direct scraping for most platforms, Apify for Etsy.
 """
-import json
 import os
 import re
+import sys
 import time
 from pathlib import Path
 from urllib.parse import urlparse, urljoin
@@ -17,15 +17,17 @@ from bs4 import BeautifulSoup
 BASE_DIR = Path(__file__).parent.parent
 DATA_DIR = BASE_DIR / "data"
 IMAGES_DIR = BASE_DIR / "images"
-OUTPUT_DIR = BASE_DIR / "scraper" / "output"
-VENDORS_FILE = BASE_DIR / "website" / "vendors.json"
+STORE_FILE = BASE_DIR / "output" / "vendors.db"
+
+sys.path.insert(0, str(BASE_DIR))
+from curation.store import open_vendor_store
+from platforms import classify, group_by_platform
 
 APIFY_TOKEN = os.environ.get('APIFY_TOKEN')
 APIFY_API_BASE = "https://api.apify.com/v2"
 
 # Ensure directories exist
 IMAGES_DIR.mkdir(exist_ok=True)
-OUTPUT_DIR.mkdir(exist_ok=True)
 
 HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36'
@@ -341,7 +343,7 @@ def scrape_custom_direct(vendor):
         return None
 
 
-def process_vendor(vendor):
+def process_vendor(vendor, store):
     """Process a single vendor - scrape and save images."""
     username = vendor['username']
     shop_url = vendor['shop_url'].lower()
@@ -353,23 +355,18 @@ def process_vendor(vendor):
     
     # Determine platform and scrape
     scrape_result = None
-    platform = "unknown"
-    
-    if 'shopify' in shop_url or 'myshopify' in shop_url:
-        platform = "shopify"
+    platform = classify(shop_url)
+    if platform == "shopify":
         scrape_result = scrape_shopify(vendor)
-    elif 'etsy.com' in shop_url:
-        platform = "etsy"
+    elif platform == "etsy":
         scrape_result = scrape_etsy_apify(vendor)
-    elif 'bigcartel' in shop_url:
-        platform = "bigcartel"
+    elif platform == "bigcartel":
         scrape_result = scrape_bigcartel_direct(vendor)
-    elif 'depop.com' in shop_url:
-        platform = "depop"
+    elif platform == "depop":
         print("  ⏭️  Skipping Depop (manual)")
         return None
     else:
-        platform = "custom"
+        # custom, squarespace, wix
         scrape_result = scrape_custom_direct(vendor)
     
     if not scrape_result or not scrape_result['images']:
@@ -406,11 +403,9 @@ def process_vendor(vendor):
         'source': scrape_result.get('source', 'unknown')
     }
     
-    metadata_path = OUTPUT_DIR / f"{vendor_slug}.json"
-    with open(metadata_path, 'w') as f:
-        json.dump(metadata, f, indent=2)
+    store.record_scrape(metadata)
     
-    print(f"  💾 Saved metadata: {metadata_path.name}")
+    print(f"  💾 Saved metadata to store")
     print(f"  📸 Total: {len(saved_images)}/5 images")
     
     return metadata
@@ -422,32 +417,11 @@ def main():
     print("="*60)
     
     # Load vendors
-    with open(VENDORS_FILE, 'r') as f:
-        vendors_data = json.load(f)
-    
-    vendors = vendors_data['vendors']
+    store = open_vendor_store(STORE_FILE, BASE_DIR)
+    vendors = store.vendors()
     
     # Categorize vendors by platform
-    platforms = {
-        'shopify': [],
-        'etsy': [],
-        'bigcartel': [],
-        'depop': [],
-        'custom': []
-    }
-    
-    for v in vendors:
-        url = v.get('shop_url', '').lower()
-        if 'shopify' in url or 'myshopify' in url:
-            platforms['shopify'].append(v)
-        elif 'etsy.com' in url:
-            platforms['etsy'].append(v)
-        elif 'bigcartel' in url:
-            platforms['bigcartel'].append(v)
-        elif 'depop.com' in url:
-            platforms['depop'].append(v)
-        elif url:
-            platforms['custom'].append(v)
+    platforms = group_by_platform(vendors)
     
     print(f"\n📊 Platform Distribution:")
     for platform, vlist in platforms.items():
@@ -466,7 +440,7 @@ def main():
     
     for vendor in test_vendors:
         try:
-            result = process_vendor(vendor)
+            result = process_vendor(vendor, store)
             if result:
                 results.append(result)
         except Exception as e:
@@ -475,24 +449,17 @@ def main():
             traceback.print_exc()
     
     # Save summary
-    summary = {
-        'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
-        'total_processed': len(results),
-        'total_attempted': len(test_vendors),
-        'success_rate': f"{len(results)}/{len(test_vendors)}",
-        'results': results
-    }
-    
-    summary_path = OUTPUT_DIR / f"test_run_final_summary.json"
-    with open(summary_path, 'w') as f:
-        json.dump(summary, f, indent=2)
+    run_id = store.start_run('scrape_test_final', total_attempted=len(test_vendors))
+    store.finish_run(run_id, total_processed=len(results),
+                     success_rate=f"{len(results)}/{len(test_vendors)}",
+                     usernames=[r['username'] for r in results])
     
     print(f"\n{'='*60}")
     print(f"✅ Test run complete!")
     print(f"   Success: {len(results)}/{len(test_vendors)} vendors")
-    print(f"   Summary: {summary_path}")
+    print(f"   Summary: run {run_id} in {STORE_FILE}")
     print(f"   Images: {IMAGES_DIR}")
-    print(f"   Metadata: {OUTPUT_DIR}")
+    print(f"   Metadata: {STORE_FILE}")
     
     # Show results
     print(f"\n📋 Results Summary:")
@@ -1,42 +1,56 @@
 """
 Enhanced vendor product scraping pipeline with:
 1. Deeper page scraping (not just homepage)
-2. Image validation & filtering (size, content type, junk patterns)
+2. Image validation & filtering (real dimensions sniffed from a ranged GET
+   of the file header, file size, content type, junk patterns)
 3. Instagram fallback for empty/filtered results
+4. Duplicate images (same file, or the same photo at another size/crop)
+   skipped before they count against the MAX_IMAGES cap
+
+Vendors are scraped concurrently through scraper/fetcher.py, which keeps
+each shop to one request at a time with HOST_DELAY between requests.
+Platform detection and per-platform scraping are the adapters in
+scraper/platforms.py.
+
+Each vendor is a job in the store's scrape_jobs queue (status, attempts,
+last error, last success), so a run that dies partway resumes with the
+vendors it hadn't finished, and later runs only revisit vendors that
+failed or whose last success is older than --refresh-days.
 """
-import json
+import argparse
+import asyncio
 import os
 import re
-import time
+import sys
+from datetime import datetime, timedelta
 from pathlib import Path
-from urllib.parse import urlparse, urljoin
-import requests
-from PIL import Image
-from io import BytesIO
-from bs4 import BeautifulSoup
 
 # Configuration
 BASE_DIR = Path(__file__).parent.parent
 IMAGES_DIR = BASE_DIR / "images"
-OUTPUT_DIR = BASE_DIR / "scraper" / "output"
-VENDORS_FILE = BASE_DIR / "website" / "vendors.json"
-INSTAGRAM_IMAGES_FILE = BASE_DIR / "data" / "vendor_images.json"
+STORE_FILE = BASE_DIR / "output" / "vendors.db"
+
+sys.path.insert(0, str(BASE_DIR))
+from curation.store import open_vendor_store
+from fetcher import Fetcher
+from image_probe import image_size, SNIFF_BYTES
+from image_resize import resize_variants, update_manifest, MANIFEST_FILE
+from image_dedup import canonical_image_url, fingerprint, is_duplicate, ImageStore
+from platforms import PLATFORMS, classify, group_by_platform, instagram_fallback, is_valid_image_url
+from http_cache import HttpCache
+
+# Worker processes for image decode/resize (0 = decode on the fetcher's threads)
+IMAGE_PROCESSES = min(4, os.cpu_count() or 1)
+MAX_IMAGES = 5          # distinct product images kept per vendor
+# Etsy vendors get Instagram images (scrape_all.py); Depop is manual
+SKIPPED_PLATFORMS = ('etsy', 'depop')
+JOB_KIND = 'scrape_v2'  # this scraper's queue in the store's scrape_jobs
+REFRESH_DAYS = 30       # re-scrape vendors whose last success is older than this
+MAX_ATTEMPTS = 3        # failures in a row before a vendor waits for the refresh window
 
 # Ensure directories exist
 IMAGES_DIR.mkdir(exist_ok=True)
-OUTPUT_DIR.mkdir(exist_ok=True)
 
-HEADERS = {
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-}
-
-# Image validation patterns (junk keywords to skip)
-JUNK_PATTERNS = [
-    'icon', 'logo', 'social', 'facebook', 'instagram', 'twitter', 
-    'pinterest', 'payment', 'badge', 'sprite', 'favicon', 'avatar',
-    'profile', 'placeholder', 'loading', 'button', 'arrow', 'cart',
-    'menu', 'nav', 'header', 'footer', 'banner'
-]
 
 def slugify(text):
     """Convert text to URL-friendly slug."""
@@ -46,389 +60,148 @@ def slugify(text):
     return text
 
 
-def is_valid_image_url(url):
-    """Check if URL looks like a valid product image."""
-    if not url:
-        return False
-    
-    url_lower = url.lower()
-    
-    # Skip SVGs (usually icons)
-    if url_lower.endswith('.svg'):
-        return False
-    
-    # Skip if contains junk patterns
-    for pattern in JUNK_PATTERNS:
-        if pattern in url_lower:
-            return False
-    
-    # Skip known social CDNs
-    social_cdns = ['facebook.com', 'twitter.com', 'instagram.com/static', 
-                   'pinterest.com', 'addtoany.com', 'sharethis.com']
-    for cdn in social_cdns:
-        if cdn in url_lower:
-            return False
-    
-    return True
-
-
-def validate_image_dimensions(url, min_size=100):
+async def validate_image_dimensions(url, fetcher, min_size=100):
     """
-    Check image dimensions via HEAD request if possible.
-    Returns True if image is valid (>= min_size x min_size), False otherwise.
+    Check image dimensions from the first SNIFF_BYTES (one ranged GET).
+    Returns None if the image is invalid (< min_size x min_size, tiny file,
+    not an image), otherwise {'size': (width, height) or None if unknown,
+    'body': the whole file when the prefix already covered it}.
     """
     try:
-        # Try HEAD request first (faster)
-        response = requests.head(url, headers=HEADERS, timeout=5, allow_redirects=True)
-        
-        # Check content type
-        content_type = response.headers.get('Content-Type', '').lower()
-        if not content_type.startswith('image/'):
-            return False
-        
-        # Try to get content-length
-        content_length = response.headers.get('Content-Length')
-        if content_length:
-            # Skip very small files (< 5KB likely icons)
-            if int(content_length) < 5000:
-                return False
-        
-        # For more accurate check, download and check dimensions
-        # But only for a sample to avoid too many requests
-        return True
-        
+        prefix = await fetcher.get_prefix(url, SNIFF_BYTES)
     except Exception:
-        # If HEAD fails, assume it's okay (we'll filter in download phase)
-        return True
-
-
-def download_and_resize_image(url, output_path, max_width=800):
-    """Download an image, validate dimensions, and resize."""
-    try:
-        if url.startswith('//'):
-            url = 'https:' + url
-        
-        response = requests.get(url, headers=HEADERS, timeout=15)
-        response.raise_for_status()
-        
-        img = Image.open(BytesIO(response.content))
-        
-        # Validate dimensions (skip small images)
-        if img.width < 100 or img.height < 100:
-            print(f"⚠️ Too small ({img.width}x{img.height})")
-            return False
-        
-        # Convert to RGB
-        if img.mode in ('RGBA', 'LA', 'P'):
-            background = Image.new('RGB', img.size, (255, 255, 255))
-            if img.mode == 'P':
-                img = img.convert('RGBA')
-            if img.mode in ('RGBA', 'LA'):
-                background.paste(img, mask=img.split()[-1])
-            else:
-                background.paste(img)
-            img = background
-        
-        # Resize if needed
-        if img.width > max_width:
-            ratio = max_width / img.width
-            new_height = int(img.height * ratio)
-            img = img.resize((max_width, new_height), Image.Resampling.LANCZOS)
-        
-        img.save(output_path, 'JPEG', quality=85)
-        return True
-    except Exception as e:
-        print(f"❌ {str(e)[:40]}")
-        return False
-
-
-def scrape_shopify_deep(vendor):
-    """
-    Enhanced Shopify scraper.
-    Try /products.json AND /collections/all for more products.
-    """
-    shop_url = vendor['shop_url']
-    domain = urlparse(shop_url).netloc
+        # If the request fails, assume it's okay (we'll filter in download phase)
+        return {'size': None, 'body': None}
     
-    image_urls = []
-    description = ""
+    response = prefix['response']
+    if not response.ok:
+        return None
     
-    # Method 1: /products.json
-    try:
-        products_url = f"https://{domain}/products.json"
-        response = requests.get(products_url, headers=HEADERS, timeout=15)
-        response.raise_for_status()
-        data = response.json()
-        
-        products = data.get('products', [])
-        for product in products[:15]:
-            if product.get('images'):
-                for img in product['images']:
-                    src = img.get('src')
-                    if src and is_valid_image_url(src):
-                        if src not in image_urls:
-                            image_urls.append(src)
-                        if len(image_urls) >= 10:
-                            break
-            if len(image_urls) >= 10:
-                break
-        
-        if products and not description:
-            description = products[0].get('vendor', '')
-    except Exception as e:
-        print(f"  ⚠️ /products.json failed: {e}")
+    # Skip very small files (< 5KB likely icons)
+    if prefix['total'] is not None and prefix['total'] < 5000:
+        return None
     
-    # Method 2: Try /collections/all (HTML scrape)
-    if len(image_urls) < 5:
-        try:
-            collections_url = f"https://{domain}/collections/all"
-            response = requests.get(collections_url, headers=HEADERS, timeout=15)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Look for product images
-            img_tags = soup.find_all('img', src=True)
-            for img in img_tags:
-                src = img.get('data-src') or img.get('src')
-                if src and is_valid_image_url(src):
-                    if src.startswith('//'):
-                        src = 'https:' + src
-                    elif src.startswith('/'):
-                        src = f"https://{domain}{src}"
-                    
-                    if src not in image_urls:
-                        image_urls.append(src)
-                    if len(image_urls) >= 10:
-                        break
-        except Exception as e:
-            print(f"  ⚠️ /collections/all failed: {e}")
+    sniffed = image_size(prefix['data'])
+    if sniffed is None:
+        # Unknown format, or dimensions past the sniffed bytes: trust the content type
+        content_type = response.headers.get('Content-Type', '').lower()
+        if not content_type.startswith('image/'):
+            return None
+        return {'size': None, 'body': prefix['data'] if prefix['complete'] else None}
     
-    if not image_urls:
+    _, width, height = sniffed
+    if width < min_size or height < min_size:
         return None
-    
-    return {
-        'images': image_urls[:10],
-        'description': description,
-        'source': 'shopify_deep'
-    }
+    return {'size': (width, height), 'body': prefix['data'] if prefix['complete'] else None}
 
 
-def scrape_bigcartel_deep(vendor):
+async def fetch_candidate(url, fetcher, validate=True):
     """
-    Enhanced BigCartel scraper.
-    Try homepage AND /products page.
+    Validate (unless told not to) and download one image. Returns
+    (body, fingerprint) or None if it was rejected or couldn't be decoded.
     """
-    shop_url = vendor['shop_url']
-    domain = urlparse(shop_url).netloc
-    
-    image_urls = []
-    description = ""
-    
-    # Try /products page first
-    urls_to_try = [
-        f"{shop_url.rstrip('/')}/products",
-        shop_url
-    ]
-    
-    for url in urls_to_try:
-        try:
-            response = requests.get(url, headers=HEADERS, timeout=15)
+    body = None
+    if validate:
+        probe = await validate_image_dimensions(url, fetcher)
+        if not probe:
+            return None
+        body = probe['body']
+    try:
+        if body is None:
+            response = await fetcher.get(url)
             response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Get description
-            if not description:
-                meta_desc = soup.find('meta', {'name': 'description'})
-                if meta_desc:
-                    description = meta_desc.get('content', '')
-            
-            # Find product images
-            img_tags = soup.find_all('img', src=True)
-            for img in img_tags:
-                src = img.get('data-src') or img.get('src')
-                if src and is_valid_image_url(src):
-                    if src.startswith('//'):
-                        src = 'https:' + src
-                    elif src.startswith('/'):
-                        src = urljoin(url, src)
-                    
-                    if src not in image_urls:
-                        image_urls.append(src)
-                    if len(image_urls) >= 10:
-                        break
-            
-            if len(image_urls) >= 5:
-                break
-                
-        except Exception as e:
-            print(f"  ⚠️ {url} failed: {e}")
-            continue
-    
-    if not image_urls:
+            body = response.content
+    except Exception:
         return None
-    
-    return {
-        'images': image_urls[:10],
-        'description': description,
-        'source': 'bigcartel_deep'
-    }
+    print_ = await fetcher.run_cpu(fingerprint, body)
+    return (body, print_) if print_ else None
 
 
-def scrape_custom_deep(vendor):
+async def select_images(urls, fetcher, validate=True, limit=MAX_IMAGES):
     """
-    Enhanced custom site scraper.
-    Try homepage AND common product paths.
+    Up to `limit` distinct images from urls, in order, as [(url, body, fingerprint)],
+    and the number of duplicates skipped. URLs that differ only in CDN size
+    parameters are fetched once; the same file or the same photo (perceptual
+    hash) is dropped without counting against the limit, and the next
+    candidates are fetched in its place.
     """
-    shop_url = vendor['shop_url']
-    
-    # Common product page paths
-    paths_to_try = [
-        '/shop',
-        '/products',
-        '/collections',
-        '/store',
-        '/catalog',
-        '/gallery',
-        ''  # homepage last
-    ]
-    
-    image_urls = []
-    description = ""
-    
-    for path in paths_to_try:
-        url = f"{shop_url.rstrip('/')}{path}"
-        
-        try:
-            response = requests.get(url, headers=HEADERS, timeout=15)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Get description
-            if not description:
-                meta_desc = soup.find('meta', {'name': 'description'}) or \
-                           soup.find('meta', {'property': 'og:description'})
-                if meta_desc:
-                    description = meta_desc.get('content', '')
-            
-            # Find images
-            img_tags = soup.find_all('img', src=True)
-            for img in img_tags:
-                src = img.get('data-src') or img.get('src')
-                if src and is_valid_image_url(src):
-                    # Handle relative URLs
-                    if src.startswith('//'):
-                        src = 'https:' + src
-                    elif src.startswith('/'):
-                        src = urljoin(url, src)
-                    elif not src.startswith('http'):
-                        src = urljoin(url, src)
-                    
-                    if src not in image_urls:
-                        image_urls.append(src)
-                    if len(image_urls) >= 10:
-                        break
-            
-            if len(image_urls) >= 5:
+    selected = []
+    seen = set()
+    duplicates = 0
+    candidates = iter(urls)
+    while len(selected) < limit:
+        batch = []
+        for url in candidates:
+            if validate and not is_valid_image_url(url):
+                continue
+            key = canonical_image_url(url)
+            if key in seen:
+                duplicates += 1
+                continue
+            seen.add(key)
+            batch.append(url)
+            if len(batch) >= limit - len(selected):
                 break
-                
-        except Exception:
-            continue
-    
-    if not image_urls:
-        return None
-    
-    return {
-        'images': image_urls[:10],
-        'description': description,
-        'source': 'custom_deep'
-    }
-
-
-def scrape_etsy_instagram(vendor, instagram_images):
-    """Use Instagram images for Etsy vendors."""
-    username = vendor['username']
-    
-    # Try with and without underscore prefix
-    images = instagram_images.get(username) or instagram_images.get(f"_{username}")
-    
-    if not images:
-        return None
-    
-    description = vendor.get('bio', '')
-    
-    return {
-        'images': images[:5],
-        'description': description,
-        'source': 'etsy_instagram'
-    }
+        if not batch:
+            break
+        fetched = await asyncio.gather(*(fetch_candidate(url, fetcher, validate) for url in batch))
+        for url, got in zip(batch, fetched):
+            if got is None:
+                continue
+            if is_duplicate(got[1], [print_ for _, _, print_ in selected]):
+                duplicates += 1
+                continue
+            selected.append((url, *got))
+    return selected[:limit], duplicates
 
 
-def apply_instagram_fallback(vendor, instagram_images):
+async def save_image(body, sha, output_path, fetcher, image_store=None, max_width=800, log=print):
     """
-    Apply Instagram fallback for vendors with no product images.
-    Returns Instagram image URLs if available.
+    Resize an image to a JPEG plus responsive WebP/AVIF variants, or link them
+    from the image store if this content was processed before. Returns the
+    image's manifest entry, or None.
     """
-    username = vendor['username']
-    
-    # Try multiple username variations
-    variations = [
-        username,
-        f"_{username}",
-        username.replace('_', ''),
-        username.replace('-', '_')
-    ]
-    
-    for variant in variations:
-        images = instagram_images.get(variant)
-        if images:
-            print(f"  📸 Instagram fallback: {len(images)} images found")
-            return images[:5]
-    
-    return None
+    if image_store is not None:
+        entry = image_store.place(sha, output_path)
+        if entry:
+            return entry
+    try:
+        entry, message = await fetcher.run_cpu(resize_variants, body, str(output_path), max_width)
+    except Exception as e:
+        entry, message = None, f"❌ {str(e)[:40]}"
+    if message:
+        log(message)
+    if entry and image_store is not None:
+        image_store.add(sha, output_path, entry)
+    return dict(entry, sha256=sha) if entry else None
 
 
-def process_vendor(vendor, instagram_images):
+async def process_vendor(vendor, instagram_images, store, fetcher, log=print, manifest=None, image_store=None):
     """Process a single vendor with enhanced scraping."""
     username = vendor['username']
     shop_url = vendor.get('shop_url', '').lower()
     vendor_slug = slugify(username)
     
-    print(f"\n{'='*60}")
-    print(f"📦 {username}")
-    print(f"🔗 {shop_url[:70]}...")
+    log(f"\n{'='*60}")
+    log(f"📦 {username}")
+    log(f"🔗 {shop_url[:70]}...")
     
     if not shop_url:
-        print("⏭️ No shop URL")
+        log("⏭️ No shop URL")
         return None
     
     # Determine platform and scrape
-    scrape_result = None
-    platform = "unknown"
-    
-    if 'shopify' in shop_url or 'myshopify' in shop_url:
-        platform = "shopify"
-        print("🛍️ Shopify → Deep scrape (products.json + collections)")
-        scrape_result = scrape_shopify_deep(vendor)
-    elif 'etsy.com' in shop_url:
-        platform = "etsy"
-        print("🎨 Etsy → Instagram images")
-        scrape_result = scrape_etsy_instagram(vendor, instagram_images)
-    elif 'bigcartel' in shop_url:
-        platform = "bigcartel"
-        print("🛒 BigCartel → Deep scrape (products page)")
-        scrape_result = scrape_bigcartel_deep(vendor)
-    elif 'depop.com' in shop_url:
-        platform = "depop"
-        print("⏭️ Depop → Skip (manual)")
+    platform = classify(shop_url)
+    adapter = PLATFORMS[platform]
+    log(adapter.label)
+    if adapter.scrape is None:
         return None
-    else:
-        platform = "custom"
-        print("🌐 Custom → Deep scrape (shop/products/collections)")
-        scrape_result = scrape_custom_deep(vendor)
+    scrape_result = await adapter.scrape(vendor, fetcher, log)
     
     # Apply Instagram fallback if no images found
     if not scrape_result or not scrape_result.get('images'):
-        print("  ⚠️ No product images found, trying Instagram fallback...")
-        instagram_imgs = apply_instagram_fallback(vendor, instagram_images)
+        log("  ⚠️ No product images found, trying Instagram fallback...")
+        instagram_imgs = instagram_fallback(vendor, instagram_images, log)
         if instagram_imgs:
             scrape_result = {
                 'images': instagram_imgs,
@@ -436,47 +209,39 @@ def process_vendor(vendor, instagram_images):
                 'source': 'instagram_fallback'
             }
         else:
-            print("  ❌ No Instagram fallback available")
+            log("  ❌ No Instagram fallback available")
             return None
     
-    # Filter and validate images
-    print(f"  🔍 Validating {len(scrape_result['images'])} images...")
-    validated_images = []
-    for img_url in scrape_result['images']:
-        if is_valid_image_url(img_url) and validate_image_dimensions(img_url):
-            validated_images.append(img_url)
-        if len(validated_images) >= 5:
-            break
+    # Filter, validate and download distinct images
+    log(f"  🔍 Validating {len(scrape_result['images'])} images...")
+    selected, duplicates = await select_images(scrape_result['images'], fetcher)
     
-    if not validated_images:
-        print("  ❌ All images filtered out")
+    if not selected:
+        log("  ❌ All images filtered out")
         # Last resort: try Instagram fallback
-        instagram_imgs = apply_instagram_fallback(vendor, instagram_images)
+        instagram_imgs = instagram_fallback(vendor, instagram_images, log)
         if instagram_imgs:
-            validated_images = instagram_imgs
+            selected, duplicates = await select_images(instagram_imgs, fetcher, validate=False)
             scrape_result['source'] = 'instagram_fallback'
-        else:
+        if not selected:
             return None
     
-    print(f"  ✅ {len(validated_images)} valid images")
+    log(f"  ✅ {len(selected)} valid images" + (f" ({duplicates} duplicates skipped)" if duplicates else ""))
     
-    # Download and resize images
+    # Resize images (or link them from the image store)
     vendor_images_dir = IMAGES_DIR / vendor_slug
     vendor_images_dir.mkdir(exist_ok=True)
     
-    saved_images = []
-    print(f"  📥 Downloading: ", end='')
-    for i, img_url in enumerate(validated_images[:5]):
-        output_path = vendor_images_dir / f"product_{i+1}.jpg"
-        if download_and_resize_image(img_url, output_path):
-            saved_images.append(str(output_path.relative_to(BASE_DIR)))
-            print("✓", end='', flush=True)
-        else:
-            print("✗", end='', flush=True)
-    print(f" ({len(saved_images)}/5)")
+    paths = [vendor_images_dir / f"product_{i+1}.jpg" for i in range(len(selected))]
+    downloaded = await asyncio.gather(*(save_image(body, print_[0], path, fetcher, image_store, log=log)
+                                        for (_, body, print_), path in zip(selected, paths)))
+    saved_images = [str(path.relative_to(BASE_DIR)) for path, ok in zip(paths, downloaded) if ok]
+    if manifest is not None:
+        manifest.update((str(path.relative_to(BASE_DIR)), entry) for path, entry in zip(paths, downloaded) if entry)
+    log(f"  📥 Downloading: {''.join('✓' if ok else '✗' for ok in downloaded)} ({len(saved_images)}/{MAX_IMAGES})")
     
     if not saved_images:
-        print("  ❌ Download failed")
+        log("  ❌ Download failed")
         return None
     
     # Create metadata JSON
@@ -490,16 +255,69 @@ def process_vendor(vendor, instagram_images):
         'source': scrape_result.get('source', 'unknown')
     }
     
-    metadata_path = OUTPUT_DIR / f"{vendor_slug}.json"
-    with open(metadata_path, 'w') as f:
-        json.dump(metadata, f, indent=2)
+    store.record_scrape(metadata)
     
-    print(f"  💾 Metadata saved: {metadata_path.name}")
+    log(f"  💾 Metadata saved to store")
     return metadata
 
 
+def failure_reason(lines) -> str:
+    """The last ❌/⏭️ line of a vendor's log, for the job's last_error."""
+    for line in reversed(lines):
+        if '❌' in line or '⏭️' in line:
+            return line.strip()
+    return 'no result'
+
+
+async def scrape_vendors(vendors, instagram_images, store, results, failed, job_kind=None):
+    """
+    Scrape all vendors concurrently; each vendor's log is printed as one block when
+    it finishes. The images' variants are merged into images/manifest.json at the end.
+    With job_kind, each vendor's job in that scrape_jobs queue is marked running
+    when it starts and done/failed when it finishes.
+    """
+    manifest = {}
+    image_store = ImageStore()
+
+    async def scrape(vendor, fetcher):
+        lines = []
+        if job_kind:
+            store.start_scrape_job(job_kind, vendor['username'])
+        try:
+            result = await process_vendor(vendor, instagram_images, store, fetcher, log=lines.append,
+                                          manifest=manifest, image_store=image_store)
+        except Exception as e:
+            lines.append(f"  ❌ Fatal error: {e}")
+            result = None
+        if job_kind:
+            store.finish_scrape_job(job_kind, vendor['username'], None if result else failure_reason(lines))
+        return result, lines
+
+    async with Fetcher(cache=HttpCache(), processes=IMAGE_PROCESSES) as fetcher:
+        done = 0
+        async for vendor, (result, lines) in fetcher.map(scrape, vendors):
+            done += 1
+            print(f"\n[{done}/{len(vendors)}]", '\n'.join(lines).lstrip('\n'))
+            if result:
+                results.append(result)
+            else:
+                failed.append(vendor['username'])
+        if manifest:
+            update_manifest(manifest)
+        fetcher.stats.update(images_encoded=image_store.stats['stored'], images_reused=image_store.stats['reused'])
+        return fetcher.stats
+
+
 def main():
     """Main entry point."""
+    parser = argparse.ArgumentParser(description="Scrape product images for non-Etsy/non-Depop vendors")
+    parser.add_argument("--refresh-days", type=float, default=REFRESH_DAYS,
+                        help="Re-scrape vendors last scraped more than this many days ago")
+    parser.add_argument("--max-attempts", type=int, default=MAX_ATTEMPTS,
+                        help="Retry a failing vendor this many runs in a row, then wait for --refresh-days")
+    parser.add_argument("--all", action="store_true", help="Scrape every vendor, ignoring the job queue")
+    args = parser.parse_args()
+
     print("="*60)
     print("🚀 ENHANCED VENDOR SCRAPER V2")
     print("   - Deeper page scraping")
@@ -508,64 +326,46 @@ def main():
     print("="*60)
     
     # Load data
-    with open(VENDORS_FILE, 'r') as f:
-        vendors_data = json.load(f)
-    vendors = vendors_data['vendors']
-    
-    with open(INSTAGRAM_IMAGES_FILE, 'r') as f:
-        instagram_images = json.load(f)
+    store = open_vendor_store(STORE_FILE, BASE_DIR)
+    vendors = store.vendors()
+    instagram_images = store.image_map('instagram')
     
     # Categorize by platform
-    platforms = {'shopify': [], 'etsy': [], 'bigcartel': [], 'depop': [], 'custom': []}
-    
-    for v in vendors:
-        url = v.get('shop_url', '').lower()
-        if 'shopify' in url or 'myshopify' in url:
-            platforms['shopify'].append(v)
-        elif 'etsy.com' in url:
-            platforms['etsy'].append(v)
-        elif 'bigcartel' in url:
-            platforms['bigcartel'].append(v)
-        elif 'depop.com' in url:
-            platforms['depop'].append(v)
-        elif url:
-            platforms['custom'].append(v)
+    platforms = group_by_platform(vendors)
     
     print(f"\n📊 Platform Distribution:")
     for platform, vlist in platforms.items():
         print(f"   {platform.ljust(12)} {len(vlist):3d} vendors")
     
     # Filter to non-Etsy, non-Depop vendors
-    non_etsy_vendors = platforms['shopify'] + platforms['bigcartel'] + platforms['custom']
+    non_etsy_vendors = [v for platform, vlist in platforms.items() if platform not in SKIPPED_PLATFORMS
+                        for v in vlist]
     print(f"\n🎯 Target: {len(non_etsy_vendors)} non-Etsy/non-Depop vendors")
     
+    # Resume: only vendors that are new, interrupted, failing or stale
+    stale_before = (datetime.now() - timedelta(days=args.refresh_days)).isoformat(timespec='seconds')
+    due = store.due_scrape_jobs(JOB_KIND, [v['username'] for v in non_etsy_vendors],
+                                max_attempts=args.max_attempts, stale_before=stale_before)
+    if not args.all:
+        reasons = {}
+        for reason in due.values():
+            reasons[reason] = reasons.get(reason, 0) + 1
+        print(f"🔁 Due: {len(due)} ({', '.join(f'{n} {r}' for r, n in sorted(reasons.items())) or 'none'}), "
+              f"{len(non_etsy_vendors) - len(due)} up to date (--all to scrape everything)")
+        non_etsy_vendors = [v for v in non_etsy_vendors if v['username'] in due]
+    if not non_etsy_vendors:
+        return
+    
     # Process all vendors
+    run_id = store.start_run('scrape_v2', attempted=len(non_etsy_vendors))
     results = []
     failed = []
     
-    for i, vendor in enumerate(non_etsy_vendors, 1):
-        print(f"\n[{i}/{len(non_etsy_vendors)}]", end=' ')
-        try:
-            result = process_vendor(vendor, instagram_images)
-            if result:
-                results.append(result)
-            else:
-                failed.append(vendor['username'])
-        except Exception as e:
-            print(f"  ❌ Fatal error: {e}")
-            failed.append(vendor['username'])
-        
-        # Rate limiting
-        time.sleep(0.5)
-    
-    # Save results
-    output_file = OUTPUT_DIR / "non_etsy_results_v2.json"
-    with open(output_file, 'w') as f:
-        json.dump(results, f, indent=2)
+    stats = asyncio.run(scrape_vendors(non_etsy_vendors, instagram_images, store, results, failed,
+                                       job_kind=JOB_KIND))
     
-    # Save summary
+    # Save summary (results are already in the store)
     summary = {
-        'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
         'total_attempted': len(non_etsy_vendors),
         'successful': len(results),
         'failed': len(failed),
@@ -579,22 +379,25 @@ def main():
         source = r.get('source', 'unknown')
         summary['source_breakdown'][source] = summary['source_breakdown'].get(source, 0) + 1
     
-    summary_file = OUTPUT_DIR / "scrape_v2_summary.json"
-    with open(summary_file, 'w') as f:
-        json.dump(summary, f, indent=2)
+    store.finish_run(run_id, **summary, http=stats)
     
     print(f"\n{'='*60}")
     print(f"✅ SCRAPE COMPLETE")
     print(f"{'='*60}")
     print(f"📊 Success: {len(results)}/{len(non_etsy_vendors)} ({100*len(results)//max(len(non_etsy_vendors),1)}%)")
-    print(f"💾 Results: {output_file.name}")
-    print(f"📁 Images: {IMAGES_DIR}")
+    print(f"🌐 Requests: {stats['requests']} to {stats['hosts']} hosts ({stats['errors']} errors), "
+          f"{stats['cached']} unchanged (304, served from cache)")
+    print(f"📶 Transferred: {stats['bytes'] / 1e6:.1f} MB (+{stats['cached_bytes'] / 1e6:.1f} MB from cache)")
+    print(f"💾 Results: {STORE_FILE.name} (run {run_id})")
+    print(f"📁 Images: {IMAGES_DIR} (variants: {MANIFEST_FILE.name}), {stats['images_encoded']} encoded, "
+          f"{stats['images_reused']} reused from the image store")
     print(f"\n📋 Source Breakdown:")
     for source, count in sorted(summary['source_breakdown'].items()):
         print(f"   {source.ljust(25)} {count:3d}")
     
     if failed:
-        print(f"\n⚠️  {len(failed)} vendors failed (see {summary_file.name})")
+        print(f"\n⚠️  {len(failed)} vendors failed (see run {run_id} and the {JOB_KIND} "
+              f"scrape_jobs in {STORE_FILE.name}); failing vendors are retried on later runs")
 
 
 if __name__ == "__main__":
@@ -52,10 +52,13 @@ def get_shop_url(vendor: dict) -> str:
 
 def build_site_data(input_path: str, output_path: str):
     """
-    Transform curated_vendors.json → vendors.json for the website.
+    Transform curated_vendors.json (or .ndjson) → vendors.json for the website.
     """
     with open(input_path, 'r') as f:
-        vendors = json.load(f)
+        if input_path.endswith('.ndjson'):
+            vendors = [json.loads(line) for line in f if line.strip()]
+        else:
+            vendors = json.load(f)
 
     site_vendors = []
     all_categories = set()